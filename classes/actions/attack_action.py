@@ -0,0 +1,85 @@
+""" attack_action.py
+
+contains the basic attack action every attacking action is made from. The actions themselves
+(Slash and friends) are defined in catalog.toml and built from this by catalog.py, so a new action
+only needs a new entry in the catalog.
+
+"""
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+import random
+from ..registry import Flyweight, get_action
+
+class AttackAction(Flyweight):
+    """ Contains all the properties and methods of a basic attacking action. Every action in the
+        catalog is a subclass of this with its own values.
+
+        There is only one of each action, shared by every character that uses it, so it doesn't
+        keep anything about the character using it. See registry.py.
+
+        Attributes:
+            action_id (int): The id of this kind of action, used in battle replays.
+            name (str): The name of the action in the catalog.
+            description (string): The description of the action.
+            damage (int): The flat damage of the action, added to damage_stat.
+            damage_stat (str): The stat of the character the damage comes from.
+            crit_multiplier (int): What the damage is multiplied by on a crit.
+            crit_rate (float): The chance of a crit, before the characters agility is added.
+            can_crit (bool): Can this action crit at all?
+            targets_back (bool): Does this action target the rear row of the unit?
+
+    """
+
+    __slots__ = ()
+    action_id = 0
+    name = "Attack"
+    description = "Attack"
+    damage = 0
+    damage_stat = "strength"
+    crit_multiplier = 2
+    crit_rate = 0.0
+    can_crit = True
+    targets_back = False
+
+    def __str__(self):
+        return f"{self.description}"
+
+    def __reduce__(self):
+        # catalog actions aren't importable by name, so they're pickled by id.
+        return (get_action, (self.action_id,))
+
+    def get_damage(self, char, is_crit) -> int:
+        """ Calculates the damage of this action based on some stats.
+
+            Args:
+                char (Character): The character object using this action
+                is_crit (bool): Is it a critical hit?
+
+            Returns:
+                An integer denoting the raw damage of this action.
+
+        """
+        damage = self.damage + getattr(char, self.damage_stat)
+        if is_crit:
+            return damage * self.crit_multiplier
+
+        return damage
+
+    def determine_crit(self, char, rng=None) -> bool:
+        """ Determines if we got a crit or not.
+
+            Args:
+                char (Character): The character object we determine a critical hit for.
+                rng (RngStream): The stream to draw the crit roll from. Without one the global
+                    random module is used.
+
+            Returns:
+                A boolean indicating if this action is a critical hit.
+        """
+        char_crit_chance = self.crit_rate + char.agility / 100
+        # the roll is made even when the action can't crit, so every action uses up the same
+        # number of rolls.
+        crit_roll = rng.uniform() if rng is not None else random.random()
+        if self.can_crit and crit_roll <= char_crit_chance:
+            return True
+
+        return False
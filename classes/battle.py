@@ -3,7 +3,14 @@
 This object represents a single battle between two units.
 
 """
+#pylint: disable=relative-beyond-top-level # it's fine for now.
 import time
+from .battle_events import (Action, ActionEnd, BattleEnd, BattleStart, Crit, Damage, Death,
+        RoundEnd, RoundStart, RowEnd, UnitCrushed)
+from .battle_sinks import ConsoleSink, NullSink, TeeSink
+from .rng import RngStream
+
+#pylint: disable=too-many-instance-attributes # this is okay.
 class Battle():
     """ Contains all the properties and methods used in a battle object.
         Attributes:
@@ -12,16 +19,40 @@ class Battle():
             unit_far (Unit): the enemy unit.  This is a Unit object.
             units (List): A list containing both units for easy looping.
             round (int): An integer denoting the current round of combat.
+            headless (bool): Is this battle run without pacing, for simulations?
+            row_delay (float): How many seconds to wait after each row acts.
+            sink (object): Where this battle sends its events. See battle_sinks.py.
+            rng (RngStream): Where this battles crit rolls come from. Made from the seed passed
+                in (an int, or an RngStream to use as is). Running a battle again with rng.seed
+                replays it exactly.
+            stats (BattleStats): Where this battles timings and counts go, or None to not
+                instrument it. See battle_stats.py.
 
     """
     no_turn = ['Para', 'Sleep', 'Stone'] # Which statuses prevent an action?
+    row_delay_seconds = 2
 
-    def __init__(self, game, unit_1, unit_2):
+    #pylint: disable=too-many-arguments,too-many-positional-arguments # this is fine.
+    def __init__(self, game, unit_1, unit_2, headless=False, sink=None, seed=None, stats=None):
         self.unit_close = unit_1
         self.game = game
         self.unit_far = unit_2
         self.units = [unit_1, unit_2]
         self.round = 0
+        self.headless = headless
+        self.rng = seed if isinstance(seed, RngStream) else RngStream(seed)
+
+        if headless:
+            self.row_delay = 0
+            self.sink = sink if sink is not None else NullSink()
+        else:
+            self.row_delay = self.row_delay_seconds
+            self.sink = sink if sink is not None else ConsoleSink()
+
+        self.stats = stats
+        if stats is not None:
+            self.sink = TeeSink(self.sink, stats)
+            stats.instrument(self)
 
     def is_battle_finished(self):
         """ Determines if the battle is finished.
@@ -74,8 +105,7 @@ class Battle():
 
         return True
 
-    @staticmethod
-    def take_action(actor, action, enemy, enemy_unit):
+    def take_action(self, actor, action, enemy, enemy_unit, friendly_unit):
         """ This function performs an action by an actor on an enemy.
 
             Args:
@@ -83,13 +113,16 @@ class Battle():
                 action (Action): The action being taken.
                 enemy (Character): The character receiving the action.
                 enemy_unit (Unit): The unit of the character receiving the action.
+                friendly_unit (Unit): The unit of the character peforming the action.
 
+            Returns:
+                The damage done and whether it was a crit. enemy.is_alive says if it killed them.
         """
         # use stats from both characters to determine an outcome.
         # for now, we just subtract damage from char health.
         # actions damage can be calculated here?
         # check for a crit
-        is_crit = action.determine_crit(actor)
+        is_crit = action.determine_crit(actor, self.rng)
         if is_crit:
             damage = action.get_damage(actor, is_crit=True)
             enemy_pos = enemy_unit.get_character_position(enemy)
@@ -99,19 +132,35 @@ class Battle():
 
         # determine if it's blocked.
         # damage = char.calculate_defense(damage) # reduces an attack by some amount.
-        if is_crit:
-            print(f"{enemy.char_name} gets CRIT ON! {damage} damage from {actor.char_name}!")
-        else:
-            print(f"{enemy.char_name} takes {damage} damage from {actor.char_name}!")
-
         enemy.health -= damage
-        print(f"{enemy.char_name}'s health is reduced to {enemy.health}!")
         if enemy.health <= 0:
-            print(f"{enemy.char_name} dies!")
             enemy.is_alive = False
+            enemy_unit.update_char_state(enemy)
 
         actor.has_performed_action_this_round = True
-        print("\n")
+        friendly_unit.update_char_state(actor)
+
+        return damage, is_crit
+
+    @staticmethod
+    def determine_target(char, enemy_unit, friendly_unit):
+        """ Picks who a character acts on, using the targeting mode of their unit.
+
+            Args:
+                char (Character): The character about to act.
+                enemy_unit (Unit): The unit being acted upon.
+                friendly_unit (Unit): The unit of the character.
+
+            Returns:
+                The target, or None if the enemy unit has no one left to target.
+        """
+        return char.determine_target(enemy_unit, friendly_unit.targeting_mode)
+
+    def reset_character_positions(self):
+        """ Puts every character in both units back in their base position.
+        """
+        for unit in [self.unit_far, self.unit_close]:
+            unit.reset_character_positions()
 
     def available_rows(self):
         """ Gets the first row with available actions for each function in this battle object.
@@ -159,45 +208,94 @@ class Battle():
             char_order = self.unit_far.determine_turn_order(row_index_for_unit_far)
             enemy_unit = self.unit_close
 
-        friendly_unit = self.game.get_unit_by_id(char_order[0].unit_id)
+        # the friendly unit is whichever unit isn't being acted upon. Don't go through the game
+        # for this, battles run in simulation workers don't have one.
+        friendly_unit = self.unit_close if enemy_unit is self.unit_far else self.unit_far
 
         return char_order, enemy_unit, friendly_unit
 
-    def fight_it_out(self):
-        """ This function does the majority of the combat logic. Combat will continue until no
-            characters can take an action, or until all the characters in a unit are dead.
+    def events(self):
+        #pylint: disable=too-many-branches # one per kind of event, it reads better.
+        """ Fights the battle one step at a time. Nothing happens until the next event is asked
+            for, so a consumer can stop early, filter or add things up without keeping a log.
+            Stopping early still puts every character back in their base position.
 
+            Yields:
+                An event record for everything that happens, in order. See battle_events.py.
         """
-        self.round = 1
-        while not self.is_battle_finished():
-
-            print(f"Round: {self.round}")
-            while not self.is_round_finished():
-                row_index_for_unit_close, row_index_for_unit_far = self.available_rows()
-
-                char_order, enemy_unit, friendly_unit =\
-                        self.determine_turn_order_and_enemy_unit(\
-                        row_index_for_unit_close,\
-                        row_index_for_unit_far)
-
-                # each character in this row takes their action
-                for char in char_order:
-                    action = char.get_action_by_row()
-                    enemy = char.determine_target(enemy_unit, friendly_unit.targeting_mode)
-
-                    print(f"{char.char_name} uses {action} on {enemy.char_name}!")
-                    self.take_action(char, action, enemy, enemy_unit)
+        try:
+            yield BattleStart(self.unit_close, self.unit_far, self.rng.seed)
+            self.round = 1
+            while not self.is_battle_finished():
+
+                yield RoundStart(self.round)
+                while not self.is_round_finished():
+                    row_index_for_unit_close, row_index_for_unit_far = self.available_rows()
+
+                    char_order, enemy_unit, friendly_unit =\
+                            self.determine_turn_order_and_enemy_unit(\
+                            row_index_for_unit_close,\
+                            row_index_for_unit_far)
+
+                    # each character in this row takes their action
+                    for char in char_order:
+                        action = char.get_action_by_row()
+                        enemy = self.determine_target(char, enemy_unit, friendly_unit)
+                        if enemy is None:
+                            # someone earlier in the row finished off the enemy unit.
+                            break
+
+                        yield Action(char, action, enemy)
+                        damage, is_crit = self.take_action(char, action, enemy, enemy_unit,
+                                friendly_unit)
+                        if is_crit:
+                            yield Crit(char, enemy)
+                        yield Damage(char, enemy, damage, is_crit, enemy.health)
+                        if not enemy.is_alive:
+                            yield Death(enemy)
+                        yield ActionEnd(char)
+
+                    yield RowEnd(self.round)
+                    if self.row_delay:
+                        time.sleep(self.row_delay)
+
+                yield RoundEnd(self.round)
+                self.round += 1
+
+                # reset  has_acted for all chars.
+                for unit in [self.unit_far, self.unit_close]:
+                    unit.reset_has_performed_action_this_round()
+
+            for unit in self.units:
+                if not unit.is_any_char_alive():
+                    yield UnitCrushed(unit)
+
+            yield BattleEnd(self.round)
+
+        except GeneratorExit:
+            # stopped mid round, so nobody is left thinking they've acted.
+            for unit in self.units:
+                unit.reset_has_performed_action_this_round()
+            raise
 
-                time.sleep(2)
+        finally:
+            # reset statuses maybe
 
-            self.round += 1
+            # reset position for all characters? selfs over I guess.
+            self.reset_character_positions()
 
-            # reset  has_acted for all chars.
-            for unit in [self.unit_far, self.unit_close]:
-                unit.reset_has_performed_action_this_round()
+    def fight_it_out(self):
+        """ This function does the majority of the combat logic. Combat will continue until no
+            characters can take an action, or until all the characters in a unit are dead.
 
-        # reset statuses maybe
+            Every event is sent to the sink. Use events() to read them directly instead.
 
-        # reset position for all characters? selfs over I guess.
-        for unit in [self.unit_far, self.unit_close]:
-            unit.reset_character_positions()
+        """
+        if isinstance(self.sink, NullSink):
+            for _ in self.events():
+                pass
+            return
+
+        emit = self.sink.emit
+        for event in self.events():
+            emit(event.kind, **event._asdict())
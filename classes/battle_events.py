@@ -0,0 +1,100 @@
+""" battle_events.py
+
+contains the typed event records a battle yields. Battle.events() fights a battle one step at a
+time and yields one of these for everything that happens, in order:
+
+    BattleStart:    unit_close, unit_far, seed
+    RoundStart:     round_number
+    Action:         actor, action, target
+    Crit:           actor, target
+    Damage:         actor, target, damage, is_crit, health
+    Death:          target
+    ActionEnd:      actor
+    RowEnd:         round_number
+    RoundEnd:       round_number
+    UnitCrushed:    unit
+    BattleEnd:      round_number
+
+A Crit always comes right before the Damage it caused. Records are plain named tuples, so they
+cost next to nothing to make and nothing is formatted until a consumer asks for it. The kind of a
+record is the event kind sinks are sent (see battle_sinks.py), and _asdict() gets the keyword
+fields they're sent with.
+
+"""
+#pylint: disable=too-few-public-methods # This is fine.
+from typing import Any, NamedTuple
+
+class BattleStart(NamedTuple):
+    """ The battle is about to start.
+    """
+    unit_close: Any
+    unit_far: Any
+    seed: int
+    kind = "battle_start"
+
+class RoundStart(NamedTuple):
+    """ A round is starting.
+    """
+    round_number: int
+    kind = "round_start"
+
+class Action(NamedTuple):
+    """ A character is acting on a target.
+    """
+    actor: Any
+    action: Any
+    target: Any
+    kind = "action"
+
+class Crit(NamedTuple):
+    """ An action crit, and the target was pushed back.
+    """
+    actor: Any
+    target: Any
+    kind = "crit"
+
+class Damage(NamedTuple):
+    """ An action did damage. health is what the target has left.
+    """
+    actor: Any
+    target: Any
+    damage: int
+    is_crit: bool
+    health: int
+    kind = "damage"
+
+class Death(NamedTuple):
+    """ A character died.
+    """
+    target: Any
+    kind = "death"
+
+class ActionEnd(NamedTuple):
+    """ A character finished acting.
+    """
+    actor: Any
+    kind = "action_end"
+
+class RowEnd(NamedTuple):
+    """ Every character in a row has acted.
+    """
+    round_number: int
+    kind = "row_end"
+
+class RoundEnd(NamedTuple):
+    """ Nobody can act again this round.
+    """
+    round_number: int
+    kind = "round_end"
+
+class UnitCrushed(NamedTuple):
+    """ Every character in a unit is dead.
+    """
+    unit: Any
+    kind = "unit_crushed"
+
+class BattleEnd(NamedTuple):
+    """ The battle is over.
+    """
+    round_number: int
+    kind = "battle_end"
@@ -0,0 +1,193 @@
+""" battle_sinks.py
+
+contains the event sinks a battle can report to. A battle doesn't print anything itself, it emits
+events to a sink, and the sink decides what (if anything) to do with them.
+
+Events are emitted as a kind string plus keyword fields, one for each record Battle.events()
+yields (see battle_events.py):
+
+    battle_start:   unit_close, unit_far, seed
+    round_start:    round_number
+    action:         actor, action, target
+    crit:           actor, target
+    damage:         actor, target, damage, is_crit, health
+    death:          target
+    action_end:     actor
+    row_end:        round_number
+    round_end:      round_number
+    unit_crushed:   unit
+    battle_end:     round_number
+
+Sinks ignore any kind they don't care about.
+
+"""
+#pylint: disable=too-few-public-methods # This is fine.
+import json
+
+def _char(char):
+    return {"id": char.char_id, "name": char.char_name}
+
+def _unit(unit):
+    return unit.unit_id
+
+# event field -> how it's written in json. Anything not here is written as it is.
+_FIELD_ENCODERS = {
+    "actor": _char,
+    "target": _char,
+    "action": str,
+    "unit": _unit,
+    "unit_close": _unit,
+    "unit_far": _unit,
+}
+
+def event_record(kind, fields) -> dict:
+    """ Turns an event into plain data that can be written as json. Characters become their id
+        and name, units their unit_id and actions their name.
+
+        Args:
+            kind (str): The kind of event.
+            fields (dict): The fields of the event.
+
+        Returns:
+            A dict with the kind under "event" and every field after it.
+    """
+    record = {"event": kind}
+    for name, value in fields.items():
+        encoder = _FIELD_ENCODERS.get(name)
+        record[name] = value if encoder is None else encoder(value)
+
+    return record
+
+class NullSink():
+    """ A sink that throws every event away. Used for headless battles where only the outcome
+        matters.
+    """
+
+    def emit(self, kind, **fields):
+        """ Ignores an event.
+
+            Args:
+                kind (str): The kind of event.
+                fields: The fields of the event.
+        """
+
+
+class ListSink():
+    """ A sink that keeps every event in memory, in the order they happened.
+
+        Attributes:
+            events (list): A list of (kind, fields) tuples.
+
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def emit(self, kind, **fields):
+        """ Stores an event.
+
+            Args:
+                kind (str): The kind of event.
+                fields: The fields of the event.
+        """
+        self.events.append((kind, fields))
+
+    def kinds(self):
+        """ Gets the kind of every stored event.
+
+            Returns:
+                A list of event kinds in the order they happened.
+        """
+        return [kind for kind, _ in self.events]
+
+
+class TeeSink():
+    """ A sink that passes every event on to several other sinks, so a battle can be printed and
+        recorded at the same time.
+
+        Attributes:
+            sinks (list): The sinks events are passed on to, in order.
+
+    """
+
+    def __init__(self, *sinks):
+        self.sinks = list(sinks)
+
+    def emit(self, kind, **fields):
+        """ Passes an event on to every sink.
+
+            Args:
+                kind (str): The kind of event.
+                fields: The fields of the event.
+        """
+        for sink in self.sinks:
+            sink.emit(kind, **fields)
+
+
+class JsonLinesSink():
+    """ A sink that writes every event to a text stream as a line of json, see event_record.
+
+        Attributes:
+            stream (file): Where the lines are written.
+            extra (dict): Fields put at the start of every line, like which battle it's from.
+
+    """
+
+    def __init__(self, stream, **extra):
+        self.stream = stream
+        self.extra = extra
+
+    def emit(self, kind, **fields):
+        """ Writes an event.
+
+            Args:
+                kind (str): The kind of event.
+                fields: The fields of the event.
+        """
+        self.stream.write(json.dumps({**self.extra, **event_record(kind, fields)}) + "\n")
+
+
+class ConsoleSink():
+    """ A sink that prints events to the console the same way battles always have.
+    """
+
+    def emit(self, kind, **fields):
+        """ Prints an event.
+
+            Args:
+                kind (str): The kind of event.
+                fields: The fields of the event.
+        """
+        handler = getattr(self, f"_on_{kind}", None)
+        if handler is not None:
+            handler(**fields)
+
+    @staticmethod
+    def _on_round_start(round_number):
+        print(f"Round: {round_number}")
+
+    @staticmethod
+    def _on_action(actor, action, target):
+        print(f"{actor.char_name} uses {action} on {target.char_name}!")
+
+    @staticmethod
+    def _on_damage(actor, target, damage, is_crit, health):
+        if is_crit:
+            print(f"{target.char_name} gets CRIT ON! {damage} damage from {actor.char_name}!")
+        else:
+            print(f"{target.char_name} takes {damage} damage from {actor.char_name}!")
+
+        print(f"{target.char_name}'s health is reduced to {health}!")
+
+    @staticmethod
+    def _on_death(target):
+        print(f"{target.char_name} dies!")
+
+    @staticmethod
+    def _on_action_end(actor):
+        #pylint: disable=unused-argument # the blank line doesn't care who acted.
+        print("\n")
+
+    @staticmethod
+    def _on_unit_crushed(unit):
+        print(f"{unit.unit_leader.char_name}'s unit is crushed!")
@@ -0,0 +1,108 @@
+""" battle_state.py
+
+contains BattleState, a battles own copy of the characters fighting in it. A battle fought on the
+units of a BattleState changes the state and never the characters and units it was made from, so
+the same two units can be fought over and over without copying them or restoring them after.
+
+A state is a small Roster with one row per character in the battle. Making one reads the stats of
+every character once. fork() copies those few rows (18 at most) and nothing else, so a state can
+branch part way through for what-if analysis, and each branch is fought on its own.
+
+"""
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+import copy
+from array import array
+from .character import Character
+from .roster import Roster
+from .unit import Unit, UnitSlots
+
+#pylint: disable=too-many-instance-attributes # a roster with a few more things, this is fine.
+class BattleState(Roster):
+    """ The characters of two units, copied into a roster of their own for a battle.
+
+        Use the units, not the characters the state was made from:
+
+            state = BattleState(unit_close, unit_far)
+            battle = Battle(game, *state.fork().units, headless=True)
+
+        Attributes:
+            chars (tuple): The characters the state was made from, the row is their index. They
+                are only read when the state is made.
+            sides (tuple): For the close and far unit, a tuple of (unit_id, targeting_mode,
+                leader row, rows in the unit).
+
+    """
+
+    def __init__(self, unit_close, unit_far):
+        super().__init__()
+        rows = {}
+        sides = []
+        for unit in (unit_close, unit_far):
+            unit_rows = []
+            for char in unit.unit_chars.values():
+                if char is None:
+                    continue
+
+                # a character in both units gets one row, so they stay shared like a deepcopy.
+                if char not in rows:
+                    rows[char] = len(rows)
+                unit_rows.append(rows[char])
+
+            sides.append((unit.unit_id, unit.targeting_mode, rows[unit.unit_leader],
+                    tuple(unit_rows)))
+
+        self.chars = tuple(rows)
+        self.sides = tuple(sides)
+        self._units = None
+
+        chars = self.chars
+        for name in ("health", "max_health", "agility", "strength", "unit_id", "base_position",
+                "current_position"):
+            setattr(self, name, array(self.fields[name][0], [getattr(char, name)
+                    for char in chars]))
+        self.is_alive = array(self.is_alive.typecode, [1 if char.is_alive else 0
+                for char in chars])
+        self.has_acted = array(self.has_acted.typecode,
+                [1 if char.has_performed_action_this_round else 0 for char in chars])
+        self.status = array(self.status.typecode, [self.status_code(char.status)
+                for char in chars])
+        self.names = [char.char_name for char in chars]
+        self.classes = [char.char_class for char in chars]
+        self.reindex(range(len(chars)))
+
+    @property
+    def units(self) -> tuple:
+        """ The close and far unit, made from this states rows the first time they're asked for.
+            Everything a battle does to them is written to this state.
+        """
+        if self._units is None:
+            views = [Character.from_roster(self, row, char.char_id)
+                    for row, char in enumerate(self.chars)]
+            position = self.current_position
+            self._units = tuple(Unit.from_slots(UnitSlots.filled({position[row]: views[row]
+                    for row in rows}), views[leader], unit_id, targeting_mode)
+                    for unit_id, targeting_mode, leader, rows in self.sides)
+
+        return self._units
+
+    def fork(self):
+        """ Branches this state. The fork starts out the same as this state, and from then on
+            the two change separately.
+
+            Returns:
+                A new BattleState. Its units are made the first time they're asked for.
+        """
+        # chars and sides never change, so they're shared.
+        fork = copy.copy(self)
+        for name in self.fields:
+            setattr(fork, name, getattr(self, name)[:])
+
+        #pylint: disable=protected-access,attribute-defined-outside-init # the fork is a BattleState.
+        fork.names = list(self.names)
+        fork.classes = list(self.classes)
+        fork.statuses = list(self.statuses)
+        fork._status_codes = dict(self._status_codes)
+        fork.unit_rows = {unit_id: set(rows) for unit_id, rows in self.unit_rows.items()}
+        fork.dead_rows = set(self.dead_rows)
+        fork._units = None
+        return fork
@@ -0,0 +1,167 @@
+""" battle_stats.py
+
+contains the optional instrumentation for battles. Pass a BattleStats to a Battle and it records
+the wall time and number of calls of each phase of the battle, and counts the battles, rounds,
+actions, crits and deaths. One BattleStats can be passed to any number of battles to see where a
+whole batch spends its time.
+
+Battles without a BattleStats aren't touched at all. With one, the battle swaps the methods of
+each phase for timed wrappers on that battle only, and the stats listen to the battles events
+like any other sink.
+
+The phases are:
+
+    termination:        is_battle_finished and is_round_finished
+    available_rows:     available_rows
+    turn_order:         determine_turn_order_and_enemy_unit
+    targeting:          determine_target
+    damage:             take_action
+    position_reset:     reset_character_positions
+
+"""
+import time
+
+# phase -> the Battle methods timed for it.
+PHASES = {
+    "termination": ("is_battle_finished", "is_round_finished"),
+    "available_rows": ("available_rows",),
+    "turn_order": ("determine_turn_order_and_enemy_unit",),
+    "targeting": ("determine_target",),
+    "damage": ("take_action",),
+    "position_reset": ("reset_character_positions",),
+}
+
+# the counters kept, in the order they're reported.
+COUNTERS = ("battles", "rounds", "actions", "crits", "deaths")
+
+# which event bumps which counter.
+_EVENT_COUNTERS = {
+    "battle_start": "battles",
+    "round_start": "rounds",
+    "action": "actions",
+    "crit": "crits",
+    "death": "deaths",
+}
+
+class BattleStats():
+    """ Collects timings and counts from one or more battles.
+
+        Attributes:
+            phase_seconds (dict): The total wall time spent in each phase, in seconds.
+            phase_calls (dict): How many times each phase ran.
+            counters (dict): The number of battles, rounds, actions, crits and deaths.
+
+    """
+
+    def __init__(self):
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.phase_calls = dict.fromkeys(PHASES, 0)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+
+    def __str__(self):
+        lines = [f"{'Phase':<16} {'Calls':>10} {'Seconds':>12}"]
+        for phase in PHASES:
+            lines.append(f"{phase:<16} {self.phase_calls[phase]:>10} "
+                    f"{self.phase_seconds[phase]:>12.6f}")
+
+        lines.append(", ".join(f"{name}: {count}" for name, count in self.counters.items()))
+        return "\n".join(lines) + "\n"
+
+    def instrument(self, battle):
+        """ Swaps the phase methods of one battle for timed wrappers. Other battles are left as
+            they are.
+
+            Args:
+                battle (Battle): The battle to time.
+        """
+        for phase, methods in PHASES.items():
+            for method in methods:
+                setattr(battle, method, self._timed(phase, getattr(battle, method)))
+
+    def _timed(self, phase, func):
+        seconds = self.phase_seconds
+        calls = self.phase_calls
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds[phase] += clock() - start
+                calls[phase] += 1
+
+        return timed
+
+    def emit(self, kind, **fields):
+        """ Counts an event. BattleStats is a sink, see battle_sinks.py.
+
+            Args:
+                kind (str): The kind of event.
+                fields: The fields of the event.
+        """
+        #pylint: disable=unused-argument # only the kind is counted.
+        counter = _EVENT_COUNTERS.get(kind)
+        if counter is not None:
+            self.counters[counter] += 1
+
+    def merge(self, other):
+        """ Adds the timings and counts of another BattleStats into this one.
+
+            Args:
+                other (BattleStats): The stats to add.
+        """
+        for phase in PHASES:
+            self.phase_seconds[phase] += other.phase_seconds[phase]
+            self.phase_calls[phase] += other.phase_calls[phase]
+
+        for name in COUNTERS:
+            self.counters[name] += other.counters[name]
+
+    def per_battle(self) -> dict:
+        """ Gets the average counts for a single battle.
+
+            Returns:
+                A dict of rounds, actions, crits and deaths per battle.
+        """
+        battles = self.counters["battles"]
+        return {name: self.counters[name] / battles if battles else 0.0
+                for name in COUNTERS if name != "battles"}
+
+    def as_dict(self) -> dict:
+        """ Gets the stats as plain data, for json.
+        """
+        return {"phases": {phase: {"calls": self.phase_calls[phase],
+                "seconds": self.phase_seconds[phase]} for phase in PHASES},
+                "counters": dict(self.counters)}
+
+    def to_openmetrics(self, prefix="battle") -> str:
+        """ Dumps the stats in the OpenMetrics text format, for scraping.
+
+            Args:
+                prefix (str): Put in front of every metric name.
+
+            Returns:
+                The exposition, ending with the # EOF line.
+        """
+        lines = [
+            f"# TYPE {prefix}_phase_seconds counter",
+            f"# UNIT {prefix}_phase_seconds seconds",
+            f"# HELP {prefix}_phase_seconds Wall time spent in each phase of a battle.",
+        ]
+        lines.extend(f'{prefix}_phase_seconds_total{{phase="{phase}"}} '
+                f"{self.phase_seconds[phase]!r}" for phase in PHASES)
+        lines.extend([
+            f"# TYPE {prefix}_phase_calls counter",
+            f"# HELP {prefix}_phase_calls How many times each phase of a battle ran.",
+        ])
+        lines.extend(f'{prefix}_phase_calls_total{{phase="{phase}"}} {self.phase_calls[phase]}'
+                for phase in PHASES)
+        lines.extend([
+            f"# TYPE {prefix}_events counter",
+            f"# HELP {prefix}_events Battles, rounds, actions, crits and deaths.",
+        ])
+        lines.extend(f'{prefix}_events_total{{event="{name}"}} {count}'
+                for name, count in self.counters.items())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
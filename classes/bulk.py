@@ -0,0 +1,173 @@
+""" bulk.py
+
+contains the bulk loader, for making a whole roster of characters and units from columnar data
+in one go. Every column has one value per character:
+
+    name        the name of the character.
+    class_id    the class_id of any class in the registry (see registry.py).
+    agility, strength, health
+    unit_id     which unit the character goes in. These only group the characters, the units get
+                new unit_ids from the game. The first character of each unit is its leader.
+    position    where in the unit the character goes, 0 to 8.
+
+Columns can be lists, arrays or anything else with one value per character, or a csv file with a
+header row naming the columns. Everything is checked before anything is made, so a bad row
+leaves the game as it was. Nothing is printed.
+
+"""
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+import csv
+import gc
+from contextlib import contextmanager
+from .registry import RegistryError, get_class
+from .roster import Roster
+
+COLUMNS = ("name", "class_id", "agility", "strength", "health", "unit_id", "position")
+
+class ColumnError(ValueError):
+    """ Raised when columnar data doesn't describe valid characters and units.
+    """
+
+@contextmanager
+def _gc_paused():
+    """ Pauses the garbage collector. Making hundreds of thousands of objects that all stay
+        alive sets it off over and over for nothing.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+def _int_column(columns, name, count) -> list:
+    """ Gets a column as a list of ints.
+    """
+    values = columns[name]
+    values = values.tolist() if hasattr(values, "tolist") else list(values)
+    if len(values) != count:
+        raise ColumnError(f"{name} has {len(values)} values, name has {count}")
+
+    try:
+        ints = [int(value) for value in values]
+    except (OverflowError, TypeError, ValueError) as error:
+        raise ColumnError(f"{name} is not all whole numbers: {error}") from error
+
+    # int() cuts 2.9 down to 2, a value has to be a whole number already. Strings from a csv
+    # only get this far if int() read them whole.
+    for row, (value, whole) in enumerate(zip(values, ints)):
+        if not isinstance(value, str) and value != whole:
+            raise ColumnError(f"{name} is not all whole numbers: row {row} has {value!r}")
+
+    return ints
+
+def _check_stat_ranges(checked):
+    """ Checks every agility, strength and health fits in the roster, so a bad row is caught
+        here and not part way through making the characters.
+
+        Args:
+            checked (dict): column name -> list of whole numbers.
+    """
+    for name in ("agility", "strength", "health"):
+        lowest, highest = Roster.stat_range(name)
+        for row, value in enumerate(checked[name]):
+            if not lowest <= value <= highest:
+                raise ColumnError(f"row {row} has {name} {value}, it must be from {lowest} to "
+                        f"{highest}")
+
+def check_columns(columns) -> dict:
+    """ Checks columnar data and tidies it up.
+
+        Args:
+            columns (dict): column name -> the value for each character, see the top of this
+                module.
+
+        Returns:
+            A dict of column name -> list, with the class_id column swapped for the class of each
+            character under "char_class", and the characters grouped into formations under
+            "formations": for each unit, a list of (row, position) pairs.
+    """
+    missing = [name for name in COLUMNS if name not in columns]
+    if missing:
+        raise ColumnError(f"missing columns: {', '.join(missing)}")
+
+    names = [str(name) for name in columns["name"]]
+    checked = {"name": names}
+    for name in COLUMNS[1:]:
+        checked[name] = _int_column(columns, name, len(names))
+
+    _check_stat_ranges(checked)
+
+    classes = {}
+    for class_id in set(checked["class_id"]):
+        try:
+            classes[class_id] = get_class(class_id)
+        except RegistryError as error:
+            raise ColumnError(str(error)) from error
+    checked["char_class"] = [classes[class_id] for class_id in checked.pop("class_id")]
+
+    # one pass over every row puts each character in its unit, checking positions as it goes.
+    formations = {}
+    for row, (unit_id, position) in enumerate(zip(checked["unit_id"], checked["position"])):
+        formation = formations.setdefault(unit_id, {})
+        if not 0 <= position <= 8 or position in formation:
+            raise ColumnError(f"row {row} has a bad position {position} in unit {unit_id}")
+        formation[position] = row
+    checked["formations"] = [[(row, position) for position, row in formation.items()]
+            for formation in formations.values()]
+
+    return checked
+
+def load_columns(game, columns, targeting_mode="Strong"):
+    """ Makes the characters and units of columnar data in a game.
+
+        Args:
+            game (Game): The game to make them in.
+            columns (dict): column name -> the value for each character, see the top of this
+                module.
+            targeting_mode (str): The targeting mode of every unit.
+
+        Returns:
+            A list of the new characters, in row order, and a list of the new units, in the order
+            their unit_id first shows up.
+    """
+    with _gc_paused():
+        checked = check_columns(columns)
+        chars = game.create_characters(checked["name"], checked["char_class"],
+                checked["agility"], checked["strength"], checked["health"])
+        units = game.create_units([[(chars[row], position) for row, position in formation]
+                for formation in checked["formations"]], targeting_mode)
+
+    return chars, units
+
+def read_csv(path) -> dict:
+    """ Reads columnar data from a csv file with a header row.
+
+        Args:
+            path (str): The csv file.
+
+        Returns:
+            A dict of column name -> list of strings, ready for load_columns.
+    """
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        reader = csv.reader(csv_file)
+        header = next(reader, None)
+        if header is None:
+            raise ColumnError(f"{path} is empty")
+
+        header = [name.strip() for name in header]
+        rows = list(reader)
+
+    if any(len(row) != len(header) for row in rows):
+        raise ColumnError(f"{path} has rows with the wrong number of values")
+
+    return dict(zip(header, map(list, zip(*rows)))) if rows else {name: [] for name in header}
+
+def load_csv(game, path, targeting_mode="Strong"):
+    """ Makes the characters and units of a csv file in a game, see read_csv and load_columns.
+
+        Returns:
+            A list of the new characters and a list of the new units.
+    """
+    return load_columns(game, read_csv(path), targeting_mode)
@@ -0,0 +1,266 @@
+""" catalog.py
+
+contains the loader for the class and action catalog. Every character class and action in the
+game is defined in catalog.toml rather than in python, so a designer can add one without touching
+any code.
+
+Loading a catalog parses the toml and compiles it into flat tables: one entry per action for each
+action value, and one entry per class and row (class index * 3 + row) for the action and number of
+actions a class gets in that row. Each action and class is then built from the tables as a
+subclass of AttackAction or CharClass and put in the registry (see registry.py).
+
+The compiled tables are cached next to the toml, in __pycache__, keyed on a hash of the toml. A
+later load with an unchanged toml reads the tables straight from the cache and skips parsing and
+checking the toml altogether.
+
+"""
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+import hashlib
+import marshal
+import os
+try:
+    import tomllib
+except ImportError: # python before 3.11.
+    import tomli as tomllib
+from .actions.attack_action import AttackAction
+from .registry import frozen, register_action, register_class
+from .unit_classes.char_class import CharClass
+
+CATALOG_PATH = os.path.join(os.path.dirname(__file__), "catalog.toml")
+
+# bump this when the compiled tables change shape, so old caches are ignored.
+CACHE_VERSION = 1
+
+DAMAGE_STATS = ("strength", "agility")
+
+# action value -> (type, default). A default of None means the value is required.
+_ACTION_VALUES = {
+    "action_id": (int, None),
+    "description": (str, None),
+    "damage": (int, 0),
+    "damage_stat": (str, "strength"),
+    "crit_multiplier": (int, 2),
+    "crit_rate": (float, None),
+    "can_crit": (bool, True),
+    "targets_back": (bool, False),
+}
+
+# every value that makes up an action.
+ACTION_FIELDS = tuple(_ACTION_VALUES)
+
+# the catalog loaded by default_catalog.
+_DEFAULT = None
+
+class CatalogError(ValueError):
+    """ Raised when a catalog doesn't describe valid classes and actions.
+    """
+
+class Catalog():
+    """ A loaded catalog.
+
+        Attributes:
+            tables (dict): The compiled tables the catalog was built from.
+            actions (dict): The shared instance of every action, keyed by name.
+            classes (dict): The shared instance of every class, keyed by name.
+
+    """
+    #pylint: disable=too-few-public-methods # This is fine.
+
+    def __init__(self, tables, actions, classes):
+        self.tables = tables
+        self.actions = actions
+        self.classes = classes
+
+def _value(entry, key, kind, default, where):
+    value = entry.get(key, default)
+    if value is None:
+        raise CatalogError(f"{where} needs a {key}")
+
+    # toml ints are fine where a float is wanted, but bools aren't ints here.
+    if kind is float and isinstance(value, int) and not isinstance(value, bool):
+        value = float(value)
+    if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+        raise CatalogError(f"{where} has a {key} that isn't a {kind.__name__}: {value!r}")
+
+    return value
+
+def _row_list(entry, key, where):
+    value = entry.get(key)
+    if not isinstance(value, list) or len(value) != 3:
+        raise CatalogError(f"{where} needs a {key} list with one entry per row")
+
+    return value
+
+#pylint: disable=too-many-locals,too-many-branches # one check per value, this is fine.
+def compile_catalog(data) -> dict:
+    """ Checks a parsed catalog and compiles it into flat tables.
+
+        Args:
+            data (dict): The parsed toml.
+
+        Returns:
+            A dict of table name -> list. The action tables have one entry per action, and
+            row_actions and row_num_actions have three per class, one for each row.
+    """
+    actions = data.get("actions")
+    classes = data.get("classes")
+    if not isinstance(actions, dict) or not isinstance(classes, dict):
+        raise CatalogError("a catalog needs an [actions] and a [classes] table")
+
+    tables = {"action_names": [], "class_names": [], "class_ids": [], "row_actions": [],
+            "row_num_actions": []}
+    tables.update({key: [] for key in _ACTION_VALUES})
+    action_index = {}
+    for name, entry in actions.items():
+        where = f"action {name!r}"
+        if not isinstance(entry, dict):
+            raise CatalogError(f"{where} must be a table")
+
+        values = {key: _value(entry, key, kind, name if key == "description" else default,
+                where) for key, (kind, default) in _ACTION_VALUES.items()}
+        if not 1 <= values["action_id"] <= 255 or values["action_id"] in tables["action_id"]:
+            raise CatalogError(f"{where} has a bad or repeated action_id {values['action_id']}")
+        if values["damage_stat"] not in DAMAGE_STATS:
+            raise CatalogError(f"{where} has an unknown damage_stat {values['damage_stat']!r}")
+
+        action_index[name] = len(tables["action_names"])
+        tables["action_names"].append(name)
+        for key, value in values.items():
+            tables[key].append(value)
+
+    for name, entry in classes.items():
+        where = f"class {name!r}"
+        if not isinstance(entry, dict):
+            raise CatalogError(f"{where} must be a table")
+
+        class_id = _value(entry, "class_id", int, None, where)
+        if not 0 <= class_id <= 65535 or class_id in tables["class_ids"]:
+            raise CatalogError(f"{where} has a bad or repeated class_id {class_id}")
+
+        for action in _row_list(entry, "actions", where):
+            if action not in action_index:
+                raise CatalogError(f"{where} uses an unknown action {action!r}")
+            tables["row_actions"].append(action_index[action])
+        for num_actions in _row_list(entry, "num_actions", where):
+            if not isinstance(num_actions, int) or not 0 <= num_actions <= 127:
+                raise CatalogError(f"{where} has a bad num_actions {num_actions!r}")
+            tables["row_num_actions"].append(num_actions)
+
+        tables["class_names"].append(name)
+        tables["class_ids"].append(class_id)
+
+    return tables
+
+def _cache_path(path):
+    folder, name = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, "__pycache__", f"{name}.cache")
+
+def load_tables(path=CATALOG_PATH, cache_path=None, use_cache=True) -> dict:
+    """ Gets the compiled tables of a catalog file, from the cache if it's up to date.
+
+        Args:
+            path (str): The catalog toml.
+            cache_path (str): Where the compiled tables are cached. Defaults to a file in
+                __pycache__ next to the toml.
+            use_cache (bool): Read and write the cache. Without it the toml is always parsed.
+
+        Returns:
+            The compiled tables, see compile_catalog.
+    """
+    with open(path, "rb") as catalog_file:
+        source = catalog_file.read()
+
+    if not use_cache:
+        return compile_catalog(_parse(source, path))
+
+    cache_path = cache_path or _cache_path(path)
+    digest = hashlib.blake2b(source, digest_size=16).digest()
+    try:
+        with open(cache_path, "rb") as cache_file:
+            version, cached_digest, tables = marshal.load(cache_file)
+        if version == CACHE_VERSION and cached_digest == digest:
+            return tables
+    except (OSError, EOFError, ValueError, TypeError):
+        pass # no cache yet, or it's from something else. Compile it again.
+
+    tables = compile_catalog(_parse(source, path))
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        partial = f"{cache_path}.{os.getpid()}"
+        with open(partial, "wb") as cache_file:
+            marshal.dump((CACHE_VERSION, digest, tables), cache_file)
+        os.replace(partial, cache_path)
+    except OSError:
+        pass # a read only install still works, it just parses every time.
+
+    return tables
+
+def _parse(source, path):
+    try:
+        return tomllib.loads(source.decode("utf-8"))
+    except (UnicodeDecodeError, tomllib.TOMLDecodeError) as error:
+        raise CatalogError(f"{path} is not valid toml: {error}") from error
+
+def build_catalog(tables, register=True) -> Catalog:
+    """ Builds the actions and classes of a catalog from its compiled tables.
+
+        Args:
+            tables (dict): The compiled tables, see compile_catalog.
+            register (bool): Put the actions and classes in the registry. Their ids must not be
+                taken already.
+
+        Returns:
+            The Catalog.
+    """
+    actions = []
+    for index, name in enumerate(tables["action_names"]):
+        attributes = {key: tables[key][index] for key in _ACTION_VALUES}
+        action_class = type(f"{name}Action", (AttackAction,),
+                dict(attributes, __slots__=(), name=name))
+        if register:
+            register_action(action_class)
+        actions.append(action_class())
+
+    classes = {}
+    for index, name in enumerate(tables["class_names"]):
+        rows = range(index * 3, index * 3 + 3)
+        char_class = type(f"{name}Class", (CharClass,), {
+            "__slots__": (),
+            "class_id": tables["class_ids"][index],
+            "name": name,
+            "actions": frozen({row: actions[tables["row_actions"][flat]]
+                    for row, flat in enumerate(rows)}),
+            "num_actions": frozen({row: tables["row_num_actions"][flat]
+                    for row, flat in enumerate(rows)}),
+        })
+        if register:
+            register_class(char_class)
+        classes[name] = char_class()
+
+    return Catalog(tables, {action.name: action for action in actions}, classes)
+
+def load_catalog(path=CATALOG_PATH, cache_path=None, use_cache=True, register=True) -> Catalog:
+    """ Loads a catalog file and builds its actions and classes.
+
+        Args:
+            path (str): The catalog toml.
+            cache_path (str): Where the compiled tables are cached, see load_tables.
+            use_cache (bool): Read and write the cache.
+            register (bool): Put the actions and classes in the registry.
+
+        Returns:
+            The Catalog.
+    """
+    return build_catalog(load_tables(path, cache_path, use_cache), register)
+
+def default_catalog() -> Catalog:
+    """ Gets the catalog that comes with the game, loading it the first time.
+
+        Returns:
+            The Catalog built from catalog.toml.
+    """
+    global _DEFAULT #pylint: disable=global-statement # loaded once per process.
+    if _DEFAULT is None:
+        _DEFAULT = load_catalog()
+
+    return _DEFAULT
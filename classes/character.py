@@ -3,10 +3,30 @@
 This class represents a single character.
 
 """
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+from .roster import Roster
+from .targeting import select_target
+
+def _roster_stat(name, doc):
+    """ Makes a property that reads and writes one of this characters stats in their roster.
+    """
+    #pylint: disable=protected-access # the property belongs to Character.
+    def getter(self):
+        return getattr(self._roster, name)[self._row]
+
+    def setter(self, value):
+        getattr(self._roster, name)[self._row] = value
+
+    return property(getter, setter, doc=doc)
 
 #pylint: disable=too-many-instance-attributes # this is okay.
 class Character():
     """ Contains all the properties and functions used by a single individual character.
+
+        A character is a light view over one row of a Roster. Everything about the character,
+        their name and class included, lives in the roster, so any number of views of the same
+        row see the same character and Game only makes them when they're asked for.
+
         Attributes:
             char_name (str): The name of the character.
             char_id (int): The unique id of the character.
@@ -28,6 +48,16 @@ class Character():
             add a can_char_act() function that looks at status, is_alive, has performed_action etc.
 
     """
+    __slots__ = ("_roster", "_row", "char_id", "__weakref__")
+
+    char_name = _roster_stat("names", "The name of the character.")
+    char_class = _roster_stat("classes", "What class the character is.")
+    health = _roster_stat("health", "The current health of this character.")
+    max_health = _roster_stat("max_health", "The maximum health value for this character.")
+    agility = _roster_stat("agility", "The agility of this character.")
+    strength = _roster_stat("strength", "The strength of this character.")
+    base_position = _roster_stat("base_position", "The position this char is placed in.")
+    current_position = _roster_stat("current_position", "The position this char is in now.")
 
     def __str__(self):
         return f"{self.char_name}\n\
@@ -37,20 +67,93 @@ Agi: {self.agility}\n"
 
     #pylint: disable=too-many-arguments # this is fine.
     def __init__(self, name: str, char_class, char_id: int, health: int = 0,\
-            agility: int = 0, strength: int = 0):
-        self.char_name = name
+            agility: int = 0, strength: int = 0, roster=None):
+        # a character made on its own gets a roster of its own, one made by Game shares the games
+        # roster and uses its char_id as the row.
+        if roster is None:
+            roster = Roster()
+            row = 0
+        else:
+            row = char_id
+
+        self._roster = roster
+        self._row = row
+        roster.set_row(row, health=health, agility=agility, strength=strength, name=name,
+                char_class=char_class)
         self.char_id = char_id
-        self.unit_id = -1
-        self.max_health = health
-        self.health = self.max_health
-        self.agility = agility
-        self.strength = strength
-        self.base_position = 0
-        self.current_position = 0
-        self.is_alive = True
-        self.has_performed_action_this_round = False
-        self.status = None # what var type should this be? I think string is probably fine?
-        self.char_class = char_class
+
+    @classmethod
+    def from_roster(cls, roster, row, char_id):
+        """ Makes a character for a row that's already filled in, without touching it. Used
+            when loading a game snapshot and when Game hands out a character.
+
+            Args:
+                roster (Roster): The roster the character is in.
+                row (int): The characters row in the roster.
+                char_id (int): The unique id of the character.
+
+            Returns:
+                The Character.
+        """
+        char = cls.__new__(cls)
+        char._roster = roster
+        char._row = row
+        char.char_id = char_id
+        return char
+
+    def __reduce__(self):
+        # copies and pickles of a character take their stats with them, not the whole roster.
+        return (Character, (self.char_name, self.char_class, self.char_id, self.max_health,
+                self.agility, self.strength), self.__getstate__())
+
+    def __getstate__(self):
+        return (self.health, self.unit_id, self.base_position, self.current_position,
+                self.is_alive, self.has_performed_action_this_round, self.status)
+
+    def __setstate__(self, state):
+        (self.health, self.unit_id, self.base_position, self.current_position,
+                self.is_alive, self.has_performed_action_this_round, self.status) = state
+
+    @property
+    def is_alive(self) -> bool:
+        """ Is this character alive? """
+        return self._roster.is_alive[self._row] == 1
+
+    @is_alive.setter
+    def is_alive(self, value):
+        self._roster.set_alive(self._row, value)
+
+    @property
+    def unit_id(self) -> int:
+        """ The ID of the unit this character is in, or -1. """
+        return self._roster.unit_id[self._row]
+
+    @unit_id.setter
+    def unit_id(self, value):
+        self._roster.set_unit(self._row, value)
+
+    @property
+    def has_performed_action_this_round(self) -> bool:
+        """ Has this char taken an action in a given round. """
+        return self._roster.has_acted[self._row] == 1
+
+    @has_performed_action_this_round.setter
+    def has_performed_action_this_round(self, value):
+        self._roster.has_acted[self._row] = 1 if value else 0
+
+    @property
+    def status(self):
+        """ What status the character has, or None. """
+        return self._roster.statuses[self._roster.status[self._row]]
+
+    @status.setter
+    def status(self, value):
+        self._roster.status[self._row] = self._roster.status_code(value)
+
+    @property
+    def roster(self):
+        """ The roster this characters stats are stored in. """
+        return self._roster
 
     def get_action_by_row(self):
         """ Gets this characters action from their class using their current position.
@@ -92,9 +195,12 @@ Agi: {self.agility}\n"
     def determine_target(self, enemy_unit, targeting_mode) -> object:
         """ Get the target of this characters action given the enemy unit and the action to take.
 
+            Who can be targeted is looked up in the precomputed tables in targeting.py, using this
+            characters position and the enemy units alive mask.
+
             Args:
                 enemy_unit (Unit): The enemy unit we're determing target from.
-                action (Action): The action this character will take.
+                targeting_mode (str): The targeting mode of this characters unit.
 
             Returns:
                 the enemy character we are to take an action against.
@@ -104,73 +210,4 @@ Agi: {self.agility}\n"
         # we have to add something that says if there's a front unit in a column, don't even think
         # about having another unit in targets. so one target per col, as actions target either
         # the front or the back, and can only hit one of the two of these.
-
-        targets = []
-
-        # always include the middle row as targets.
-        targets = self.add_enemies_to_targets((1, 4, 7), targets, enemy_unit)
-
-        # if our character is on the right side of their unit
-        if self.current_position in (0, 3, 6):
-            targets = self.add_enemies_to_targets((2, 5, 8), targets, enemy_unit)
-
-            # if we don't have any targets in the middle or on the left side, we include right side.
-            if len(targets) == 0:
-                targets = self.add_enemies_to_targets((0, 3, 6), targets, enemy_unit)
-
-        # if our character is on the left side of their unit
-        if self.current_position in (2, 5, 8):
-            # we have to get all chars from the right side of enemy_unit
-            targets = self.add_enemies_to_targets((0, 3, 6), targets, enemy_unit)
-
-            # if we don't have any targets in the middle or on enemy_units opposite side.
-            if len(targets) == 0:
-                targets = self.add_enemies_to_targets((2, 5, 8), targets, enemy_unit)
-                # we get the left side.
-
-        if targeting_mode == "Leader":
-            # return the enemy units leader, if it is in targets. otherwise, auto.
-            if enemy_unit.unit_leader in targets:
-                return enemy_unit.unit_leader
-
-            targeting_mode = "Auto"
-
-        if targeting_mode == "Strong":
-            targets.sort(key=lambda x: x.health, reverse=True)
-            return targets[0]
-
-        if targeting_mode == "Weak":
-            targets.sort(key=lambda x: x.health, reverse=False)
-            return targets[0]
-
-        if targeting_mode == "Auto":
-            # this will eventually be based on a chars right, left, and middle attack scores?
-            # not really sure how those are calc'd.
-            return enemy_unit.get_first_non_dead_char_in_unit()
-
-        return enemy_unit.get_first_non_dead_char_in_unit()
-
-    @staticmethod
-    def add_enemies_to_targets(pos_list, targets, enemy_unit):
-        """ This function adds valid characters from an enemy unit to the list of potential targets
-            for a character.
-            Args:
-                pos_tuple (List[int]):
-                targets (list[Character]): A list of characters that can be targeted.
-                enemy_unit (Unit): The opposing unit that we're getting targets from.
-
-            Returns:
-                A list of potential targets for a characters action.
-
-            TODO:
-                This will eventually need to handle attacks that prioritize the back row.
-                So I think it will have to return all potential targets, and we figure out how
-                to select one of those when we go to determine_target
-        """
-        for pos in pos_list:
-            enemy_char = enemy_unit.unit_chars[pos]
-            if enemy_char is not None and enemy_char.is_alive:
-                targets.append(enemy_char)
-                return targets
-
-        return targets
+        return select_target(self.current_position, enemy_unit, targeting_mode)
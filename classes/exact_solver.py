@@ -0,0 +1,401 @@
+""" exact_solver.py
+
+contains the exact matchup solver. The only random thing in a battle is whether each action
+crits, so instead of sampling battles the solver follows every crit and non-crit branch of one
+battle, weighting each by its probability, and adds up where they end. Different branches often
+reach the same state (the same health, positions, and who has acted), so every state is solved
+once and kept in a transposition table.
+
+The rules are the same ones the object engine in battle.py uses, step by step:
+    Battle.is_battle_finished / is_round_finished   -> _battle_finished / _round_finished
+    Unit.which_row_can_go                           -> _which_row_can_go
+    Unit.get_agi_by_row                             -> _agi_by_row
+    Unit.determine_turn_order                       -> _turn_order
+    Character.determine_target                      -> _determine_target
+    Battle.take_action                              -> _take_action
+
+so the probabilities it gives are exactly what simulate_matchup converges to.
+
+A state is a tuple of:
+    round (int), slots (a tuple per unit of the char index in each position, -1 for empty),
+    health (a tuple per char), alive (a bitmask of chars), acted (a bitmask of chars),
+    pending (the chars still to act in the current row), side (the unit acting in that row).
+
+"""
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+from .registry import class_rows
+from .simulator import battle_outcome, WIN, LOSS, DRAW
+from .targeting import TARGET_TABLE, FIRST_POSITION
+from .unit import BLOCKING_STATUSES
+
+CLOSE = 0
+FAR = 1
+
+class _Char():
+    """ What the solver needs to know about a character that never changes during a battle.
+    """
+    #pylint: disable=too-few-public-methods,too-many-instance-attributes # This is fine.
+
+    def __init__(self, index, side, char, is_leader):
+        self.index = index
+        self.side = side
+        self.char_id = char.char_id
+        self.char_name = char.char_name
+        self.agility = char.agility
+        self.is_leader = is_leader
+        self.blocked = char.status in BLOCKING_STATUSES
+        rows = class_rows(char.char_class.class_id)
+        self.num_actions = rows.num_actions
+        self.hit_damage, self.crit_damage = rows.damage_for(char)
+        # P(roll <= chance) for a roll in [0, 1) is just the chance, kept between 0 and 1.
+        self.crit_chance = tuple(min(max(crit_rate + char.agility / 100, 0.0), 1.0)
+                if can_crit else 0.0 for crit_rate, can_crit in zip(rows.crit_rates,
+                rows.can_crit))
+
+class ExactResult():
+    """ The exact outcome distribution of a matchup. Outcomes are always from the point of view of
+        the close unit, the same as MatchupResult.
+
+        Attributes:
+            chars (list): (side, char_id, char_name) for each character, in the order their
+                health is kept in outcomes.
+            outcomes (dict): The probability of every way the battle can end. The key is a tuple
+                of the rounds fought, the health of each character, and a bitmask of which
+                characters are alive.
+            states (int): How many different states were solved.
+
+    """
+
+    def __init__(self, chars, outcomes, states):
+        self.chars = chars
+        self.outcomes = outcomes
+        self.states = states
+        self._sides = [side for side, _, _ in chars]
+
+    def __str__(self):
+        return f"States: {self.states}\n\
+Win: {self.win_rate:.6f} Loss: {self.loss_rate:.6f} Draw: {self.draw_rate:.6f}\n\
+Mean rounds: {self.mean_rounds:.4f}\n\
+Mean survivors: {self.mean_survivors_close:.4f} / {self.mean_survivors_far:.4f}\n"
+
+    def _survivors(self, alive, side) -> int:
+        return sum(1 for index, char_side in enumerate(self._sides)
+                if char_side == side and alive >> index & 1)
+
+    def _rate(self, outcome) -> float:
+        total = 0.0
+        for (_, _, alive), probability in self.outcomes.items():
+            if battle_outcome(self._survivors(alive, CLOSE), self._survivors(alive, FAR)) \
+                    == outcome:
+                total += probability
+
+        return total
+
+    @property
+    def win_rate(self) -> float:
+        """ The probability the close unit wins. """
+        return self._rate(WIN)
+
+    @property
+    def loss_rate(self) -> float:
+        """ The probability the close unit loses. """
+        return self._rate(LOSS)
+
+    @property
+    def draw_rate(self) -> float:
+        """ The probability neither unit is wiped out. """
+        return self._rate(DRAW)
+
+    @property
+    def mean_rounds(self) -> float:
+        """ The expected number of rounds a battle lasts. """
+        return sum(rounds * probability for (rounds, _, _), probability in self.outcomes.items())
+
+    def survivors(self, side) -> dict:
+        """ Gets the distribution of how many characters of a unit are alive at the end.
+
+            Args:
+                side (int): CLOSE or FAR.
+
+            Returns:
+                A dict of number of survivors -> probability.
+        """
+        distribution = {}
+        for (_, _, alive), probability in self.outcomes.items():
+            survivors = self._survivors(alive, side)
+            distribution[survivors] = distribution.get(survivors, 0.0) + probability
+
+        return distribution
+
+    @property
+    def mean_survivors_close(self) -> float:
+        """ The expected number of close characters alive at the end. """
+        return sum(count * p for count, p in self.survivors(CLOSE).items())
+
+    @property
+    def mean_survivors_far(self) -> float:
+        """ The expected number of far characters alive at the end. """
+        return sum(count * p for count, p in self.survivors(FAR).items())
+
+    def health_distribution(self, char_id) -> dict:
+        """ Gets the distribution of a characters health at the end of the battle.
+
+            Args:
+                char_id (int): The character.
+
+            Returns:
+                A dict of health -> probability. Health can be below 0 for characters that died.
+        """
+        index = [char_id for _, char_id, _ in self.chars].index(char_id)
+        distribution = {}
+        for (_, health, _), probability in self.outcomes.items():
+            distribution[health[index]] = distribution.get(health[index], 0.0) + probability
+
+        return distribution
+
+class _Solver():
+    """ Walks every crit branch of one battle, see the top of this module.
+    """
+
+    def __init__(self, unit_close, unit_far):
+        self.chars = []
+        self.targeting_modes = (unit_close.targeting_mode, unit_far.targeting_mode)
+        self.table = {}
+
+        slots = []
+        real_chars = []
+        for side, unit in ((CLOSE, unit_close), (FAR, unit_far)):
+            side_slots = []
+            for position in range(9):
+                char = unit.unit_chars[position]
+                if char is None:
+                    side_slots.append(-1)
+                    continue
+
+                side_slots.append(len(self.chars))
+                self.chars.append(_Char(len(self.chars), side, char, char is unit.unit_leader))
+                real_chars.append(char)
+            slots.append(tuple(side_slots))
+
+        alive = 0
+        acted = 0
+        for index, char in enumerate(real_chars):
+            if char.is_alive:
+                alive |= 1 << index
+            if char.has_performed_action_this_round:
+                acted |= 1 << index
+
+        self.start = (1, tuple(slots), tuple(char.health for char in real_chars), alive, acted,
+                (), CLOSE)
+
+    def _alive_mask(self, side_slots, alive) -> int:
+        mask = 0
+        for position, index in enumerate(side_slots):
+            if index >= 0 and alive >> index & 1:
+                mask |= 1 << position
+        return mask
+
+    def _defeated(self, slots, alive) -> bool:
+        return any(self._alive_mask(side_slots, alive) == 0 for side_slots in slots)
+
+    def _can_act(self, side_slots, round_number, alive, acted, in_round) -> bool:
+        for position, index in enumerate(side_slots):
+            if index < 0 or not alive >> index & 1:
+                continue
+            char = self.chars[index]
+            if char.blocked or char.num_actions[position // 3] < round_number:
+                continue
+            if in_round and acted >> index & 1:
+                continue
+            return True
+
+        return False
+
+    def _battle_finished(self, round_number, slots, alive, acted) -> bool:
+        if self._defeated(slots, alive):
+            return True
+
+        return not any(self._can_act(side_slots, round_number, alive, acted, False)
+                for side_slots in slots)
+
+    def _round_finished(self, round_number, slots, alive, acted) -> bool:
+        if self._defeated(slots, alive):
+            return True
+
+        return not any(self._can_act(side_slots, round_number, alive, acted, True)
+                for side_slots in slots)
+
+    @staticmethod
+    def _which_row_can_go(side_slots, alive, acted) -> int:
+        for position, index in enumerate(side_slots):
+            if index >= 0 and alive >> index & 1 and not acted >> index & 1:
+                return position // 3
+        return -1
+
+    def _agi_by_row(self, side_slots, row) -> float:
+        # every occupied slot counts, even dead characters.
+        agility = [self.chars[index].agility for index in side_slots[row * 3:row * 3 + 3]
+                if index >= 0]
+        return sum(agility) / len(agility) if agility else 0.0
+
+    def _turn_order(self, side_slots, row, alive) -> tuple:
+        order = [index for index in side_slots[row * 3:row * 3 + 3]
+                if index >= 0 and alive >> index & 1]
+        order.sort(key=lambda index: self.chars[index].agility, reverse=True)
+        return tuple(order)
+
+    def _determine_target(self, position, side_slots, health, alive, mode) -> int:
+        """ Gets the position of the enemy a character in a position targets, or -1.
+        """
+        alive_mask = self._alive_mask(side_slots, alive)
+        candidates = TARGET_TABLE[position][alive_mask]
+
+        if candidates:
+            if mode == "Strong":
+                return max(candidates, key=lambda pos: health[side_slots[pos]])
+            if mode == "Weak":
+                return min(candidates, key=lambda pos: health[side_slots[pos]])
+            if mode == "Leader":
+                for pos in candidates:
+                    if self.chars[side_slots[pos]].is_leader:
+                        return pos
+
+        return FIRST_POSITION[alive_mask]
+
+    def _start_row(self, slots, alive, acted):
+        """ Works out which unit goes next and in what order, the same as
+            Battle.determine_turn_order_and_enemy_unit.
+        """
+        row_close = self._which_row_can_go(slots[CLOSE], alive, acted)
+        row_far = self._which_row_can_go(slots[FAR], alive, acted)
+
+        if row_close >= 0 and row_far >= 0:
+            # ties go to the close unit.
+            if self._agi_by_row(slots[CLOSE], row_close) >= self._agi_by_row(slots[FAR], row_far):
+                side, row = CLOSE, row_close
+            else:
+                side, row = FAR, row_far
+        elif row_close >= 0:
+            side, row = CLOSE, row_close
+        else:
+            side, row = FAR, row_far
+
+        return self._turn_order(slots[side], row, alive), side
+
+    #pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals # it's fine.
+    def _take_action(self, state, actor, side, target_pos, is_crit):
+        """ Gets the state after an actor hits the enemy in a position.
+        """
+        round_number, slots, health, alive, acted, pending, _ = state
+        enemy = 1 - side
+        enemy_slots = list(slots[enemy])
+        target = enemy_slots[target_pos]
+        row = slots[side].index(actor) // 3
+
+        if is_crit:
+            damage = self.chars[actor].crit_damage[row]
+            pushed_pos = target_pos + 3
+            if pushed_pos <= 8 and enemy_slots[pushed_pos] < 0:
+                enemy_slots[pushed_pos] = target
+                enemy_slots[target_pos] = -1
+        else:
+            damage = self.chars[actor].hit_damage[row]
+
+        health = list(health)
+        health[target] -= damage
+        if health[target] <= 0:
+            alive &= ~(1 << target)
+
+        new_slots = [None, None]
+        new_slots[enemy] = tuple(enemy_slots)
+        new_slots[side] = slots[side]
+        return (round_number, tuple(new_slots), tuple(health), alive, acted | 1 << actor,
+                pending[1:], side)
+
+    def _next_row(self, state):
+        """ Moves a state that's between rows on to the start of the next row, across round
+            ends, or to the end of the battle.
+
+            Returns:
+                The state at the start of the next row, or None if the battle is over, and the
+                final round number.
+        """
+        round_number, slots, health, alive, acted, _, _ = state
+        while self._round_finished(round_number, slots, alive, acted):
+            round_number += 1
+            acted = 0
+            if self._battle_finished(round_number, slots, alive, acted):
+                return None, round_number
+
+        pending, side = self._start_row(slots, alive, acted)
+        return (round_number, slots, health, alive, acted, pending, side), round_number
+
+    def run(self) -> dict:
+        """ Solves the battle from the start.
+
+            Returns:
+                A dict of (rounds, health, alive) -> probability.
+        """
+        round_number, slots, health, alive, acted, _, _ = self.start
+        if self._battle_finished(round_number, slots, alive, acted):
+            return {(0, health, alive): 1.0}
+
+        return self.solve(self.start)
+
+    def solve(self, state) -> dict:
+        """ Gets the distribution of outcomes from a state.
+
+            Returns:
+                A dict of (rounds, health, alive) -> probability.
+        """
+        known = self.table.get(state)
+        if known is not None:
+            return known
+
+        _, slots, health, alive, _, pending, side = state
+        target_pos = -1
+        if pending:
+            actor = pending[0]
+            position = slots[side].index(actor)
+            target_pos = self._determine_target(position, slots[1 - side], health, alive,
+                    self.targeting_modes[side])
+
+        if target_pos < 0:
+            # the row is over, or someone earlier in the row finished off the enemy unit.
+            next_state, round_number = self._next_row(state)
+            if next_state is None:
+                outcomes = {(round_number - 1, health, alive): 1.0}
+            else:
+                outcomes = self.solve(next_state)
+        else:
+            chance = self.chars[actor].crit_chance[position // 3]
+            outcomes = {}
+            for is_crit, probability in ((True, chance), (False, 1.0 - chance)):
+                if probability <= 0.0:
+                    continue
+                branch = self.solve(self._take_action(state, actor, side, target_pos, is_crit))
+                for outcome, branch_probability in branch.items():
+                    outcomes[outcome] = outcomes.get(outcome, 0.0) + \
+                            probability * branch_probability
+
+        self.table[state] = outcomes
+        return outcomes
+
+def solve_matchup(unit_close, unit_far) -> ExactResult:
+    """ Works out the exact outcome distribution of a battle between two units.
+
+        The number of states grows quickly with the number of characters and how many hits they
+        can take, so this is meant for small matchups. Use simulate_matchup for big ones.
+
+        Args:
+            unit_close (Unit): The close unit. It isn't changed.
+            unit_far (Unit): The far unit. It isn't changed.
+
+        Returns:
+            An ExactResult.
+    """
+    solver = _Solver(unit_close, unit_far)
+    outcomes = solver.run()
+
+    chars = [(char.side, char.char_id, char.char_name) for char in solver.chars]
+    return ExactResult(chars, outcomes, len(solver.table))
@@ -1,13 +1,85 @@
 """ game.py
 
-contains all the global information for the game, including units, chars and the like.
+contains all the information for a game, including units, chars and the like. Every Game keeps
+its own state, so any number of games can be loaded side by side in one process.
 
 """
 #pylint: disable=too-few-public-methods # This is fine.
 #pylint: disable=too-many-arguments # This is also fine.
 #pylint: disable=relative-beyond-top-level # Yes, still fine.
+import weakref
+from array import array
+from collections.abc import Mapping
 from .character import Character
-from .unit import Unit
+from .roster import Roster
+from .snapshot import read_snapshot, write_snapshot
+from .unit import Unit, UnitSlots
+
+class GameChars(Mapping):
+    """ The characters of a game by char_id, made from the games roster rows when they're asked
+        for rather than kept for every row.
+
+        A character in one of the games units is the one that unit holds. Any other character is
+        made the first time it's asked for and kept for as long as something else holds on to
+        it, so asking for the same char_id twice always gives the same Character. A row no one
+        is holding costs nothing beyond the roster.
+    """
+
+    def __init__(self, game):
+        self._game = game
+        self._loose = weakref.WeakValueDictionary()
+
+    def __getitem__(self, char_id):
+        game = self._game
+        if not isinstance(char_id, int) or not 0 < char_id <= game.char_index:
+            raise KeyError(char_id)
+
+        roster = game.roster
+        unit = game.units.get(roster.unit_id[char_id])
+        if unit is not None:
+            char = unit.unit_chars.get(roster.current_position[char_id])
+            if char is not None and char.char_id == char_id and char.roster is roster:
+                return char
+
+        char = self._loose.get(char_id)
+        if char is None:
+            char = Character.from_roster(roster, char_id, char_id)
+            self._loose[char_id] = char
+        return char
+
+    def __contains__(self, char_id):
+        return isinstance(char_id, int) and 0 < char_id <= self._game.char_index
+
+    def __iter__(self):
+        return iter(range(1, self._game.char_index + 1))
+
+    def __len__(self):
+        return self._game.char_index
+
+    def hold(self, chars):
+        """ Hands out characters that were just made, so asking for them gives these ones.
+
+            Args:
+                chars (iterable): The new Characters, each on the row of their char_id.
+        """
+        loose = self._loose
+        for char in chars:
+            loose[char.char_id] = char
+
+    def release(self, chars):
+        """ Stops keeping track of characters that a unit holds now, the unit is where they're
+            found from then on.
+
+            Args:
+                chars (iterable): The Characters put in a unit.
+        """
+        loose = self._loose
+        for char in chars:
+            loose.pop(char.char_id, None)
+
+        # a dict never shrinks as it empties, so an empty one is swapped for a new one.
+        if not loose:
+            self._loose = weakref.WeakValueDictionary()
 
 class Game():
     """ The game object stores information about the game state, such as what characters exist
@@ -16,39 +88,225 @@ class Game():
         Attributes:
             char_index (int): An int denoting class index
             unit_index (int): An int denoting current unit index.
-            chars (dict): A dict containing all the chars in this game.
+            chars (GameChars): All the chars in this game, by char_id. Works like a read only
+                dict, the characters are made from the roster when they're asked for.
             units (dict): A dict containing the units in this game.
+            roster (Roster): The stats of every char in this game, the row is the char_id.
+            chars_by_class (dict): The char_ids of the characters of each class, by class_id, as
+                an array.
+
+        Which characters are in each unit and which are dead is indexed by the roster, see
+        Roster.unit_rows and Roster.dead_rows, so it stays up to date however a character changes.
+        Classes are indexed when a character is created. Names are indexed the first time one is
+        looked up, see chars_by_name.
 
     """
-    char_index = 0
-    unit_index = 0
-    chars = {}
-    units = {}
 
     def __init__(self):
-        pass
+        self.char_index = 0
+        self.unit_index = 0
+        self.chars = GameChars(self)
+        self.units = {}
+        self.roster = Roster()
+        self.chars_by_class = {}
+        self._chars_by_name = None
 
-    @classmethod
-    def create_character(cls, name, char_class, agility, strength, health):
+    @property
+    def chars_by_name(self) -> dict:
+        """ The char_ids of the characters with each name. It costs more than the rest of a
+            character put together, so it's only made the first time it's asked for and kept up
+            to date from then on.
+        """
+        if self._chars_by_name is None:
+            self._chars_by_name = {}
+            self._index_names(self.chars)
+
+        return self._chars_by_name
+
+    def _index_names(self, char_ids):
+        """ Adds characters to the name index, reading their names from the roster.
+        """
+        by_name = self._chars_by_name
+        names = self.roster.names
+        for char_id in char_ids:
+            by_name.setdefault(names[char_id], []).append(char_id)
+
+    def _index_chars(self, char_ids):
+        """ Adds characters to the class index, and the name index once there is one, reading
+            them from the roster.
+        """
+        by_class = self.chars_by_class
+        classes = self.roster.classes
+        for char_id in char_ids:
+            class_id = classes[char_id].class_id
+            ids = by_class.get(class_id)
+            if ids is None:
+                ids = by_class[class_id] = array("I")
+            ids.append(char_id)
+
+        if self._chars_by_name is not None:
+            self._index_names(char_ids)
+
+    def create_character(self, name, char_class, agility, strength, health):
         """ Creates a character and adds the object to the games char dict.
         """
 
-        cls.char_index += 1
-        cls.chars[cls.char_index] = Character(name, char_class, cls.char_index,\
-                agility=agility, strength=strength, health=health)
-        return cls.chars[cls.char_index]
+        char = Character(name, char_class, self.char_index + 1, agility=agility,
+                strength=strength, health=health, roster=self.roster)
+        self.char_index += 1
+        self.chars.hold((char,))
+        self._index_chars((char.char_id,))
+        return char
 
-    @classmethod
-    def create_unit(cls, leader_char):
+    def create_unit(self, leader_char):
         """ Creates a character and adds the object to the games char dict.
         """
 
-        cls.unit_index += 1
-        cls.units[cls.unit_index] = Unit(leader_char, cls.unit_index)
-        return cls.units[cls.unit_index]
+        self.unit_index += 1
+        self.units[self.unit_index] = Unit(leader_char, self.unit_index)
+        self.chars.release((leader_char,))
+        return self.units[self.unit_index]
 
-    @classmethod
-    def get_unit_by_id(cls, unit_id):
+    def create_characters(self, names, char_classes, agility, strength, health) -> list:
+        """ Creates many characters at once. Their char_ids are handed out as one block and their
+            stats are written to the roster a column at a time.
+
+            Args:
+                names (list): The name of each character.
+                char_classes (list): The class of each character.
+                agility (list): The agility of each character.
+                strength (list): The strength of each character.
+                health (list): The health of each character.
+
+            Returns:
+                The new characters, in the order they were given.
+        """
+        count = len(names)
+        if not len(char_classes) == len(agility) == len(strength) == len(health) == count:
+            raise ValueError("every column needs a value for each character")
+
+        start = self.char_index + 1
+        char_ids = range(start, start + count)
+        self.roster.set_rows(start, health, agility, strength, list(names), list(char_classes))
+        chars = [Character.from_roster(self.roster, char_id, char_id) for char_id in char_ids]
+
+        self.char_index += count
+        self.chars.hold(chars)
+        self._index_chars(char_ids)
+        return chars
+
+    def create_units(self, formations, targeting_mode="Strong") -> list:
+        """ Creates many units at once, without printing anything. Every formation is checked
+            before any unit is made, so nothing is created if one of them is bad. Their unit_ids
+            are handed out as one block.
+
+            Args:
+                formations (list): A list of (char, position) pairs for each unit. The first
+                    character of a unit is its leader. The characters must not be in a unit yet.
+                targeting_mode (str): The targeting mode of every unit.
+
+            Returns:
+                The new units, in the order they were given.
+        """
+        placed = set()
+        for index, formation in enumerate(formations):
+            if not formation:
+                raise ValueError(f"unit {index} has no characters")
+
+            taken = set()
+            for char, position in formation:
+                if not 0 <= position <= 8 or position in taken:
+                    raise ValueError(f"unit {index} has a bad position {position}")
+                if char.unit_id != -1 or char.char_id in placed:
+                    raise ValueError(f"{char.char_name} is already in a unit")
+                taken.add(position)
+                placed.add(char.char_id)
+
+        units = []
+        for unit_id, formation in enumerate(formations, start=self.unit_index + 1):
+            for char, position in formation:
+                char.unit_id = unit_id
+                char.base_position = position
+
+            unit = Unit.from_slots(UnitSlots.filled({position: char for char, position
+                    in formation}), formation[0][0], unit_id, targeting_mode)
+            self.units[unit_id] = unit
+            units.append(unit)
+            self.chars.release(char for char, _ in formation)
+
+        self.unit_index += len(formations)
+        return units
+
+    def get_char_by_id(self, char_id):
+        """ Gets a character by id.
+
+            Args:
+                char_id (int): the id of the character we want to return
+
+            Returns:
+                The Character, or None if there isn't one with that id.
+        """
+        return self.chars.get(char_id)
+
+    def get_chars_by_name(self, name) -> list:
+        """ Gets every character with a name.
+
+            Args:
+                name (str): The name to look for.
+
+            Returns:
+                A list of Characters, in the order they were created.
+        """
+        return [self.chars[char_id] for char_id in self.chars_by_name.get(name, ())]
+
+    def get_chars_by_class(self, class_id) -> list:
+        """ Gets every character of a class.
+
+            Args:
+                class_id (int): The class_id of the class.
+
+            Returns:
+                A list of Characters, in the order they were created.
+        """
+        return [self.chars[char_id] for char_id in self.chars_by_class.get(class_id, ())]
+
+    def get_chars_in_unit(self, unit_id) -> list:
+        """ Gets every character in a unit.
+
+            Args:
+                unit_id (int): The id of the unit.
+
+            Returns:
+                A list of Characters, by char_id.
+        """
+        return [self.chars[row] for row in sorted(self.roster.unit_rows.get(unit_id, ()))]
+
+    def get_dead_chars(self) -> list:
+        """ Gets every character who has died.
+
+            Returns:
+                A list of Characters, by char_id.
+        """
+        return [self.chars[row] for row in sorted(self.roster.dead_rows)]
+
+    def get_alive_chars(self) -> list:
+        """ Gets every character who is still alive.
+
+            Returns:
+                A list of Characters, by char_id.
+        """
+        dead_rows = self.roster.dead_rows
+        return [self.chars[char_id] for char_id in self.chars if char_id not in dead_rows]
+
+    def count_alive(self) -> int:
+        """ Counts the characters still alive, without looking at any of them.
+
+            Returns:
+                The number of alive characters.
+        """
+        return len(self.chars) - len(self.roster.dead_rows)
+
+    def get_unit_by_id(self, unit_id):
         """ Gets a unit by id.
             Args:
                 unit_id (int): the id of the unit we want to return
@@ -57,7 +315,57 @@ class Game():
                 A unit object from our global dict of units.
 
         """
-        if unit_id in cls.units:
-            return cls.units[unit_id]
+        if unit_id in self.units:
+            return self.units[unit_id]
 
         return None
+
+    def snapshot(self) -> bytes:
+        """ Packs this whole game into bytes, see snapshot.py for the layout. A name too long to
+            pack whole raises a SnapshotError.
+
+            Returns:
+                The snapshot, which restore() can load into any game.
+        """
+        return write_snapshot(self)
+
+    def restore(self, data):
+        """ Replaces everything in this game with a snapshot. Characters and units from before
+            the restore are not part of this game any more. A snapshot that can't be read raises
+            a SnapshotError and leaves the game as it was.
+
+            Args:
+                data (bytes): A snapshot made by snapshot().
+        """
+        read_snapshot(self, data)
+        self.chars = GameChars(self)
+        self.chars_by_class = {}
+        self._chars_by_name = None
+        self._index_chars(self.chars)
+
+    def save(self, path):
+        """ Writes a snapshot of this game to a file.
+
+            Args:
+                path (str): The file to write.
+        """
+        with open(path, "wb") as snapshot_file:
+            snapshot_file.write(self.snapshot())
+
+    @classmethod
+    def load(cls, path):
+        """ Makes a new game from a snapshot file. A file that isn't a readable snapshot raises
+            a SnapshotError.
+
+            Args:
+                path (str): A file written by save().
+
+            Returns:
+                The loaded Game.
+        """
+        with open(path, "rb") as snapshot_file:
+            data = snapshot_file.read()
+
+        game = cls()
+        game.restore(data)
+        return game
@@ -0,0 +1,207 @@
+""" matchup_cache.py
+
+contains the matchup result cache. The same two units get simulated over and over, so results are
+kept, keyed on a canonical hash of each units set up and the seed and number of battles asked for.
+The most recently used results are kept in memory, and they can also be kept in a sqlite file so
+they last between runs.
+
+A units hash only covers what changes how a battle goes: the targeting mode, and for each
+position, the class, stats, status and whether the character there is the leader. Names and ids
+don't matter, so two units built the same way by different games get the same hash. Classes are
+hashed by what they do, their actions and number of actions in each row, not just their class_id,
+so editing catalog.toml doesn't leave old results in the sqlite file.
+
+Keys also carry CACHE_VERSION, which is bumped whenever a change to the engines or the random
+streams changes how the same battle plays out.
+
+"""
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+import hashlib
+import json
+import sqlite3
+from collections import OrderedDict
+from .catalog import ACTION_FIELDS
+from .simulator import MatchupResult, simulate_matchup
+from .vector_battle import simulate_matchup_vectorized
+
+# bump this when the same seed would give a different result, so old results are never used.
+CACHE_VERSION = 2
+
+# the options simulate passes on to each engine. None of them change the result.
+ENGINE_OPTIONS = {
+    "object": ("workers", "chunk_size"),
+    "vector": (),
+}
+
+def class_definition(char_class) -> tuple:
+    """ Gets everything about a class that changes how its characters fight.
+
+        Args:
+            char_class (CharClass): The class.
+
+        Returns:
+            A tuple of the class_id, then the number of actions and every value of the action for
+            each row.
+    """
+    return (char_class.class_id,) + tuple((char_class.num_actions[row],
+            tuple(getattr(char_class.actions[row], field, None) for field in ACTION_FIELDS))
+            for row in range(3))
+
+def unit_hash(unit) -> str:
+    """ Works out the canonical hash of a units set up.
+
+        Args:
+            unit (Unit): The unit to hash.
+
+        Returns:
+            A hex string. Units that fight the same way have the same hash.
+    """
+    parts = [unit.targeting_mode]
+    for position, char in unit.unit_chars.items():
+        if char is None:
+            continue
+
+        parts.append((position, class_definition(char.char_class), char.max_health, char.health,
+                char.agility, char.strength, char.is_alive, char.status,
+                char is unit.unit_leader))
+
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+class MatchupCache():
+    """ Keeps simulated matchup results so the same matchup is never simulated twice.
+
+        Attributes:
+            max_entries (int): The most results kept in memory. The least recently used result
+                is dropped first.
+            path (str): The sqlite file results are also kept in, or None to only use memory.
+            hits (int): How many lookups found a result.
+            misses (int): How many lookups had to simulate.
+
+    """
+
+    def __init__(self, max_entries=1024, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._db = None
+
+        if path is not None:
+            self._db = sqlite3.connect(path)
+            self._db.execute("CREATE TABLE IF NOT EXISTS matchups (key TEXT PRIMARY KEY, "
+                    "result TEXT NOT NULL)")
+            self._db.commit()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def close(self):
+        """ Closes the sqlite file, if there is one.
+        """
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    @staticmethod
+    def make_key(unit_close, unit_far, num_battles, seed, engine) -> str:
+        """ Gets the key a matchup is stored under.
+
+            Args:
+                unit_close (Unit): The close unit.
+                unit_far (Unit): The far unit.
+                num_battles (int): How many battles were simulated.
+                seed (int): The root seed, or None for any seed.
+                engine (str): Which simulator was used. The engines draw random numbers
+                    differently, so the same seed gives different results on each.
+
+            Returns:
+                The key, as a string.
+        """
+        return f"v{CACHE_VERSION}:{unit_hash(unit_close)}:{unit_hash(unit_far)}:{num_battles}:" \
+                f"{seed}:{engine}"
+
+    def get(self, key):
+        """ Looks up a result, in memory first and then in the sqlite file.
+
+            Args:
+                key (str): The key from make_key.
+
+            Returns:
+                The MatchupResult, or None if it isn't cached.
+        """
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+            return result
+
+        if self._db is not None:
+            row = self._db.execute("SELECT result FROM matchups WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                result = MatchupResult.from_dict(json.loads(row[0]))
+                self._remember(key, result)
+                return result
+
+        return None
+
+    def put(self, key, result):
+        """ Stores a result, in memory and in the sqlite file.
+
+            Args:
+                key (str): The key from make_key.
+                result (MatchupResult): The result to store.
+        """
+        self._remember(key, result)
+        if self._db is not None:
+            self._db.execute("INSERT OR REPLACE INTO matchups (key, result) VALUES (?, ?)",
+                    (key, json.dumps(result.as_dict())))
+            self._db.commit()
+
+    def _remember(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    #pylint: disable=too-many-arguments,too-many-positional-arguments # this is fine.
+    def simulate(self, unit_close, unit_far, num_battles, seed=None, vectorized=False,
+            **options) -> MatchupResult:
+        """ Simulates a matchup, or gets the result from the cache if it's been simulated before.
+
+            With no seed, any earlier result of the same matchup and number of battles is good
+            enough, whatever seed it was made with.
+
+            Args:
+                unit_close (Unit): The close unit.
+                unit_far (Unit): The far unit.
+                num_battles (int): How many battles to simulate.
+                seed (int): The root seed.
+                vectorized (bool): Use simulate_matchup_vectorized instead of simulate_matchup.
+                options: Passed on to the simulator, see ENGINE_OPTIONS for which ones each
+                    engine takes: workers and chunk_size for simulate_matchup, none for
+                    simulate_matchup_vectorized. Any other option raises a TypeError, even on a
+                    hit. They don't change the result, so they aren't part of the key.
+
+            Returns:
+                The MatchupResult. Don't change it, it's the one in the cache.
+        """
+        engine = "vector" if vectorized else "object"
+        unknown = sorted(set(options) - set(ENGINE_OPTIONS[engine]))
+        if unknown:
+            raise TypeError(f"the {engine} engine doesn't take {', '.join(unknown)}")
+
+        key = self.make_key(unit_close, unit_far, num_battles, seed, engine)
+        result = self.get(key)
+        if result is not None:
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        if vectorized:
+            result = simulate_matchup_vectorized(unit_close, unit_far, num_battles, seed=seed,
+                    **options)
+        else:
+            result = simulate_matchup(unit_close, unit_far, num_battles, seed=seed, **options)
+
+        self.put(key, result)
+        return result
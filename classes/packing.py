@@ -0,0 +1,72 @@
+""" packing.py
+
+contains the helpers shared by the binary formats (snapshot.py and replay.py) for packing
+strings, like character names, as a length followed by utf-8. pack_name uses one length byte and
+cuts longer strings short, which suits a replay. pack_text uses two and never cuts anything, for
+a snapshot that has to give back exactly what went into it.
+
+"""
+import struct
+
+_TEXT_LENGTH = struct.Struct("<H")
+
+def pack_name(name) -> bytes:
+    """ Packs a string as one length byte and up to 255 bytes of utf-8. Longer strings are cut
+        short between characters, never part way through one.
+
+        Args:
+            name (object): The string, anything else is packed as str(name).
+
+        Returns:
+            The packed bytes.
+    """
+    encoded = str(name).encode("utf-8")
+    if len(encoded) > 255:
+        encoded = encoded[:255].decode("utf-8", "ignore").encode("utf-8")
+
+    return bytes((len(encoded),)) + encoded
+
+def unpack_name(data, offset) -> tuple:
+    """ Unpacks a string packed by pack_name.
+
+        Args:
+            data (bytes): The bytes it was packed into.
+            offset (int): Where its length byte is.
+
+        Returns:
+            The string and the offset just after it.
+    """
+    length = data[offset]
+    return data[offset + 1:offset + 1 + length].decode("utf-8"), offset + 1 + length
+
+def pack_text(text) -> bytes:
+    """ Packs a string as a two byte length and its utf-8, whole.
+
+        Args:
+            text (object): The string, anything else is packed as str(text).
+
+        Returns:
+            The packed bytes.
+    """
+    encoded = str(text).encode("utf-8")
+    if len(encoded) > 0xFFFF:
+        raise ValueError(f"{len(encoded)} bytes is too long to pack, the most is 65535")
+
+    return _TEXT_LENGTH.pack(len(encoded)) + encoded
+
+def unpack_text(data, offset) -> tuple:
+    """ Unpacks a string packed by pack_text.
+
+        Args:
+            data (bytes): The bytes it was packed into.
+            offset (int): Where its length is.
+
+        Returns:
+            The string and the offset just after it.
+    """
+    (length,) = _TEXT_LENGTH.unpack_from(data, offset)
+    start = offset + _TEXT_LENGTH.size
+    if start + length > len(data):
+        raise ValueError(f"text at {offset} runs past the end of the data")
+
+    return data[start:start + length].decode("utf-8"), start + length
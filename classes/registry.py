@@ -0,0 +1,190 @@
+""" registry.py
+
+contains the registry of character classes and actions. Classes and actions don't hold any state
+of their own, so there is only ever one of each: calling KnightClass() or SlashAction() hands
+back the shared instance instead of building a new one, and a roster of 100k knights shares one
+KnightClass and one SlashAction between all of them.
+
+Every class has a class_id and every action an action_id, and the registry is keyed on those, so
+snapshots, replays and the battle engines can refer to a class or action by a plain int. The
+classes and actions themselves are defined in catalog.toml, see catalog.py.
+
+"""
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+import functools
+import types
+from collections import namedtuple
+
+# class_id -> the shared instance of that class.
+CLASSES = {}
+
+# action_id -> the shared instance of that action.
+ACTIONS = {}
+
+class RegistryError(LookupError):
+    """ Raised when there's no class or action with some id or name.
+    """
+
+class Flyweight():
+    """ A class with one shared, read only instance. Calling the class gives back that instance.
+
+        Subclasses keep everything in class attributes and declare an empty __slots__, so nothing
+        can be set on the instance. Copies and pickles of it come back as the shared instance too.
+
+    """
+    #pylint: disable=too-few-public-methods # This is fine.
+    __slots__ = ()
+    _instances = {}
+
+    def __new__(cls):
+        instance = Flyweight._instances.get(cls)
+        if instance is None:
+            instance = Flyweight._instances[cls] = super().__new__(cls)
+
+        return instance
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+def frozen(mapping):
+    """ Makes a read only view of a dict, for the row tables on a class.
+    """
+    return types.MappingProxyType(dict(mapping))
+
+def register_action(action_class):
+    """ Adds an action to the registry. Can be used as a class decorator.
+
+        Args:
+            action_class (type): The action, a Flyweight with a unique action_id.
+
+        Returns:
+            The action class, unchanged.
+    """
+    _register(ACTIONS, "action_id", action_class)
+    return action_class
+
+def register_class(char_class):
+    """ Adds a character class to the registry. Can be used as a class decorator.
+
+        Args:
+            char_class (type): The class, a Flyweight with a unique class_id and name.
+
+        Returns:
+            The character class, unchanged.
+    """
+    _register(CLASSES, "class_id", char_class)
+    return char_class
+
+def _register(registry, id_name, flyweight):
+    key = getattr(flyweight, id_name)
+    existing = registry.get(key)
+    if existing is not None and not isinstance(existing, flyweight):
+        raise ValueError(f"{id_name} {key} is already used by {type(existing).__name__}")
+
+    registry[key] = flyweight()
+
+def _load_builtins():
+    """ Loads the classes and actions that come with the game from catalog.toml, which registers
+        them.
+    """
+    #pylint: disable=import-outside-toplevel,cyclic-import # the catalog needs the registry.
+    from .catalog import default_catalog
+    default_catalog()
+
+def get_class(class_id):
+    """ Gets a character class by its id.
+
+        Args:
+            class_id (int): The id of the class.
+
+        Returns:
+            The shared instance of the class.
+    """
+    _load_builtins()
+    try:
+        return CLASSES[class_id]
+    except KeyError:
+        raise RegistryError(f"unknown class_id {class_id}") from None
+
+def get_class_by_name(name):
+    """ Gets a character class by its name, like "Knight".
+
+        Args:
+            name (str): The name of the class.
+
+        Returns:
+            The shared instance of the class.
+    """
+    _load_builtins()
+    for char_class in CLASSES.values():
+        if char_class.name == name:
+            return char_class
+
+    raise RegistryError(f"unknown class {name!r}")
+
+def get_action(action_id):
+    """ Gets an action by its id.
+
+        Args:
+            action_id (int): The id of the action.
+
+        Returns:
+            The shared instance of the action.
+    """
+    _load_builtins()
+    try:
+        return ACTIONS[action_id]
+    except KeyError:
+        raise RegistryError(f"unknown action_id {action_id}") from None
+
+class ClassRows(namedtuple("ClassRows", ("num_actions", "crit_rates", "can_crit", "action_ids",
+        "damage", "damage_stats", "crit_multipliers"))):
+    """ The row tables of a class, for the battle engines. Every field is a tuple with one entry
+        per row, front row first.
+
+        Attributes:
+            num_actions (tuple): How many actions the class gets in each row.
+            crit_rates (tuple): The crit rate of the action used in each row.
+            can_crit (tuple): Can the action used in each row crit at all?
+            action_ids (tuple): The action_id of the action used in each row.
+            damage (tuple): The flat damage of the action used in each row.
+            damage_stats (tuple): The stat each rows action adds to its damage.
+            crit_multipliers (tuple): What each rows damage is multiplied by on a crit.
+
+    """
+    __slots__ = ()
+
+    def damage_for(self, char):
+        """ Works out how hard a character hits from each row. Stats don't change in a battle, so
+            engines can do this once per character.
+
+            Args:
+                char (Character): A character of this class.
+
+            Returns:
+                (hit damage, crit damage), each a tuple with one entry per row.
+        """
+        hits = tuple(damage + getattr(char, stat) for damage, stat in
+                zip(self.damage, self.damage_stats))
+        crits = tuple(hit * multiplier for hit, multiplier in zip(hits, self.crit_multipliers))
+        return hits, crits
+
+@functools.lru_cache(maxsize=None)
+def class_rows(class_id):
+    """ Gets the row tables of a class as plain tuples, for the battle engines. Classes never
+        change, so this is only worked out once per class.
+
+        Args:
+            class_id (int): The id of the class.
+
+        Returns:
+            The ClassRows of the class.
+    """
+    char_class = get_class(class_id)
+    actions = [char_class.actions[row] for row in range(3)]
+    return ClassRows(tuple(char_class.num_actions[row] for row in range(3)),
+            *(tuple(getattr(action, name) for action in actions) for name in
+            ("crit_rate", "can_crit", "action_id", "damage", "damage_stat", "crit_multiplier")))
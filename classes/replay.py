@@ -0,0 +1,321 @@
+""" replay.py
+
+contains the compact binary battle log, and the player that reads it back. A ReplayWriter is a
+battle sink (see battle_sinks.py) that packs every event into a few bytes, and play_replay feeds a
+recorded battle back into any sink, so the console output can be shown again, at any speed,
+without running the battle again.
+
+A log is any number of battles one after another. Each battle is a frame:
+
+    frame:      magic "OGRB", version (B), body length (I)
+    body:       header, characters, action names, events
+    header:     seed (Q), close unit id (i), far unit id (i), close leader id (I),
+                far leader id (I)
+    characters: count (B), then for each: char_id (I), side (B), position (B), health (i),
+                name length (B), name (utf-8)
+    actions:    count (B), then for each: action id (B), name length (B), name (utf-8)
+    events:     a kind byte, then the fields of that kind of event. Crits and the end of each
+                round aren't written, playback works them out from the flags and the next event:
+        ROUND_START:    round (H)
+        ROW_END:        nothing
+        ACTION:         actor (B), action id (B), target (B), flags (B, 1 = crit, 2 = death),
+                        damage (i). The actor and target are indexes into the characters.
+        UNIT_CRUSHED:   side (B)
+        BATTLE_END:     round (H)
+
+Everything is little endian.
+
+"""
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+import struct
+import time
+from types import SimpleNamespace
+from .battle import Battle
+from .battle_sinks import ConsoleSink
+from .packing import pack_name, unpack_name
+
+MAGIC = b"OGRB"
+VERSION = 1
+
+ROUND_START = 1
+ROW_END = 2
+ACTION = 3
+UNIT_CRUSHED = 4
+BATTLE_END = 5
+
+CRIT = 1
+DEATH = 2
+
+CLOSE = 0
+FAR = 1
+
+_FRAME = struct.Struct("<4sBI")
+_HEADER = struct.Struct("<QiiII")
+_CHAR = struct.Struct("<IBBi")
+_EVENTS = {
+    ROUND_START: struct.Struct("<BH"),
+    ROW_END: struct.Struct("<B"),
+    ACTION: struct.Struct("<BBBBBi"),
+    UNIT_CRUSHED: struct.Struct("<BB"),
+    BATTLE_END: struct.Struct("<BH"),
+}
+
+class ReplayError(Exception):
+    """ Raised when a replay log can't be read.
+    """
+
+#pylint: disable=too-many-instance-attributes,too-few-public-methods # this is okay.
+class ReplayWriter():
+    """ A battle sink that writes each battle to a stream as a compact binary frame.
+
+        Attributes:
+            stream (file): A binary file-like object the frames are written to.
+            battles (int): How many battles have been written.
+
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.battles = 0
+        self._events = bytearray()
+        self._header = b""
+        self._chars = []
+        self._actions = {}
+        self._sides = {}
+        self._indexes = {}
+        self._pending = None
+
+    def emit(self, kind, **fields):
+        """ Records an event.
+
+            Args:
+                kind (str): The kind of event.
+                fields: The fields of the event.
+        """
+        handler = getattr(self, f"_on_{kind}", None)
+        if handler is not None:
+            handler(**fields)
+
+    def _on_battle_start(self, unit_close, unit_far, seed):
+        self._events = bytearray()
+        self._chars = []
+        self._actions = {}
+        self._sides = {id(unit_close): CLOSE, id(unit_far): FAR}
+        self._indexes = {}
+        self._header = _HEADER.pack(seed % 2**64, unit_close.unit_id, unit_far.unit_id,
+                unit_close.unit_leader.char_id, unit_far.unit_leader.char_id)
+
+        for side, unit in ((CLOSE, unit_close), (FAR, unit_far)):
+            for position, char in unit.unit_chars.items():
+                if char is not None:
+                    self._indexes[id(char)] = len(self._chars)
+                    self._chars.append(_CHAR.pack(char.char_id, side, position, char.health)
+                            + pack_name(char.char_name))
+
+    def _on_round_start(self, round_number):
+        self._events += _EVENTS[ROUND_START].pack(ROUND_START, round_number)
+
+    def _on_action(self, actor, action, target):
+        action_id = getattr(action, "action_id", 0)
+        if action_id not in self._actions:
+            self._actions[action_id] = bytes((action_id,)) + pack_name(action)
+
+        self._pending = [self._indexes[id(actor)], action_id, self._indexes[id(target)], 0, 0]
+
+    #pylint: disable=too-many-arguments # one keyword per event field, it's fine.
+    def _on_damage(self, actor, target, damage, is_crit, health):
+        #pylint: disable=unused-argument # health is worked out again on playback.
+        self._pending[2] = self._indexes[id(target)]
+        self._pending[4] = damage
+        if is_crit:
+            self._pending[3] |= CRIT
+
+    def _on_death(self, target):
+        #pylint: disable=unused-argument # the death always belongs to the pending action.
+        self._pending[3] |= DEATH
+
+    def _on_action_end(self, actor):
+        #pylint: disable=unused-argument # the pending action already knows who acted.
+        self._events += _EVENTS[ACTION].pack(ACTION, *self._pending)
+        self._pending = None
+
+    def _on_row_end(self, round_number):
+        #pylint: disable=unused-argument # rows always end in the current round.
+        self._events += _EVENTS[ROW_END].pack(ROW_END)
+
+    def _on_unit_crushed(self, unit):
+        self._events += _EVENTS[UNIT_CRUSHED].pack(UNIT_CRUSHED, self._sides[id(unit)])
+
+    def _on_battle_end(self, round_number):
+        self._events += _EVENTS[BATTLE_END].pack(BATTLE_END, round_number)
+
+        body = bytearray(self._header)
+        body += bytes((len(self._chars),))
+        body += b"".join(self._chars)
+        body += bytes((len(self._actions),))
+        body += b"".join(self._actions.values())
+        body += self._events
+
+        self.stream.write(_FRAME.pack(MAGIC, VERSION, len(body)))
+        self.stream.write(body)
+        self.battles += 1
+
+#pylint: disable=too-few-public-methods # This is fine.
+class BattleReplay():
+    """ One recorded battle.
+
+        Attributes:
+            seed (int): The seed the battle was fought with.
+            unit_ids (tuple): The ids of the close and far units.
+            leader_ids (tuple): The char_ids of the close and far unit leaders.
+            chars (list): (char_id, name, side, position, starting health) for every character.
+            actions (dict): action id -> action name.
+            events (bytes): The packed events. Use iter_events() to read them.
+
+    """
+
+    #pylint: disable=too-many-arguments,too-many-positional-arguments # this is fine.
+    def __init__(self, seed, unit_ids, leader_ids, chars, actions, events):
+        self.seed = seed
+        self.unit_ids = unit_ids
+        self.leader_ids = leader_ids
+        self.chars = chars
+        self.actions = actions
+        self.events = events
+
+    def iter_events(self):
+        """ Unpacks the events of this battle one at a time.
+
+            Yields:
+                Tuples starting with the kind of event, followed by its fields.
+        """
+        events = self.events
+        offset = 0
+        while offset < len(events):
+            layout = _EVENTS.get(events[offset])
+            if layout is None:
+                raise ReplayError(f"unknown event kind {events[offset]} at byte {offset}")
+
+            yield layout.unpack_from(events, offset)
+            offset += layout.size
+
+def _parse_body(body) -> BattleReplay:
+    #pylint: disable=too-many-locals # one per header field, it reads better.
+    seed, close_id, far_id, close_leader, far_leader = _HEADER.unpack_from(body, 0)
+    offset = _HEADER.size
+
+    chars = []
+    num_chars = body[offset]
+    offset += 1
+    for _ in range(num_chars):
+        char_id, side, position, health = _CHAR.unpack_from(body, offset)
+        name, offset = unpack_name(body, offset + _CHAR.size)
+        chars.append((char_id, name, side, position, health))
+
+    actions = {}
+    num_actions = body[offset]
+    offset += 1
+    for _ in range(num_actions):
+        action_id = body[offset]
+        actions[action_id], offset = unpack_name(body, offset + 1)
+
+    return BattleReplay(seed, (close_id, far_id), (close_leader, far_leader), chars, actions,
+            bytes(body[offset:]))
+
+def read_replays(stream):
+    """ Reads recorded battles from a stream, one frame at a time.
+
+        Args:
+            stream (file): A binary file-like object with one or more frames in it.
+
+        Yields:
+            A BattleReplay for each battle in the stream.
+    """
+    while True:
+        frame = stream.read(_FRAME.size)
+        if not frame:
+            return
+
+        if len(frame) < _FRAME.size:
+            raise ReplayError("truncated frame header")
+
+        magic, version, length = _FRAME.unpack(frame)
+        if magic != MAGIC or version != VERSION:
+            raise ReplayError(f"not a battle replay frame: {magic!r} version {version}")
+
+        body = stream.read(length)
+        if len(body) < length:
+            raise ReplayError("truncated frame body")
+
+        yield _parse_body(body)
+
+#pylint: disable=too-many-locals # this is fine.
+def play_replay(replay, sink=None, speed=None):
+    """ Plays a recorded battle back into a sink, as if it was being fought again.
+
+        Args:
+            replay (BattleReplay): The battle to play back.
+            sink (object): Where the events go. Defaults to a ConsoleSink, which prints the same
+                text the battle printed when it was fought.
+            speed (float): How fast to play, 1 is the speed battles are normally fought at and 2
+                is twice as fast. None plays it back with no pauses at all.
+    """
+    if sink is None:
+        sink = ConsoleSink()
+
+    chars = [SimpleNamespace(char_name=name, char_id=char_id)
+            for char_id, name, _, _, _ in replay.chars]
+    health = [start for _, _, _, _, start in replay.chars]
+    by_id = {char.char_id: char for char in chars}
+    actions = {action_id: _ReplayAction(action_id, name)
+            for action_id, name in replay.actions.items()}
+    units = [SimpleNamespace(unit_id=unit_id, unit_leader=by_id.get(leader_id))
+            for unit_id, leader_id in zip(replay.unit_ids, replay.leader_ids)]
+    row_delay = None if speed is None else Battle.row_delay_seconds / speed
+
+    sink.emit("battle_start", unit_close=units[CLOSE], unit_far=units[FAR], seed=replay.seed)
+    round_number = None
+    for event in replay.iter_events():
+        kind = event[0]
+        if kind == ACTION:
+            _, actor_index, action_id, target_index, flags, damage = event
+            actor, target = chars[actor_index], chars[target_index]
+            health[target_index] -= damage
+
+            sink.emit("action", actor=actor, action=actions[action_id], target=target)
+            if flags & CRIT:
+                sink.emit("crit", actor=actor, target=target)
+            sink.emit("damage", actor=actor, target=target, damage=damage,
+                    is_crit=bool(flags & CRIT), health=health[target_index])
+            if flags & DEATH:
+                sink.emit("death", target=target)
+            sink.emit("action_end", actor=actor)
+        elif kind == ROW_END:
+            sink.emit("row_end", round_number=round_number)
+            if row_delay:
+                time.sleep(row_delay)
+        else:
+            # rounds end aren't recorded, a round ends when the next starts or the battle does.
+            if round_number is not None:
+                sink.emit("round_end", round_number=round_number)
+                round_number = None
+
+            if kind == ROUND_START:
+                round_number = event[1]
+                sink.emit("round_start", round_number=round_number)
+            elif kind == UNIT_CRUSHED:
+                sink.emit("unit_crushed", unit=units[event[1]])
+            elif kind == BATTLE_END:
+                sink.emit("battle_end", round_number=event[1])
+
+class _ReplayAction():
+    """ Stands in for the action a character used, it prints the same way.
+    """
+    #pylint: disable=too-few-public-methods # This is fine.
+
+    def __init__(self, action_id, description):
+        self.action_id = action_id
+        self.description = description
+
+    def __str__(self):
+        return f"{self.description}"
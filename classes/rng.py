@@ -0,0 +1,112 @@
+""" rng.py
+
+contains the random number streams battles draw from. Every battle owns a stream made from a seed,
+so any battle can be run again exactly by using the same seed. A stream can hand out child
+streams, each with a seed worked out from the parents seed and the childs index, so battles run
+in different worker processes never share random numbers and don't depend on which worker ran them.
+
+"""
+import hashlib
+import itertools
+import random
+import numpy as np
+
+def derive_seed(seed, index) -> int:
+    """ Works out the seed of a child stream.
+
+        Args:
+            seed (int): The seed of the parent stream.
+            index (int): The index of the child.
+
+        Returns:
+            A 64 bit seed for the child stream.
+    """
+    digest = hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+def _hashed_block(seed, count) -> list:
+    """ Works out the first numbers of a stream from its seed with one hash, which is much
+        quicker than setting up a generator for the few rolls most battles need.
+
+        Args:
+            seed (int): The seed of the stream.
+            count (int): How many numbers.
+
+        Returns:
+            A list of floats in [0, 1).
+    """
+    data = hashlib.shake_256(f"{seed}".encode()).digest(count * 8)
+    # the top 53 bits of each 64 bit word make a float, the same way numpy and random do.
+    words = np.frombuffer(data, dtype="<u8") >> np.uint64(11)
+    return (words * 2.0 ** -53).tolist()
+
+class RngStream():
+    """ A seeded stream of uniform random numbers in [0, 1).
+
+        Numbers are drawn a block at a time, and uniform() reads the next one straight out of the
+        blocks with a single call. Most battles only need a handful of rolls, so the
+        first first_buffer_size numbers come from hashing the seed, with nothing to set up. A
+        stream that needs more than that draws the rest buffer_size at a time from a numpy
+        generator seeded from this streams seed. The numbers are the same whatever buffer_size is.
+
+        Attributes:
+            seed (int): The seed of this stream. If no seed is given one is picked at random, so a
+                stream can always be made again.
+            buffer_size (int): How many numbers are drawn at a time after the first ones.
+
+    """
+    buffer_size = 1024
+    first_buffer_size = 32
+
+    def __init__(self, seed=None, buffer_size=None):
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+
+        self.seed = seed
+        if buffer_size is not None:
+            self.buffer_size = buffer_size
+
+        self._next = itertools.chain.from_iterable(self._blocks()).__next__
+
+    def uniform(self) -> float:
+        """ Takes the next number from the stream.
+
+            Returns:
+                A float in [0, 1).
+        """
+        return self._next()
+
+    def _blocks(self):
+        """ Draws the blocks of numbers, each one as it's needed.
+
+            Yields:
+                Lists of floats in [0, 1).
+        """
+        yield _hashed_block(self.seed, self.first_buffer_size)
+
+        generator = np.random.default_rng(derive_seed(self.seed, "more"))
+        while True:
+            yield generator.random(self.buffer_size).tolist()
+
+    def child(self, index):
+        """ Makes an independent child stream.
+
+            Args:
+                index (int): Which child. The same index always gives the same stream.
+
+            Returns:
+                A new RngStream.
+        """
+        return RngStream(derive_seed(self.seed, index), buffer_size=self.buffer_size)
+
+    def spawn(self, count, start=0) -> list:
+        """ Makes a number of child streams, one for each worker or battle.
+
+            Args:
+                count (int): How many streams to make.
+                start (int): The index of the first child.
+
+            Returns:
+                A list of RngStreams.
+        """
+        return [self.child(index) for index in range(start, start + count)]
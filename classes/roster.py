@@ -0,0 +1,285 @@
+""" roster.py
+
+contains the roster, the compact store for character stats. Every stat lives in its own typed
+array, and a character is a row across all of them. Game keeps one roster for all its characters
+and uses the char_id as the row, so row n is always character n. The name and class of each row
+don't fit in a typed array, so they're kept in plain lists alongside.
+
+"""
+from array import array
+
+#pylint: disable=too-many-instance-attributes # one array per stat, this is fine.
+class Roster():
+    """ Contains the stats of many characters, one typed array per stat.
+
+        Attributes:
+            health (array): The current health of each character.
+            max_health (array): The maximum health of each character.
+            agility (array): The agility of each character.
+            strength (array): The strength of each character.
+            unit_id (array): The ID of the unit each character is in, or -1 for no unit.
+            base_position (array): The position each character is placed in within their unit.
+            current_position (array): The position each character is in right now.
+            is_alive (array): 1 if the character is alive, 0 if not.
+            has_acted (array): 1 if the character has performed an action this round.
+            status (array): The status of each character, as an index into statuses.
+            names (list): The name of each character, or None for an unused row.
+            classes (list): The class of each character, or None for an unused row.
+            statuses (list): Every status a character in this roster has had. Index 0 is no
+                status.
+            unit_rows (dict): The rows in each unit, kept up to date by set_unit. The key is the
+                unit_id and the value is a set of rows.
+            dead_rows (set): The rows of characters who have died, kept up to date by set_alive
+                and restore.
+
+    """
+    # stat name -> typecode and the value an unused row has.
+    fields = {
+        "health": ("i", 0),
+        "max_health": ("i", 0),
+        "agility": ("i", 0),
+        "strength": ("i", 0),
+        "unit_id": ("i", -1),
+        "base_position": ("b", 0),
+        "current_position": ("b", 0),
+        "is_alive": ("B", 0),
+        "has_acted": ("B", 0),
+        "status": ("B", 0),
+    }
+
+    def __init__(self):
+        self.health = array(self.fields["health"][0])
+        self.max_health = array(self.fields["max_health"][0])
+        self.agility = array(self.fields["agility"][0])
+        self.strength = array(self.fields["strength"][0])
+        self.unit_id = array(self.fields["unit_id"][0])
+        self.base_position = array(self.fields["base_position"][0])
+        self.current_position = array(self.fields["current_position"][0])
+        self.is_alive = array(self.fields["is_alive"][0])
+        self.has_acted = array(self.fields["has_acted"][0])
+        self.status = array(self.fields["status"][0])
+        self.names = []
+        self.classes = []
+
+        self.statuses = [None]
+        self._status_codes = {None: 0}
+        self.unit_rows = {}
+        self.dead_rows = set()
+
+    @classmethod
+    def stat_range(cls, name) -> tuple:
+        """ Gets the smallest and largest value a stat can hold.
+
+            Args:
+                name (str): The stat, one of fields.
+
+            Returns:
+                (lowest, highest), both included.
+        """
+        typecode = cls.fields[name][0]
+        bits = array(typecode).itemsize * 8
+        if typecode.isupper():
+            return 0, (1 << bits) - 1
+
+        return -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+
+    def __len__(self):
+        return len(self.health)
+
+    def _grow(self, size):
+        """ Adds fresh rows until the roster has at least size rows.
+        """
+        missing = size - len(self)
+        if missing <= 0:
+            return
+
+        for name, (_, empty) in self.fields.items():
+            getattr(self, name).extend([empty] * missing)
+        self.names.extend([None] * missing)
+        self.classes.extend([None] * missing)
+
+    #pylint: disable=too-many-arguments,too-many-positional-arguments # this is fine.
+    def set_row(self, row, health=0, agility=0, strength=0, name=None, char_class=None):
+        """ Sets up a row for a new character, adding rows to the roster if needed.
+
+            Args:
+                row (int): The row to set up. Game uses the char_id.
+                health (int): The max health of the character. They start at full health.
+                agility (int): The agility of the character.
+                strength (int): The strength of the character.
+                name (str): The name of the character.
+                char_class (obj): What class the character is.
+        """
+        self._grow(row + 1)
+        self._unindex(range(row, row + 1))
+        for field, (_, empty) in self.fields.items():
+            getattr(self, field)[row] = empty
+
+        self.health[row] = health
+        self.max_health[row] = health
+        self.agility[row] = agility
+        self.strength[row] = strength
+        self.is_alive[row] = 1
+        self.names[row] = name
+        self.classes[row] = char_class
+
+    #pylint: disable=too-many-arguments,too-many-positional-arguments # this is fine.
+    def set_rows(self, start, health, agility, strength, names=None, classes=None):
+        """ Sets up a block of rows for new characters at once, the same as calling set_row for
+            each of them.
+
+            Args:
+                start (int): The first row to set up.
+                health (list): The max health of each character. They start at full health.
+                agility (list): The agility of each character.
+                strength (list): The strength of each character.
+                names (list): The name of each character. Defaults to None for all of them.
+                classes (list): The class of each character. Defaults to None for all of them.
+        """
+        # made before anything is touched, so a bad value leaves the roster as it was.
+        health = array(self.health.typecode, health)
+        agility = array(self.agility.typecode, agility)
+        strength = array(self.strength.typecode, strength)
+
+        count = len(health)
+        end = start + count
+        self._grow(end)
+        self._unindex(range(start, end))
+        for name, (typecode, empty) in self.fields.items():
+            getattr(self, name)[start:end] = array(typecode, [empty]) * count
+
+        self.health[start:end] = health
+        self.max_health[start:end] = health
+        self.agility[start:end] = agility
+        self.strength[start:end] = strength
+        self.is_alive[start:end] = array(self.is_alive.typecode, [1]) * count
+        self.names[start:end] = [None] * count if names is None else names
+        self.classes[start:end] = [None] * count if classes is None else classes
+
+    def _unindex(self, rows):
+        """ Takes rows that are about to be set up again out of the indexes.
+        """
+        if self.dead_rows:
+            self.dead_rows.difference_update(rows)
+        if self.unit_rows:
+            for row in rows:
+                self.set_unit(row, -1)
+
+    def set_unit(self, row, unit_id):
+        """ Puts a character in a unit, keeping unit_rows up to date.
+
+            Args:
+                row (int): The row of the character.
+                unit_id (int): The unit they're in now, or -1 for no unit.
+        """
+        old_unit_id = self.unit_id[row]
+        if old_unit_id == unit_id:
+            return
+
+        rows = self.unit_rows.get(old_unit_id)
+        if rows is not None:
+            rows.discard(row)
+            if not rows:
+                del self.unit_rows[old_unit_id]
+
+        self.unit_id[row] = unit_id
+        if unit_id != -1:
+            self.unit_rows.setdefault(unit_id, set()).add(row)
+
+    def set_alive(self, row, alive):
+        """ Marks a character alive or dead, keeping dead_rows up to date.
+
+            Args:
+                row (int): The row of the character.
+                alive (bool): Are they alive?
+        """
+        if alive:
+            self.is_alive[row] = 1
+            self.dead_rows.discard(row)
+        else:
+            self.is_alive[row] = 0
+            self.dead_rows.add(row)
+
+    def reindex(self, rows):
+        """ Rebuilds unit_rows and dead_rows from the arrays, for when the arrays were replaced
+            wholesale, like loading a snapshot.
+
+            Args:
+                rows (iterable): The rows that belong to characters.
+        """
+        unit_id = self.unit_id
+        is_alive = self.is_alive
+        self.unit_rows = {}
+        self.dead_rows = set()
+        for row in rows:
+            if unit_id[row] != -1:
+                self.unit_rows.setdefault(unit_id[row], set()).add(row)
+            if not is_alive[row]:
+                self.dead_rows.add(row)
+
+    def status_code(self, status) -> int:
+        """ Gets the code a status is stored as, adding the status if it's new.
+
+            Args:
+                status (str): The status, or None for no status.
+
+            Returns:
+                The index of the status in statuses.
+        """
+        code = self._status_codes.get(status)
+        if code is None:
+            code = len(self.statuses)
+            self.statuses.append(status)
+            self._status_codes[status] = code
+
+        return code
+
+    def count_alive(self, rows=None) -> int:
+        """ Counts alive characters.
+
+            Args:
+                rows (iterable): The rows to count, or None for the whole roster.
+
+            Returns:
+                The number of alive characters.
+        """
+        if rows is None:
+            return sum(self.is_alive)
+
+        is_alive = self.is_alive
+        return sum(is_alive[row] for row in rows)
+
+    def restore(self, rows=None):
+        """ Brings characters back to full health and alive, and clears their status and
+            whether they've acted.
+
+            Args:
+                rows (iterable): The rows to restore, or None for the whole roster. Unused rows
+                    are left alone when restoring the whole roster.
+        """
+        if rows is None:
+            size = len(self)
+            self.health = array(self.health.typecode, self.max_health)
+            self.is_alive = array(self.is_alive.typecode,
+                    (1 if max_health > 0 else 0 for max_health in self.max_health))
+            self.has_acted = array(self.has_acted.typecode, [0]) * size
+            self.status = array(self.status.typecode, [0]) * size
+            self.dead_rows.clear()
+            return
+
+        rows = list(rows)
+        self.dead_rows.difference_update(rows)
+        for row in rows:
+            self.health[row] = self.max_health[row]
+            self.is_alive[row] = 1
+            self.has_acted[row] = 0
+            self.status[row] = 0
+
+    def nbytes(self) -> int:
+        """ Gets the number of bytes used by the stat arrays.
+
+            Returns:
+                The total size of every stat array in bytes.
+        """
+        return sum(len(getattr(self, name)) * getattr(self, name).itemsize
+                for name in self.fields)
@@ -0,0 +1,131 @@
+""" scenario.py
+
+contains the scenario loader. A scenario is a plain dict (usually read from json) describing the
+two units of a battle, so battles can be asked for by tools and bots without writing any python:
+
+    {
+        "close": {
+            "targeting_mode": "Strong",
+            "chars": [
+                {"name": "Pol", "class": "Knight", "agility": 2, "strength": 10,
+                    "health": 100, "position": 1},
+                {"name": "PolFast", "class": "Knight", "agility": 4, "strength": 3,
+                    "health": 50, "position": 2}
+            ]
+        },
+        "far": { ... }
+    }
+
+The first character of a unit is its leader. targeting_mode is optional and defaults to Strong,
+class is optional and defaults to Knight, it's the name of any class in the registry (see
+registry.py). A league of more than two units, for a tournament, is described in load_league.
+
+"""
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+from .game import Game
+from .registry import RegistryError, get_class_by_name
+from .roster import Roster
+
+TARGETING_MODES = ("Strong", "Weak", "Leader", "Auto")
+
+class ScenarioError(ValueError):
+    """ Raised when a scenario doesn't describe two valid units.
+    """
+
+def _build_unit(game, side, data):
+    #pylint: disable=too-many-locals # it's one check after another.
+    """ Builds one unit of a scenario in a game. Every character is checked before any of them
+        are made.
+    """
+    if not isinstance(data, dict):
+        raise ScenarioError(f"{side} must be an object")
+
+    chars = data.get("chars")
+    if not isinstance(chars, list) or not 1 <= len(chars) <= 9:
+        raise ScenarioError(f"{side} needs a list of 1 to 9 chars")
+
+    targeting_mode = data.get("targeting_mode", "Strong")
+    if targeting_mode not in TARGETING_MODES:
+        raise ScenarioError(f"{side} has an unknown targeting_mode {targeting_mode!r}")
+
+    positions = set()
+    placed = []
+    for index, char_data in enumerate(chars):
+        try:
+            char_class = get_class_by_name(char_data.get("class", "Knight"))
+            position = int(char_data.get("position", index))
+            stats = {stat: int(char_data[stat]) for stat in ("agility", "strength", "health")}
+            name = str(char_data["name"])
+        except (AttributeError, KeyError, RegistryError, TypeError, ValueError) as error:
+            raise ScenarioError(f"{side} char {index} is not valid: {error!r}") from error
+
+        for stat, value in stats.items():
+            lowest, highest = Roster.stat_range(stat)
+            if not lowest <= value <= highest:
+                raise ScenarioError(f"{side} char {index} has {stat} {value}, it must be from "
+                        f"{lowest} to {highest}")
+
+        if not 0 <= position <= 8 or position in positions:
+            raise ScenarioError(f"{side} char {index} has a bad position {position}")
+        positions.add(position)
+        placed.append((name, char_class, stats, position))
+
+    # create_units prints nothing, unlike create_unit and add_char_to_unit.
+    formation = [(game.create_character(name, char_class, **stats), position)
+            for name, char_class, stats, position in placed]
+    return game.create_units([formation], targeting_mode)[0]
+
+def load_scenario(data, game=None):
+    """ Builds the two units of a scenario.
+
+        Args:
+            data (dict): The scenario, see the top of this module.
+            game (Game): The game to make the characters and units in. Defaults to a new game, so
+                every scenario is kept apart.
+
+        Returns:
+            The game, the close unit and the far unit.
+    """
+    if not isinstance(data, dict):
+        raise ScenarioError("a scenario must be an object")
+
+    if game is None:
+        game = Game()
+
+    unit_close = _build_unit(game, "close", data.get("close"))
+    unit_far = _build_unit(game, "far", data.get("far"))
+
+    return game, unit_close, unit_far
+
+def load_league(data, game=None):
+    """ Builds every unit of a league in a game, for a tournament. A league is a scenario with a
+        list of units instead of a close and a far unit:
+
+            {"units": [{"targeting_mode": "Weak", "chars": [...]}, ...]}
+
+        A plain scenario is a league of its two units.
+
+        Args:
+            data (dict): The league.
+            game (Game): The game to make the characters and units in. Defaults to a new game.
+
+        Returns:
+            The game and a list of the units, in the order they're listed.
+    """
+    if not isinstance(data, dict):
+        raise ScenarioError("a league must be an object")
+
+    if "units" not in data:
+        game, unit_close, unit_far = load_scenario(data, game)
+        return game, [unit_close, unit_far]
+
+    units = data["units"]
+    if not isinstance(units, list) or len(units) < 2:
+        raise ScenarioError("a league needs a list of at least 2 units")
+
+    if game is None:
+        game = Game()
+
+    units = [_build_unit(game, f"unit {index}", unit) for index, unit in enumerate(units)]
+
+    return game, units
@@ -0,0 +1,217 @@
+""" server.py
+
+contains the battle server. It accepts battle requests on a local TCP or unix socket, fights any
+number of them at once and streams every event back to the client that asked for it as
+newline-delimited json.
+
+A request is one line of json:
+
+    {"id": 7, "scenario": {...}, "seed": 42, "events": true}
+
+scenario is described in scenario.py. seed is optional, and picked at random if not given.
+events is optional, set it to false to only get the result. Every line sent back has the id of
+the request it belongs to, so many requests can be in flight on one connection:
+
+    {"id": 7, "event": "round_start", "round_number": 1}
+    ...
+    {"id": 7, "event": "result", "seed": 42, "outcome": "win", "rounds": 3, ...}
+
+A request that can't be run gets a single {"id": 7, "error": "..."} line instead, and so does a
+battle that fails part way through, so every request always gets a last line.
+
+Battles are headless, so they never sleep. Every drain_every lines a battle waits for its client
+to catch up and then lets the other battles have a turn, so a slow client only slows down its own
+battles and a long battle doesn't hold up the rest.
+
+Run it with:
+    python -m classes.server --port 8765
+    python -m classes.server --unix /tmp/battles.sock
+
+"""
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+import argparse
+import asyncio
+import json
+from .battle import Battle
+from .battle_sinks import event_record
+from .scenario import ScenarioError, load_scenario
+from .simulator import battle_summary
+
+def _encode(message) -> bytes:
+    return json.dumps(message).encode() + b"\n"
+
+def encode_event(request_id, kind, fields) -> bytes:
+    """ Encodes a battle event as a line of json.
+
+        Args:
+            request_id (object): The id of the request the event belongs to.
+            kind (str): The kind of event.
+            fields (dict): The fields of the event.
+
+        Returns:
+            The line, with its newline.
+    """
+    return _encode({"id": request_id, **event_record(kind, fields)})
+
+def _result(request_id, battle) -> dict:
+    """ Gets the result line of a finished battle.
+    """
+    return {"id": request_id, "event": "result", **battle_summary(battle)}
+
+class BattleServer():
+    """ Serves battles to many clients at once.
+
+        Attributes:
+            max_battles (int): The most battles fought at once across every client. More requests
+                wait for a free slot.
+            drain_every (int): How many lines are written to a client before waiting for it to
+                catch up.
+            battles_served (int): How many battles have been fought.
+
+    """
+
+    def __init__(self, max_battles=256, drain_every=64):
+        self.max_battles = max_battles
+        self.drain_every = drain_every
+        self.battles_served = 0
+        self._slots = None
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        """ Starts listening for clients.
+
+            Args:
+                host (str): The address to listen on.
+                port (int): The TCP port to listen on. 0 picks a free one.
+                path (str): A unix socket to listen on instead of TCP.
+
+            Returns:
+                The asyncio Server.
+        """
+        self._slots = asyncio.Semaphore(self.max_battles)
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_client, path=path)
+
+        return await asyncio.start_server(self.handle_client, host=host, port=port)
+
+    async def handle_client(self, reader, writer):
+        """ Reads requests from a client until it disconnects, fighting each one as it arrives.
+
+            Args:
+                reader (asyncio.StreamReader): The client to read from.
+                writer (asyncio.StreamWriter): The client to write to.
+        """
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                task = asyncio.create_task(self.handle_request(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        except asyncio.CancelledError:
+            # the server is shutting down. Stopping quietly here is the end of this client, and
+            # asyncio would otherwise log the cancellation as an error.
+            pass
+        finally:
+            # anything still running has nobody left to send to.
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def handle_request(self, line, writer):
+        """ Fights the battle a request asks for and streams its events to the client.
+
+            Args:
+                line (bytes): The request, a line of json.
+                writer (asyncio.StreamWriter): The client to write to.
+        """
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ScenarioError("a request must be an object")
+
+            request_id = request.get("id")
+            _, unit_close, unit_far = load_scenario(request.get("scenario"))
+            seed = request.get("seed")
+            if seed is not None and not isinstance(seed, int):
+                raise ScenarioError("seed must be an integer")
+            events = request.get("events", True)
+            if not isinstance(events, bool):
+                raise ScenarioError("events must be true or false")
+        except ValueError as error:
+            writer.write(_encode({"id": request_id, "error": str(error)}))
+            await writer.drain()
+            return
+
+        async with self._slots:
+            try:
+                result = await self._fight(request_id, writer, unit_close, unit_far, seed,
+                        events)
+            except ConnectionError:
+                raise
+            # one bad battle mustn't end the connection.
+            except Exception as error: #pylint: disable=broad-exception-caught
+                result = {"id": request_id, "error": f"battle failed: {error!r}"}
+
+            writer.write(_encode(result))
+            await writer.drain()
+
+    #pylint: disable=too-many-arguments,too-many-positional-arguments # this is fine.
+    async def _fight(self, request_id, writer, unit_close, unit_far, seed, events) -> dict:
+        """ Fights a battle, streaming its events if asked to. Either way the battle is fought an
+            event at a time, and gives the other battles a turn every drain_every events.
+
+            Returns:
+                The result line.
+        """
+        battle = Battle(None, unit_close, unit_far, headless=True, seed=seed)
+        # each event goes out as soon as it happens, nothing is kept.
+        for count, event in enumerate(battle.events(), start=1):
+            if events:
+                writer.write(encode_event(request_id, event.kind, event._asdict()))
+            if count % self.drain_every == 0:
+                await writer.drain()
+                # drain only waits when the client is behind, this gives the other battles a
+                # turn either way.
+                await asyncio.sleep(0)
+        self.battles_served += 1
+
+        return _result(request_id, battle)
+
+async def serve(host="127.0.0.1", port=8765, path=None, max_battles=256):
+    """ Runs a battle server until it's stopped.
+
+        Args:
+            host (str): The address to listen on.
+            port (int): The TCP port to listen on.
+            path (str): A unix socket to listen on instead of TCP.
+            max_battles (int): The most battles fought at once.
+    """
+    server = await BattleServer(max_battles=max_battles).start(host=host, port=port, path=path)
+    async with server:
+        await server.serve_forever()
+
+def main():
+    """ Starts a battle server from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Serve battles as newline-delimited json.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="listen on a unix socket instead of TCP")
+    parser.add_argument("--max-battles", type=int, default=256)
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.host, args.port, args.unix, args.max_battles))
+
+if __name__ == "__main__":
+    main()
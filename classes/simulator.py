@@ -0,0 +1,341 @@
+""" simulator.py
+
+contains the Monte Carlo matchup simulator. Crits make every battle random, so a single battle
+between two units doesn't tell us much. The simulator runs the same matchup many times, spread
+over a pool of worker processes, and tallies up how it went.
+
+"""
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from .battle import Battle
+from .battle_sinks import ConsoleSink
+from .battle_state import BattleState
+from .rng import RngStream
+
+WIN = "win"
+LOSS = "loss"
+DRAW = "draw"
+
+class MatchupResult():
+    """ The tallied outcome of many battles between the same two units. Outcomes are always from
+        the point of view of the close unit.
+
+        Attributes:
+            battles (int): How many battles were run.
+            wins (int): Battles where only the close unit had characters left alive.
+            losses (int): Battles where only the far unit had characters left alive.
+            draws (int): Battles where both units still had characters alive at the end.
+            total_rounds (int): The sum of rounds fought across every battle.
+            survivors_close (dict): How many battles ended with N close characters alive. The key
+                is N, the value is the number of battles.
+            survivors_far (dict): The same as survivors_close, for the far unit.
+
+    """
+
+    def __init__(self):
+        self.battles = 0
+        self.wins = 0
+        self.losses = 0
+        self.draws = 0
+        self.total_rounds = 0
+        self.survivors_close = {}
+        self.survivors_far = {}
+
+    def __str__(self):
+        return f"Battles: {self.battles}\n\
+Win: {self.win_rate:.3f} Loss: {self.loss_rate:.3f} Draw: {self.draw_rate:.3f}\n\
+Mean rounds: {self.mean_rounds:.2f}\n\
+Mean survivors: {self.mean_survivors_close:.2f} / {self.mean_survivors_far:.2f}\n"
+
+    def add_battle(self, outcome, rounds, survivors_close, survivors_far):
+        """ Adds the outcome of a single battle to this result.
+
+            Args:
+                outcome (str): WIN, LOSS or DRAW.
+                rounds (int): How many rounds the battle lasted.
+                survivors_close (int): How many close characters were alive at the end.
+                survivors_far (int): How many far characters were alive at the end.
+        """
+        self.battles += 1
+        if outcome == WIN:
+            self.wins += 1
+        elif outcome == LOSS:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+        self.total_rounds += rounds
+        self.survivors_close[survivors_close] = self.survivors_close.get(survivors_close, 0) + 1
+        self.survivors_far[survivors_far] = self.survivors_far.get(survivors_far, 0) + 1
+
+    def merge(self, other):
+        """ Adds all the battles from another result into this one.
+
+            Args:
+                other (MatchupResult): The result to add into this one.
+
+            Returns:
+                This result, so merges can be chained.
+        """
+        self.battles += other.battles
+        self.wins += other.wins
+        self.losses += other.losses
+        self.draws += other.draws
+        self.total_rounds += other.total_rounds
+        for survivors, count in other.survivors_close.items():
+            self.survivors_close[survivors] = self.survivors_close.get(survivors, 0) + count
+        for survivors, count in other.survivors_far.items():
+            self.survivors_far[survivors] = self.survivors_far.get(survivors, 0) + count
+
+        return self
+
+    def _rate(self, count):
+        if self.battles == 0:
+            return 0.0
+
+        return count / self.battles
+
+    @staticmethod
+    def _mean(histogram):
+        total = sum(histogram.values())
+        if total == 0:
+            return 0.0
+
+        return sum(key * count for key, count in histogram.items()) / total
+
+    @property
+    def win_rate(self) -> float:
+        """ The fraction of battles the close unit won. """
+        return self._rate(self.wins)
+
+    @property
+    def loss_rate(self) -> float:
+        """ The fraction of battles the close unit lost. """
+        return self._rate(self.losses)
+
+    @property
+    def draw_rate(self) -> float:
+        """ The fraction of battles neither unit was wiped out in. """
+        return self._rate(self.draws)
+
+    @property
+    def mean_rounds(self) -> float:
+        """ The average number of rounds a battle lasted. """
+        return self._rate(self.total_rounds)
+
+    @property
+    def mean_survivors_close(self) -> float:
+        """ The average number of close characters alive at the end of a battle. """
+        return self._mean(self.survivors_close)
+
+    @property
+    def mean_survivors_far(self) -> float:
+        """ The average number of far characters alive at the end of a battle. """
+        return self._mean(self.survivors_far)
+
+    def as_dict(self) -> dict:
+        """ Gets this result as a plain dict, for printing or dumping to json.
+
+            Returns:
+                A dict of the counts and rates of this result.
+        """
+        return {
+            "battles": self.battles,
+            "wins": self.wins,
+            "losses": self.losses,
+            "draws": self.draws,
+            "win_rate": self.win_rate,
+            "loss_rate": self.loss_rate,
+            "draw_rate": self.draw_rate,
+            "mean_rounds": self.mean_rounds,
+            "mean_survivors_close": self.mean_survivors_close,
+            "mean_survivors_far": self.mean_survivors_far,
+            "total_rounds": self.total_rounds,
+            "survivors_close": dict(sorted(self.survivors_close.items())),
+            "survivors_far": dict(sorted(self.survivors_far.items())),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """ Makes a result from a dict made by as_dict, or the same dict read back from json.
+
+            Args:
+                data (dict): The result as a dict.
+
+            Returns:
+                A MatchupResult.
+        """
+        result = cls()
+        result.battles = data["battles"]
+        result.wins = data["wins"]
+        result.losses = data["losses"]
+        result.draws = data["draws"]
+        result.total_rounds = data["total_rounds"]
+        # json turns the histogram keys into strings.
+        result.survivors_close = {int(key): count for key, count in data["survivors_close"].items()}
+        result.survivors_far = {int(key): count for key, count in data["survivors_far"].items()}
+        return result
+
+def count_survivors(unit) -> int:
+    """ Counts the characters still alive in a unit.
+
+        Args:
+            unit (Unit): The unit to count.
+
+        Returns:
+            The number of alive characters in the unit.
+    """
+    return sum(1 for char in unit.unit_chars.values() if char is not None and char.is_alive)
+
+def battle_outcome(survivors_close, survivors_far) -> str:
+    """ Decides the outcome of a finished battle from the close units point of view.
+
+        Args:
+            survivors_close (int): How many close characters are alive.
+            survivors_far (int): How many far characters are alive.
+
+        Returns:
+            WIN, LOSS or DRAW.
+    """
+    if survivors_far == 0 and survivors_close > 0:
+        return WIN
+
+    if survivors_close == 0 and survivors_far > 0:
+        return LOSS
+
+    return DRAW
+
+def battle_summary(battle) -> dict:
+    """ Gets the result of a finished battle as plain data.
+
+        Args:
+            battle (Battle): The finished battle.
+
+        Returns:
+            A dict of the battles seed, outcome (for the close unit), rounds and the survivors on
+            each side. Fighting the two units again with the seed gives the same battle.
+    """
+    survivors_close = count_survivors(battle.unit_close)
+    survivors_far = count_survivors(battle.unit_far)
+    return {
+        "seed": battle.rng.seed,
+        "outcome": battle_outcome(survivors_close, survivors_far),
+        "rounds": battle.round - 1,
+        "survivors_close": survivors_close,
+        "survivors_far": survivors_far,
+    }
+
+#pylint: disable=too-many-arguments,too-many-positional-arguments # this is fine.
+def fight_battles(unit_close, unit_far, num_battles, seed=None, first_battle=0, stats=None):
+    """ Fights a number of headless battles between two units in this process, one at a time.
+
+        Battles change their units as they go, so every battle is fought on a fork of one
+        BattleState of the two units and the units passed in are never touched.
+
+        Args:
+            unit_close (Unit): The close unit.
+            unit_far (Unit): The far unit.
+            num_battles (int): How many battles to fight.
+            seed (int): The root seed. Battle n uses RngStream(seed).child(n).
+            first_battle (int): The index of the first battle, for running part of a larger run.
+            stats (BattleStats): Collects the timings and counts of every battle, if given.
+
+        Yields:
+            (index, battle) for each battle, once it's over.
+    """
+    root = RngStream(seed)
+    state = BattleState(unit_close, unit_far)
+    for index in range(first_battle, first_battle + num_battles):
+        close, far = state.fork().units
+
+        battle = Battle(None, close, far, headless=True, seed=root.child(index), stats=stats)
+        battle.fight_it_out()
+        yield index, battle
+
+#pylint: disable=too-many-arguments,too-many-positional-arguments # this is fine.
+def run_battles(unit_close, unit_far, num_battles, seed=None, first_battle=0,
+        stats=None) -> MatchupResult:
+    """ Runs a number of headless battles between two units in this process. See fight_battles.
+
+        Args:
+            unit_close (Unit): The close unit.
+            unit_far (Unit): The far unit.
+            num_battles (int): How many battles to run.
+            seed (int): The root seed. Battle n uses RngStream(seed).child(n).
+            first_battle (int): The index of the first battle, for running part of a larger run.
+            stats (BattleStats): Collects the timings and counts of every battle, if given.
+
+        Returns:
+            A MatchupResult with every battle in it.
+    """
+    result = MatchupResult()
+    for _, battle in fight_battles(unit_close, unit_far, num_battles, seed, first_battle, stats):
+        survivors_close = count_survivors(battle.unit_close)
+        survivors_far = count_survivors(battle.unit_far)
+        result.add_battle(battle_outcome(survivors_close, survivors_far), battle.round - 1,
+                survivors_close, survivors_far)
+
+    return result
+
+def simulate_matchup(unit_close, unit_far, num_battles, workers=None, chunk_size=None,
+        seed=None):
+    """ Runs many independent battles between two units across a pool of worker processes.
+
+        Every battle gets its own child stream of the root seed, picked by the battles index, so
+        the same seed gives the same result no matter how many workers or chunks are used. Any
+        single battle can be replayed with replay_battle.
+
+        Args:
+            unit_close (Unit): The close unit, built with Game.create_character/create_unit.
+            unit_far (Unit): The far unit.
+            num_battles (int): How many battles to run in total.
+            workers (int): How many worker processes to use. Defaults to one per cpu. With a
+                single worker the battles are run in this process.
+            chunk_size (int): How many battles each task runs. Defaults to a few tasks per worker.
+            seed (int): The root seed. Picked at random if not given.
+
+        Returns:
+            A MatchupResult with every battle in it.
+    """
+    if seed is None:
+        seed = RngStream().seed
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or num_battles <= 1:
+        return run_battles(unit_close, unit_far, num_battles, seed=seed)
+
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(num_battles / (workers * 4)))
+
+    result = MatchupResult()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_battles, unit_close, unit_far,
+                min(chunk_size, num_battles - first_battle), seed, first_battle)
+                for first_battle in range(0, num_battles, chunk_size)]
+        for future in futures:
+            result.merge(future.result())
+
+    return result
+
+def replay_battle(unit_close, unit_far, seed, index, sink=None):
+    """ Runs one battle of a simulate_matchup run again, exactly as it happened.
+
+        Args:
+            unit_close (Unit): The close unit the run was made with.
+            unit_far (Unit): The far unit the run was made with.
+            seed (int): The root seed of the run.
+            index (int): The index of the battle in the run.
+            sink (object): Where the battles events go. Defaults to a ConsoleSink, to watch it.
+
+        Returns:
+            The finished Battle, fought on a BattleState of the units.
+    """
+    close, far = BattleState(unit_close, unit_far).units
+    battle = Battle(None, close, far, headless=True,
+            sink=sink if sink is not None else ConsoleSink(), seed=RngStream(seed).child(index))
+    battle.fight_it_out()
+    return battle
@@ -0,0 +1,182 @@
+""" snapshot.py
+
+contains the binary snapshot of a whole Game. The roster is already a set of typed arrays, so a
+snapshot is mostly those arrays written out as they are, plus the few things that don't live in
+the roster: names, classes and which character is in which unit position. Loading one is a
+handful of array copies, so many scenarios can be loaded side by side or checkpointed cheaply.
+
+    header:     magic "OGGS", version (B), char_index (I), unit_index (I), roster rows (I),
+                chars (I), units (I), statuses (B)
+    statuses:   for each status after None: name length (H), name (utf-8)
+    roster:     every array in Roster.fields, in order, as rows * itemsize bytes
+    chars:      for each: char_id (I), class_id (H), name length (H), name (utf-8)
+    units:      for each: unit_id (I), leader char_id (I), targeting mode length (H),
+                targeting mode (utf-8), then the char_id in each of the 9 positions (9I, 0 is empty)
+
+Everything is little endian. Strings are kept whole, a game with one too long to fit its length
+can't be snapshot at all rather than coming back different.
+
+"""
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+import struct
+import sys
+from array import array
+from .character import Character
+from .packing import pack_text, unpack_text
+from .roster import Roster
+from .unit import Unit, UnitSlots
+from .registry import RegistryError, get_class
+
+MAGIC = b"OGGS"
+VERSION = 2
+
+_HEADER = struct.Struct("<4sBIIIIIB")
+_CHAR = struct.Struct("<IH")
+_UNIT = struct.Struct("<II")
+_SLOTS = struct.Struct("<9I")
+
+class SnapshotError(Exception):
+    """ Raised when a snapshot can't be read.
+    """
+
+def write_snapshot(game) -> bytes:
+    """ Packs a game into bytes.
+
+        Args:
+            game (Game): The game to pack.
+
+        Returns:
+            The snapshot.
+    """
+    try:
+        return _write_snapshot(game)
+    except ValueError as error:
+        raise SnapshotError(f"can't snapshot this game: {error}") from error
+
+def _write_snapshot(game) -> bytes:
+    """ Packs a game into bytes, see write_snapshot.
+    """
+    roster = game.roster
+    statuses = roster.statuses[1:]
+    parts = [_HEADER.pack(MAGIC, VERSION, game.char_index, game.unit_index, len(roster),
+            len(game.chars), len(game.units), len(statuses))]
+    parts.extend(pack_text(status) for status in statuses)
+
+    for name in Roster.fields:
+        column = getattr(roster, name)
+        if sys.byteorder == "big":
+            column = array(column.typecode, column)
+            column.byteswap()
+        parts.append(column.tobytes())
+
+    for char_id in game.chars:
+        parts.append(_CHAR.pack(char_id, roster.classes[char_id].class_id)
+                + pack_text(roster.names[char_id]))
+
+    for unit_id, unit in game.units.items():
+        parts.append(_UNIT.pack(unit_id, unit.unit_leader.char_id)
+                + pack_text(unit.targeting_mode)
+                + _SLOTS.pack(*(0 if char is None else char.char_id
+                        for char in unit.unit_chars.values())))
+
+    return b"".join(parts)
+
+def read_snapshot(game, data):
+    """ Loads a snapshot into a game, replacing everything that was in it. Anything wrong with
+        the snapshot, cut short or garbled, raises a SnapshotError and leaves the game as it was.
+
+        Args:
+            game (Game): The game to load into.
+            data (bytes): A snapshot made by write_snapshot.
+    """
+    if len(data) < _HEADER.size:
+        raise SnapshotError("truncated snapshot header")
+
+    magic, version, char_index, unit_index, rows, num_chars, num_units, num_statuses = \
+            _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise SnapshotError(f"not a game snapshot: {magic!r} version {version}")
+
+    try:
+        roster, offset = _read_roster(data, rows, num_statuses, num_chars)
+        units, offset = _read_units(data, offset, roster, num_units)
+    except (struct.error, IndexError, UnicodeDecodeError, ValueError) as error:
+        raise SnapshotError(f"corrupt snapshot: {error}") from error
+
+    if offset != len(data):
+        raise SnapshotError(f"{len(data) - offset} bytes left over after the snapshot")
+
+    game.char_index = char_index
+    game.unit_index = unit_index
+    game.roster = roster
+    game.units = units
+
+def _read_roster(data, rows, num_statuses, num_chars) -> tuple:
+    """ Reads the statuses, roster columns and characters of a snapshot.
+
+        Returns:
+            The Roster and the offset just after the characters.
+    """
+    offset = _HEADER.size
+    roster = Roster()
+    for _ in range(num_statuses):
+        status, offset = unpack_text(data, offset)
+        roster.status_code(status)
+
+    for name, (typecode, _) in Roster.fields.items():
+        column = array(typecode)
+        size = rows * column.itemsize
+        if offset + size > len(data):
+            raise SnapshotError(f"truncated snapshot, the {name} column is cut short")
+        column.frombytes(data[offset:offset + size])
+        if sys.byteorder == "big":
+            column.byteswap()
+        setattr(roster, name, column)
+        offset += size
+
+    roster.names = [None] * rows
+    roster.classes = [None] * rows
+    char_ids = []
+    for _ in range(num_chars):
+        char_id, class_id = _CHAR.unpack_from(data, offset)
+        name, offset = unpack_text(data, offset + _CHAR.size)
+        if not 0 < char_id < rows:
+            raise SnapshotError(f"character {char_id} is outside the {rows} roster rows")
+        try:
+            roster.classes[char_id] = get_class(class_id)
+        except RegistryError:
+            raise SnapshotError(f"unknown class_id {class_id} for character {char_id}") from None
+        roster.names[char_id] = name
+        char_ids.append(char_id)
+
+    roster.reindex(char_ids)
+    return roster, offset
+
+def _read_units(data, offset, roster, num_units) -> tuple:
+    """ Reads the units of a snapshot, putting their characters back in position.
+
+        Returns:
+            A dict of unit_id -> Unit and the offset just after the units.
+    """
+    # only the characters in a unit are made, the rest are made by the game when they're asked
+    # for. Putting them back in their positions also rebuilds each units masks from the roster.
+    chars = {}
+    units = {}
+    for _ in range(num_units):
+        unit_id, leader_id = _UNIT.unpack_from(data, offset)
+        targeting_mode, offset = unpack_text(data, offset + _UNIT.size)
+        slots = _SLOTS.unpack_from(data, offset)
+        offset += _SLOTS.size
+
+        unit_chars = UnitSlots()
+        for position, char_id in enumerate(slots):
+            if char_id and char_id not in chars:
+                if roster.names[char_id] is None:
+                    raise SnapshotError(f"unit {unit_id} has unknown character {char_id}")
+                chars[char_id] = Character.from_roster(roster, char_id, char_id)
+            unit_chars[position] = chars[char_id] if char_id else None
+        if leader_id not in chars or leader_id not in slots:
+            raise SnapshotError(f"unit {unit_id} has leader {leader_id} who isn't in it")
+        units[unit_id] = Unit.from_slots(unit_chars, chars[leader_id], unit_id, targeting_mode)
+
+    return units, offset
@@ -0,0 +1,112 @@
+""" targeting.py
+
+contains the precomputed targeting tables. Who a character can target only depends on their
+position and which enemy positions have a living character in them, which is 9 x 512 states, so
+every answer is worked out once when this module is imported.
+
+The enemy unit is a 9 bit mask, bit n is position n:
+
+Front
+0 1 2
+3 4 5
+6 7 8
+back
+
+"""
+
+# the columns of a unit, front to back.
+LEFT_COLUMN = (0, 3, 6)
+MIDDLE_COLUMN = (1, 4, 7)
+RIGHT_COLUMN = (2, 5, 8)
+
+def _first_in_column(column, alive_mask):
+    """ Gets the frontmost living position in a column, or None.
+    """
+    for position in column:
+        if alive_mask >> position & 1:
+            return position
+
+    return None
+
+def _build_candidates(position, alive_mask):
+    """ Works out who a character in a position can target. This is the same walk over the enemy
+        columns Character.determine_target always did.
+
+        Args:
+            position (int): The position of the attacking character.
+            alive_mask (int): The enemy positions with a living character in them.
+
+        Returns:
+            A tuple of enemy positions, at most one per column, in the order they were found.
+    """
+    candidates = []
+
+    def add_column(column):
+        found = _first_in_column(column, alive_mask)
+        if found is not None:
+            candidates.append(found)
+
+    # always include the middle row as targets.
+    add_column(MIDDLE_COLUMN)
+
+    # the right side of our unit faces the left side of theirs, and the other way around. If
+    # there's nobody in the middle or across from us, we include our own side.
+    if position in LEFT_COLUMN:
+        add_column(RIGHT_COLUMN)
+        if not candidates:
+            add_column(LEFT_COLUMN)
+
+    if position in RIGHT_COLUMN:
+        add_column(LEFT_COLUMN)
+        if not candidates:
+            add_column(RIGHT_COLUMN)
+
+    # if our character is in the middle and there's nobody in front of them, either side will do.
+    if position in MIDDLE_COLUMN and not candidates:
+        add_column(LEFT_COLUMN)
+        add_column(RIGHT_COLUMN)
+
+    return tuple(candidates)
+
+# TARGET_TABLE[position][alive_mask] -> tuple of enemy positions that can be targeted.
+TARGET_TABLE = tuple(tuple(_build_candidates(position, alive_mask) for alive_mask in range(512))
+        for position in range(9))
+
+# FIRST_POSITION[alive_mask] -> the first living position in a unit, or -1.
+FIRST_POSITION = tuple((alive_mask & -alive_mask).bit_length() - 1 for alive_mask in range(512))
+
+def select_target(position, enemy_unit, targeting_mode):
+    """ Picks the enemy character a character in a position will target.
+
+        Args:
+            position (int): The position of the attacking character.
+            enemy_unit (Unit): The unit being targeted.
+            targeting_mode (str): Strong, Weak, Leader or Auto.
+
+        Returns:
+            The enemy character to target, or None if there's nobody left alive.
+    """
+    enemy_chars = enemy_unit.unit_chars
+    alive_mask = enemy_chars.alive_mask
+    candidates = TARGET_TABLE[position][alive_mask]
+
+    if candidates:
+        if targeting_mode == "Strong":
+            # max keeps the first of any ties, the same as a stable sort would.
+            return enemy_chars[max(candidates, key=lambda pos: enemy_chars[pos].health)]
+
+        if targeting_mode == "Weak":
+            return enemy_chars[min(candidates, key=lambda pos: enemy_chars[pos].health)]
+
+        if targeting_mode == "Leader":
+            # the enemy units leader, if they can be targeted. Otherwise, auto.
+            leader_position = enemy_chars.positions.get(enemy_unit.unit_leader)
+            if leader_position in candidates:
+                return enemy_unit.unit_leader
+
+    # Auto, and everything that falls back to it.
+    first = FIRST_POSITION[alive_mask]
+    if first < 0:
+        return None
+
+    return enemy_chars[first]
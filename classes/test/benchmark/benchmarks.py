@@ -0,0 +1,325 @@
+""" benchmarks.py
+
+	Times the battle hot paths, so optimizations can be checked and regressions caught.
+
+	Every benchmark is run against games of several roster sizes, from 10 characters up to a
+	million. The characters are split into full units of nine, and each benchmark picks its
+	characters and units at random from the whole roster, so anything that slows down as the game
+	grows shows up as a drop in throughput at the bigger sizes.
+
+	Results are in operations per second. Save them as the baseline with --save, and later runs
+	are compared against it. A run fails (exit code 1) when any benchmark is slower than its
+	baseline by more than the threshold. Baselines only mean anything on the machine they were
+	saved on.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m classes.test.benchmark.benchmarks [--save] [--max-size 10000]
+"""
+#pylint: disable=import-error # False positive.
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+from classes.battle import Battle
+from classes.bulk import load_columns
+from classes.game import Game
+from classes.scenario import TARGETING_MODES
+from classes.tournament import restore_units
+from classes.unit_classes.knight import KnightClass
+from classes.world import World
+
+SIZES = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_THRESHOLD = 0.25
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# how many calls each benchmark makes per run, how long a sample runs for at least, and how many
+# samples it takes the best of.
+CALLS = 2_000
+BATTLES = 100
+MIN_TIME = 0.05
+REPEAT = 5
+
+def build_game(size, seed=0) -> Game:
+    """ Builds a game with a roster of random characters, split into units of nine.
+
+        Args:
+            size (int): How many characters to create.
+            seed (int): Picks the characters stats.
+
+        Returns:
+            The game.
+    """
+    rng = random.Random(seed)
+    game = Game()
+    char_class = KnightClass()
+    with redirect_stdout(io.StringIO()):
+        for start in range(0, size, 9):
+            chars = [game.create_character(f"Char {start + offset}", char_class,
+                    agility=rng.randint(1, 20), strength=rng.randint(5, 20),
+                    health=rng.randint(20, 80)) for offset in range(min(9, size - start))]
+
+            unit = game.create_unit(chars[0])
+            unit.targeting_mode = rng.choice(TARGETING_MODES)
+            for position, char in enumerate(chars[1:], start=1):
+                unit.add_char_to_unit(char, position)
+
+    return game
+
+def best_rate(run, operations, repeat=REPEAT) -> float:
+    """ Times a function and keeps the fastest of a few samples. Each sample calls the function
+        until at least MIN_TIME has been timed, so quick benchmarks aren't lost in timer noise.
+
+        Args:
+            run (function): Does the work being timed. If it returns a number, that's how long
+                the work took in seconds, for runs that have to leave set up out of the timing.
+            operations (int): How many operations one call does.
+            repeat (int): How many samples to take.
+
+        Returns:
+            The best throughput, in operations per second.
+    """
+    best = 0.0
+    for _ in range(repeat):
+        calls = 0
+        elapsed = 0.0
+        while calls == 0 or elapsed < MIN_TIME:
+            start = time.perf_counter()
+            took = run()
+            elapsed += time.perf_counter() - start if took is None else took
+            calls += 1
+
+        best = max(best, calls * operations / max(elapsed, 1e-9))
+
+    return best
+
+def bench_create_character(game, rng):
+    """ Creates characters in a game that already has a full roster.
+    """
+    char_class = KnightClass()
+    stats = [(rng.randint(1, 20), rng.randint(5, 20), rng.randint(20, 80))
+            for _ in range(CALLS)]
+
+    def run():
+        for agility, strength, health in stats:
+            game.create_character("Bench", char_class, agility, strength, health)
+
+    return best_rate(run, CALLS)
+
+def bench_load_columns(game, rng):
+    """ Creates characters and their units in bulk, from columns, in a game that already has a
+        full roster.
+    """
+    columns = {
+        "name": ["Bench"] * CALLS,
+        "class_id": [KnightClass().class_id] * CALLS,
+        "agility": [rng.randint(1, 20) for _ in range(CALLS)],
+        "strength": [rng.randint(5, 20) for _ in range(CALLS)],
+        "health": [rng.randint(20, 80) for _ in range(CALLS)],
+        "unit_id": [index // 9 for index in range(CALLS)],
+        "position": [index % 9 for index in range(CALLS)],
+    }
+
+    def run():
+        load_columns(game, columns)
+
+    return best_rate(run, CALLS)
+
+def bench_which_row_can_go(game, rng):
+    """ Asks random units which of their rows goes next.
+    """
+    units = [game.units[rng.randint(1, game.unit_index)] for _ in range(CALLS)]
+
+    def run():
+        for unit in units:
+            unit.which_row_can_go()
+
+    return best_rate(run, CALLS)
+
+def bench_get_character_position(game, rng):
+    """ Looks up where random characters are in their units.
+    """
+    pairs = []
+    for _ in range(CALLS):
+        unit = game.units[rng.randint(1, game.unit_index)]
+        pairs.append((unit, rng.choice([c for c in unit.unit_chars.values() if c is not None])))
+
+    def run():
+        for unit, char in pairs:
+            unit.get_character_position(char)
+
+    return best_rate(run, CALLS)
+
+def bench_determine_target(game, rng):
+    """ Picks targets for random characters in random enemy units, with every targeting mode.
+    """
+    calls = [(game.chars[rng.randint(1, game.char_index)],
+            game.units[rng.randint(1, game.unit_index)],
+            rng.choice(TARGETING_MODES)) for _ in range(CALLS)]
+
+    def run():
+        for char, enemy_unit, targeting_mode in calls:
+            char.determine_target(enemy_unit, targeting_mode)
+
+    return best_rate(run, CALLS)
+
+def bench_fight_it_out(game, rng):
+    """ Fights headless battles between random pairs of units. Restoring the units between
+        battles isn't timed.
+    """
+    matchups = []
+    while len(matchups) < BATTLES:
+        close_id, far_id = rng.randint(1, game.unit_index), rng.randint(1, game.unit_index)
+        if close_id != far_id or game.unit_index == 1:
+            matchups.append((game.units[close_id], game.units[far_id], rng.getrandbits(32)))
+
+    def run():
+        elapsed = 0.0
+        for unit_close, unit_far, seed in matchups:
+            restore_units(unit_close, unit_far)
+            battle = Battle(game, unit_close, unit_far, headless=True, seed=seed)
+            start = time.perf_counter()
+            battle.fight_it_out()
+            elapsed += time.perf_counter() - start
+
+        for unit_close, unit_far, _ in matchups:
+            restore_units(unit_close, unit_far)
+        return elapsed
+
+    return best_rate(run, BATTLES)
+
+def bench_world_tick(game, rng):
+    """ Scatters every unit over a world map, moving at random, and runs ticks of it. Each tick
+        finds contacts between all the units and fights the battles they start.
+    """
+    units = list(game.units.values())
+    side = math.sqrt(len(units) * 100)
+    world = World(side, side, contact_radius=1.0, seed=rng.getrandbits(32))
+    world.add_units(units, [(rng.uniform(0, side), rng.uniform(0, side)) for _ in units],
+            [(rng.uniform(-1, 1), rng.uniform(-1, 1)) for _ in units])
+
+    def run():
+        world.tick()
+
+    rate = best_rate(run, 1)
+    restore_units(*units)
+    return rate
+
+# create_character and load_columns go last, they grow the roster.
+BENCHMARKS = {
+    "fight_it_out": bench_fight_it_out,
+    "determine_target": bench_determine_target,
+    "which_row_can_go": bench_which_row_can_go,
+    "get_character_position": bench_get_character_position,
+    "world_tick": bench_world_tick,
+    "create_character": bench_create_character,
+    "load_columns": bench_load_columns,
+}
+
+def run_benchmarks(sizes=SIZES, names=None, seed=0, out=None) -> dict:
+    """ Runs the benchmarks at each roster size.
+
+        Args:
+            sizes (iterable): The roster sizes to run at.
+            names (iterable): Which benchmarks to run. Defaults to all of them.
+            seed (int): Picks the rosters and what each benchmark calls.
+            out (file): Where to report progress, or None to stay quiet.
+
+        Returns:
+            A dict of "name[size]" -> operations per second.
+    """
+    names = list(BENCHMARKS) if names is None else [n for n in BENCHMARKS if n in names]
+    results = {}
+    for size in sizes:
+        game = build_game(size, seed)
+        for name in names:
+            rate = BENCHMARKS[name](game, random.Random(seed))
+            results[f"{name}[{size}]"] = rate
+            if out is not None:
+                print(f"{name + f'[{size}]':<32} {rate:>14,.0f} ops/s", file=out)
+
+    return results
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD) -> list:
+    """ Compares results with a baseline.
+
+        Args:
+            results (dict): "name[size]" -> operations per second, from run_benchmarks.
+            baseline (dict): The same, from an earlier run. Benchmarks in only one of the two
+                aren't compared.
+            threshold (float): How much slower than the baseline a benchmark may be, as a
+                fraction. 0.25 lets it lose a quarter of its throughput.
+
+        Returns:
+            A list of (name, baseline rate, rate) for every benchmark that regressed.
+    """
+    return [(name, baseline[name], rate) for name, rate in results.items()
+            if name in baseline and rate < baseline[name] * (1 - threshold)]
+
+def load_baseline(path) -> dict:
+    """ Loads a baseline file.
+
+        Returns:
+            The "name[size]" -> operations per second dict, or None if there's no file.
+    """
+    if not os.path.exists(path):
+        return None
+
+    with open(path, encoding="utf-8") as baseline_file:
+        return json.load(baseline_file)["results"]
+
+def save_baseline(path, results, baseline=None):
+    """ Saves results as the baseline, keeping any benchmarks in the old baseline that weren't
+        run this time.
+    """
+    merged = dict(baseline or {})
+    merged.update(results)
+    with open(path, "w", encoding="utf-8") as baseline_file:
+        json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                "saved": time.strftime("%Y-%m-%d %H:%M:%S"), "results": merged},
+                baseline_file, indent=2, sort_keys=True)
+        baseline_file.write("\n")
+
+def main(argv=None) -> int:
+    """ Runs the benchmarks from the command line.
+
+        Returns:
+            The exit code, 1 if anything regressed.
+    """
+    parser = argparse.ArgumentParser(description="Times the battle hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+            help="roster sizes to run at")
+    parser.add_argument("--max-size", type=int, default=None,
+            help="skip roster sizes bigger than this")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=None,
+            help="benchmarks to run")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+            help="allowed drop in throughput, as a fraction")
+    parser.add_argument("--save", action="store_true", help="save the results as the baseline")
+    args = parser.parse_args(argv)
+
+    sizes = [size for size in args.sizes if args.max_size is None or size <= args.max_size]
+    results = run_benchmarks(sizes, args.only, out=sys.stdout)
+    baseline = load_baseline(args.baseline)
+
+    regressions = compare(results, baseline, args.threshold) if baseline else []
+    for name, before, after in regressions:
+        print(f"REGRESSION {name}: {before:,.0f} -> {after:,.0f} ops/s "
+                f"({after / before - 1:+.0%})")
+
+    if args.save:
+        save_baseline(args.baseline, results, baseline)
+        print(f"Saved baseline to {args.baseline}")
+    elif baseline is None:
+        print(f"No baseline at {args.baseline}, run with --save to make one.")
+
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
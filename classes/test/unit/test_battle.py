@@ -0,0 +1,137 @@
+""" test_battle.py
+
+	This test suite contains all currently written unit tests for the battle.py class.
+
+	There is one class for every battle feature, so new test cases should be added as functions
+	belonging to the classes in this file.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_battle
+"""
+#pylint: disable=import-error # False positive.
+import io
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+from classes.game import Game
+from classes.battle import Battle
+from classes.battle_sinks import ConsoleSink, ListSink, NullSink
+from classes.unit_classes.knight import KnightClass
+
+def make_units(game):
+    """ Builds the same two units run.py builds, so battles in these tests look like real ones.
+
+        Returns:
+            The close unit and the far unit.
+    """
+    pol_char = game.create_character("Pol", KnightClass(), agility=2, strength=10, health=100)
+    fast_char = game.create_character("PolFast", KnightClass(), agility=4, strength=3, health=50)
+    dio_char = game.create_character("Dio", KnightClass(), agility=4, strength=5, health=100)
+    clone_char = game.create_character("Clone", KnightClass(), agility=1, strength=5, health=10)
+
+    with redirect_stdout(io.StringIO()):
+        pol_unit = game.create_unit(pol_char)
+        pol_unit.move_character(pol_char, 0, 1, temp=False)
+        dio_unit = game.create_unit(dio_char)
+        dio_unit.move_character(dio_char, 0, 7, temp=False)
+        pol_unit.add_char_to_unit(fast_char, 2)
+        dio_unit.add_char_to_unit(clone_char, 2)
+
+    return pol_unit, dio_unit
+
+def make_overkill_units(game):
+    """ Builds a unit with two strong characters in the front row, and a unit with a single weak
+        character who dies to the first hit.
+
+        Returns:
+            The close unit and the far unit.
+    """
+    with redirect_stdout(io.StringIO()):
+        first = game.create_character("First", KnightClass(), agility=9, strength=50, health=100)
+        second = game.create_character("Second", KnightClass(), agility=1, strength=50,
+                health=100)
+        victim = game.create_character("Victim", KnightClass(), agility=1, strength=1, health=10)
+        unit_close = game.create_unit(first)
+        unit_close.add_char_to_unit(second, 1)
+        unit_far = game.create_unit(victim)
+
+    return unit_close, unit_far
+
+class TestBattleHeadless(unittest.TestCase):
+    """ Tests running a Battle in headless mode.
+    """
+
+    def test_headless_battle_does_not_sleep_or_print(self):
+        """ Runs a headless battle and asserts nothing is printed and time.sleep is never called.
+        """
+        game = Game()
+        unit_close, unit_far = make_units(game)
+
+        battle = Battle(game, unit_close, unit_far, headless=True)
+        output = io.StringIO()
+        with patch("classes.battle.time.sleep") as sleep, redirect_stdout(output):
+            battle.fight_it_out()
+
+        sleep.assert_not_called()
+        self.assertEqual(output.getvalue(), "")
+        self.assertIsInstance(battle.sink, NullSink)
+
+    def test_headless_battle_sends_events_to_list_sink(self):
+        """ Runs a headless battle with a ListSink and asserts the events are in a sensible order.
+        """
+        game = Game()
+        unit_close, unit_far = make_units(game)
+
+        sink = ListSink()
+        battle = Battle(game, unit_close, unit_far, headless=True, sink=sink)
+        battle.fight_it_out()
+
+        kinds = sink.kinds()
+        self.assertEqual(kinds[:2], ["battle_start", "round_start"])
+        self.assertEqual(kinds[-1], "battle_end")
+
+        # every action does damage, and ends.
+        self.assertEqual(kinds.count("action"), kinds.count("damage"))
+        self.assertEqual(kinds.count("action"), kinds.count("action_end"))
+
+        # every death is a character whose health went to 0 or less.
+        for kind, fields in sink.events:
+            if kind == "death":
+                self.assertLessEqual(fields["target"].health, 0)
+
+    def test_default_battle_prints_to_console_and_sleeps(self):
+        """ Asserts a normal battle keeps the old console output and pacing.
+        """
+        game = Game()
+        unit_close, unit_far = make_units(game)
+
+        battle = Battle(game, unit_close, unit_far)
+        output = io.StringIO()
+        with patch("classes.battle.time.sleep") as sleep, redirect_stdout(output):
+            battle.fight_it_out()
+
+        self.assertIsInstance(battle.sink, ConsoleSink)
+        sleep.assert_called_with(Battle.row_delay_seconds)
+        self.assertIn("Round: 1", output.getvalue())
+        self.assertIn("damage from", output.getvalue())
+
+class TestBattleEnds(unittest.TestCase):
+    """ Tests how a battle ends.
+    """
+
+    def test_row_stops_when_the_enemy_unit_is_wiped_out(self):
+        """ Two characters share a row against one enemy who dies to the first hit, the second
+            character has nobody left to target and the battle ends.
+        """
+        game = Game()
+        unit_close, unit_far = make_overkill_units(game)
+
+        sink = ListSink()
+        Battle(game, unit_close, unit_far, headless=True, sink=sink, seed=1).fight_it_out()
+
+        self.assertEqual(sink.kinds().count("action"), 1)
+        self.assertEqual(sink.kinds().count("death"), 1)
+        self.assertEqual(sink.kinds()[-2:], ["unit_crushed", "battle_end"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+""" test_battle_events.py
+
+	This test suite contains all currently written unit tests for Battle.events() and the records
+	in battle_events.py.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_battle_events
+"""
+#pylint: disable=import-error # False positive.
+import copy
+import unittest
+from classes.game import Game
+from classes.battle import Battle
+from classes.battle_events import BattleEnd, BattleStart, Crit, Damage, RoundEnd, RoundStart
+from classes.battle_sinks import ListSink
+from classes.test.unit.test_battle import make_units
+
+class TestEvents(unittest.TestCase):
+    """ Tests reading a battle through Battle.events().
+    """
+
+    def test_events_match_the_sink(self):
+        """ Fights the same battle through events() and through a sink and asserts they saw the
+            same events.
+        """
+        unit_close, unit_far = make_units(Game())
+        close, far = copy.deepcopy((unit_close, unit_far))
+
+        records = list(Battle(None, unit_close, unit_far, headless=True, seed=5).events())
+        sink = ListSink()
+        Battle(None, close, far, headless=True, sink=sink, seed=5).fight_it_out()
+
+        self.assertIsInstance(records[0], BattleStart)
+        self.assertIsInstance(records[-1], BattleEnd)
+        self.assertEqual([record.kind for record in records], sink.kinds())
+        self.assertEqual([record.damage for record in records if isinstance(record, Damage)],
+                [fields["damage"] for kind, fields in sink.events if kind == "damage"])
+
+    def test_rounds_and_crits_pair_up(self):
+        """ Asserts every round that starts ends, and every crit comes right before a crit's
+            damage.
+        """
+        unit_close, unit_far = make_units(Game())
+        records = []
+        for seed in range(20):
+            close, far = copy.deepcopy((unit_close, unit_far))
+            records += Battle(None, close, far, headless=True, seed=seed).events()
+
+        starts = [record.round_number for record in records if isinstance(record, RoundStart)]
+        ends = [record.round_number for record in records if isinstance(record, RoundEnd)]
+        self.assertEqual(starts, ends)
+
+        crits = [index for index, record in enumerate(records) if isinstance(record, Crit)]
+        self.assertTrue(crits)
+        self.assertEqual(crits, [index - 1 for index, record in enumerate(records)
+                if isinstance(record, Damage) and record.is_crit])
+
+    def test_stopping_early(self):
+        """ Stops a battle at its first crit, which pushed someone back, and asserts everyone is
+            back in their base position, ready to act.
+        """
+        unit_close, unit_far = make_units(Game())
+        positions = [dict(unit.unit_chars) for unit in (unit_close, unit_far)]
+
+        events = Battle(None, unit_close, unit_far, headless=True, seed=3).events()
+        next(record for record in events if isinstance(record, Crit))
+        events.close()
+
+        self.assertEqual([dict(unit.unit_chars) for unit in (unit_close, unit_far)], positions)
+        for unit in (unit_close, unit_far):
+            for char in unit.unit_chars.values():
+                if char is not None:
+                    self.assertFalse(char.has_performed_action_this_round)
+
+if __name__ == "__main__":
+    unittest.main()
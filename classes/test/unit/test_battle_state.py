@@ -0,0 +1,89 @@
+""" test_battle_state.py
+
+	This test suite contains all currently written unit tests for the battle_state.py module.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_battle_state
+"""
+#pylint: disable=import-error # False positive.
+import copy
+import unittest
+from classes.battle import Battle
+from classes.battle_state import BattleState
+from classes.game import Game
+from classes.test.unit.test_battle import make_overkill_units, make_units
+
+def unit_stats(unit):
+    """ Gets the health, is_alive and position of every character in a unit.
+
+        Returns:
+            A list of (char_id, health, is_alive, position), in position order.
+    """
+    return [(char.char_id, char.health, char.is_alive, position)
+            for position, char in unit.unit_chars.items() if char is not None]
+
+class TestBattleState(unittest.TestCase):
+    """ Tests fighting battles on a BattleState.
+    """
+
+    def test_battle_leaves_the_units_alone(self):
+        """ Fights a battle where a character dies on a state, and asserts the game, its roster
+            and its units don't change.
+        """
+        game = Game()
+        unit_close, unit_far = make_overkill_units(game)
+        before = (game.snapshot(), unit_stats(unit_close), unit_stats(unit_far))
+
+        close, far = BattleState(unit_close, unit_far).units
+        Battle(game, close, far, headless=True, seed=1).fight_it_out()
+
+        self.assertFalse(far.is_any_char_alive())
+        self.assertTrue(unit_far.is_any_char_alive())
+        self.assertEqual((game.snapshot(), unit_stats(unit_close), unit_stats(unit_far)), before)
+        self.assertEqual(game.get_dead_chars(), [])
+
+    def test_matches_a_deepcopy(self):
+        """ Fights the same seeds on forks and on deep copies, and asserts they play out the
+            same way.
+        """
+        game = Game()
+        unit_close, unit_far = make_units(game)
+        unit_close.targeting_mode = "Weak"
+        state = BattleState(unit_close, unit_far)
+
+        for seed in range(20):
+            forked = Battle(None, *state.fork().units, headless=True, seed=seed)
+            copied = Battle(None, *copy.deepcopy((unit_close, unit_far)), headless=True,
+                    seed=seed)
+            self.assertEqual([event.kind for event in forked.events()],
+                    [event.kind for event in copied.events()])
+            self.assertEqual([unit_stats(unit) for unit in forked.units],
+                    [unit_stats(unit) for unit in copied.units])
+            self.assertEqual(forked.unit_close.targeting_mode, "Weak")
+
+    def test_fork_branches(self):
+        """ Forks a state part way through a battle and asserts the fork starts where the state
+            was, then changes on its own.
+        """
+        game = Game()
+        state = BattleState(*make_units(game))
+        close, far = state.units
+        events = Battle(None, close, far, headless=True, seed=5).events()
+        for event in events:
+            if event.kind == "damage":
+                break
+
+        fork = state.fork()
+        self.assertEqual([unit_stats(unit) for unit in fork.units],
+                [unit_stats(unit) for unit in state.units])
+        self.assertEqual(fork.units[1].unit_chars.alive_mask, far.unit_chars.alive_mask)
+
+        fork.units[0].unit_leader.health = 1
+        self.assertNotEqual(close.unit_leader.health, 1)
+        for _ in events:
+            pass
+        self.assertEqual(fork.units[0].unit_leader.health, 1)
+        self.assertIsNot(fork.units[0].unit_leader, close.unit_leader)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+""" test_battle_stats.py
+
+	This test suite contains all currently written unit tests for the battle_stats.py module.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_battle_stats
+"""
+#pylint: disable=import-error # False positive.
+import copy
+import unittest
+from classes.game import Game
+from classes.battle import Battle
+from classes.battle_sinks import ListSink
+from classes.battle_stats import BattleStats, PHASES
+from classes.simulator import run_battles
+from classes.test.unit.test_vector_battle import make_close_matchup
+
+def fight(units, seed, stats=None):
+    """ Fights a headless battle on copies of two units.
+
+        Returns:
+            The finished battle and the events it emitted.
+    """
+    close, far = copy.deepcopy(units)
+    sink = ListSink()
+    battle = Battle(None, close, far, headless=True, sink=sink, seed=seed, stats=stats)
+    battle.fight_it_out()
+    return battle, sink.events
+
+class TestBattleStats(unittest.TestCase):
+    """ Tests BattleStats on a Battle.
+    """
+
+    def test_counts_match_the_events(self):
+        """ Fights a battle with stats and asserts the counts agree with what it emitted.
+        """
+        stats = BattleStats()
+        battle, events = fight(make_close_matchup(Game()), 3, stats)
+        kinds = [kind for kind, _ in events]
+
+        self.assertEqual(stats.counters, {
+            "battles": 1,
+            "rounds": battle.round - 1,
+            "actions": kinds.count("action"),
+            "crits": sum(1 for kind, fields in events if kind == "damage" and fields["is_crit"]),
+            "deaths": kinds.count("death"),
+        })
+        self.assertEqual(stats.phase_calls["damage"], kinds.count("action"))
+        self.assertEqual(stats.phase_calls["position_reset"], 1)
+        for phase in PHASES:
+            self.assertGreater(stats.phase_calls[phase], 0)
+            self.assertGreaterEqual(stats.phase_seconds[phase], 0.0)
+
+    def test_does_not_change_the_battle(self):
+        """ Asserts a battle goes exactly the same way with and without stats.
+        """
+        units = make_close_matchup(Game())
+
+        _, plain = fight(units, 11)
+        _, instrumented = fight(units, 11, BattleStats())
+
+        self.assertEqual([(kind, fields.get("damage")) for kind, fields in plain],
+                [(kind, fields.get("damage")) for kind, fields in instrumented])
+
+    def test_uninstrumented_battle_is_untouched(self):
+        """ Asserts a battle without stats keeps its own methods and sink.
+        """
+        battle, _ = fight(make_close_matchup(Game()), 1)
+
+        self.assertIsNone(battle.stats)
+        self.assertIsInstance(battle.sink, ListSink)
+        for methods in PHASES.values():
+            for method in methods:
+                self.assertNotIn(method, vars(battle))
+
+    def test_batch_and_merge(self):
+        """ Collects stats over a batch of battles and merges two batches.
+        """
+        unit_close, unit_far = make_close_matchup(Game())
+        first, second = BattleStats(), BattleStats()
+
+        result = run_battles(unit_close, unit_far, 6, seed=2, stats=first)
+        run_battles(unit_close, unit_far, 4, seed=3, stats=second)
+        first_rounds = first.counters["rounds"]
+        first.merge(second)
+
+        self.assertEqual(first_rounds, result.total_rounds)
+        self.assertEqual(first.counters["battles"], 10)
+        self.assertEqual(first.counters["rounds"], first_rounds + second.counters["rounds"])
+        self.assertAlmostEqual(first.per_battle()["rounds"], first.counters["rounds"] / 10)
+
+    def test_openmetrics(self):
+        """ Dumps stats as OpenMetrics and asserts every phase and counter is in it.
+        """
+        stats = BattleStats()
+        fight(make_close_matchup(Game()), 5, stats)
+
+        text = stats.to_openmetrics()
+        lines = text.splitlines()
+
+        self.assertTrue(text.endswith("# EOF\n"))
+        self.assertIn("# TYPE battle_phase_seconds counter", lines)
+        self.assertIn("# UNIT battle_phase_seconds seconds", lines)
+        self.assertIn(f'battle_phase_calls_total{{phase="damage"}} '
+                f'{stats.phase_calls["damage"]}', lines)
+        self.assertIn('battle_events_total{event="battles"} 1', lines)
+        samples = [line for line in lines if not line.startswith("#")]
+        self.assertEqual(len(samples), 2 * len(PHASES) + len(stats.counters))
+
+if __name__ == "__main__":
+    unittest.main()
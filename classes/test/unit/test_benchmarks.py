@@ -0,0 +1,84 @@
+""" test_benchmarks.py
+
+	This test suite contains all currently written unit tests for the benchmark suite in
+	classes/test/benchmark/benchmarks.py.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_benchmarks
+"""
+#pylint: disable=import-error # False positive.
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+from classes.test.benchmark import benchmarks
+
+class TestBuildGame(unittest.TestCase):
+    """ Tests build_game()
+    """
+
+    def test_roster_is_split_into_units(self):
+        """ Builds a roster that doesn't divide evenly and asserts every char is in a unit.
+        """
+        game = benchmarks.build_game(20)
+
+        self.assertEqual(game.char_index, 20)
+        self.assertEqual(game.unit_index, 3)
+        self.assertTrue(all(char.unit_id > 0 for char in game.chars.values()))
+
+class TestRunBenchmarks(unittest.TestCase):
+    """ Tests run_benchmarks()
+    """
+
+    @patch.object(benchmarks, "MIN_TIME", 0)
+    @patch.object(benchmarks, "CALLS", 10)
+    @patch.object(benchmarks, "BATTLES", 2)
+    def test_every_benchmark_at_every_size(self):
+        """ Runs a tiny suite and asserts there's a positive rate for each benchmark and size.
+        """
+        results = benchmarks.run_benchmarks(sizes=[10, 30])
+
+        self.assertEqual(len(results), 2 * len(benchmarks.BENCHMARKS))
+        self.assertIn("fight_it_out[30]", results)
+        self.assertTrue(all(rate > 0 for rate in results.values()))
+
+class TestCompare(unittest.TestCase):
+    """ Tests compare()
+    """
+
+    def test_only_drops_past_the_threshold_regress(self):
+        """ Asserts a benchmark only regresses when it loses more than the threshold.
+        """
+        baseline = {"a[10]": 100.0, "b[10]": 100.0, "c[10]": 100.0}
+        results = {"a[10]": 80.0, "b[10]": 70.0, "c[10]": 150.0, "d[10]": 1.0}
+
+        self.assertEqual(benchmarks.compare(results, baseline, 0.25), [("b[10]", 100.0, 70.0)])
+        self.assertEqual(benchmarks.compare(results, baseline, 0.1),
+                [("a[10]", 100.0, 80.0), ("b[10]", 100.0, 70.0)])
+
+class TestMain(unittest.TestCase):
+    """ Tests main()
+    """
+
+    def test_save_then_compare(self):
+        """ Saves a baseline, then asserts a run fails once the baseline is out of reach.
+        """
+        fake = {"fight_it_out[10]": 50.0}
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "baseline.json")
+            with patch.object(benchmarks, "run_benchmarks", return_value=fake), \
+                    redirect_stdout(io.StringIO()) as out:
+                self.assertEqual(benchmarks.main(["--baseline", path]), 0)
+                self.assertIn("No baseline", out.getvalue())
+                self.assertEqual(benchmarks.main(["--baseline", path, "--save"]), 0)
+                self.assertEqual(benchmarks.load_baseline(path), fake)
+                self.assertEqual(benchmarks.main(["--baseline", path]), 0)
+
+                benchmarks.save_baseline(path, {"fight_it_out[10]": 100.0})
+                self.assertEqual(benchmarks.main(["--baseline", path]), 1)
+                self.assertIn("REGRESSION fight_it_out[10]", out.getvalue())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+""" test_bulk.py
+
+	This test suite contains all currently written unit tests for the bulk.py module.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_bulk
+"""
+#pylint: disable=import-error # False positive.
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+import numpy as np
+from classes.bulk import ColumnError, load_columns, load_csv
+from classes.game import Game
+from classes.unit_classes.knight import KnightClass
+
+COLUMNS = {
+    "name": ["Pol", "PolFast", "Dio", "Clone", "Extra"],
+    "class_id": [1, 1, 1, 1, 0],
+    "agility": [2, 4, 4, 1, 3],
+    "strength": [10, 3, 5, 5, 1],
+    "health": [100, 50, 100, 10, 20],
+    "unit_id": [10, 10, 20, 20, 10],
+    "position": [1, 2, 7, 2, 8],
+}
+
+class TestLoadColumns(unittest.TestCase):
+    """ Tests load_columns()
+    """
+
+    def test_lists(self):
+        """ Loads columns of lists and asserts every character and unit is made quietly.
+        """
+        game = Game()
+        output = io.StringIO()
+        with redirect_stdout(output):
+            chars, units = load_columns(game, COLUMNS, targeting_mode="Weak")
+
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual([char.char_id for char in chars], [1, 2, 3, 4, 5])
+        self.assertIs(chars[0].char_class, KnightClass())
+        self.assertEqual(chars[4].char_class.class_id, 0)
+        self.assertEqual([unit.unit_id for unit in units], [1, 2])
+        self.assertEqual([unit.unit_leader.char_name for unit in units], ["Pol", "Dio"])
+        self.assertEqual(units[0].unit_chars[8].char_name, "Extra")
+        self.assertEqual(units[1].targeting_mode, "Weak")
+        self.assertEqual(chars[3].unit_id, 2)
+        self.assertEqual(chars[3].base_position, 2)
+        self.assertEqual(units[0].get_character_position(chars[1]), 2)
+
+    def test_arrays_after_existing_characters(self):
+        """ Loads numpy columns into a game that already has characters, and asserts the new
+            ids carry on from the old ones.
+        """
+        game = Game()
+        with redirect_stdout(io.StringIO()):
+            game.create_unit(game.create_character("Old", KnightClass(), 1, 1, 1))
+        columns = {name: np.array(values) for name, values in COLUMNS.items()}
+
+        chars, units = load_columns(game, columns)
+
+        self.assertEqual(chars[0].char_id, 2)
+        self.assertEqual(units[0].unit_id, 2)
+        self.assertEqual(chars[2].health, 100)
+        self.assertEqual(len(game.chars), 6)
+
+    def test_bad_columns(self):
+        """ Asserts bad columns raise ColumnError and leave the game as it was.
+        """
+        broken = [
+            {name: values for name, values in COLUMNS.items() if name != "health"},
+            dict(COLUMNS, agility=[1, 2, 3]),
+            dict(COLUMNS, strength=[1, 2, "lots", 4, 5]),
+            dict(COLUMNS, class_id=[1, 1, 1, 1, 999]),
+            dict(COLUMNS, health=[100, 50, 100, 10, 2 ** 40]),
+            dict(COLUMNS, agility=[2, 4, -2 ** 40, 1, 3]),
+            dict(COLUMNS, agility=[2.9, 4, 1, 1, 3]),
+            dict(COLUMNS, unit_id=[0, 0, 1, 1, float("inf")]),
+            dict(COLUMNS, health=[100, 50, 100, 10, "7.5"]),
+            dict(COLUMNS, position=[1, 2, 7, 2, 9]),
+            dict(COLUMNS, position=[1, 2, 7, 2, 1]),
+        ]
+        game = Game()
+        for columns in broken:
+            with self.assertRaises(ColumnError):
+                load_columns(game, columns)
+
+        self.assertEqual((game.chars, game.units, len(game.roster)), ({}, {}, 0))
+
+class TestLoadCsv(unittest.TestCase):
+    """ Tests load_csv()
+    """
+
+    def test_csv(self):
+        """ Writes the columns out as csv, loads them and asserts they match loading the columns.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "roster.csv")
+            with open(path, "w", encoding="utf-8") as csv_file:
+                csv_file.write(",".join(COLUMNS) + "\n")
+                for row in zip(*COLUMNS.values()):
+                    csv_file.write(",".join(map(str, row)) + "\n")
+
+            chars, units = load_csv(Game(), path)
+
+        expected_chars, expected_units = load_columns(Game(), COLUMNS)
+        self.assertEqual([(char.char_name, char.agility, char.unit_id) for char in chars],
+                [(char.char_name, char.agility, char.unit_id) for char in expected_chars])
+        self.assertEqual([unit.unit_chars.occupied_mask for unit in units],
+                [unit.unit_chars.occupied_mask for unit in expected_units])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+""" test_catalog.py
+
+	This test suite contains all currently written unit tests for the catalog.py module.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_catalog
+"""
+#pylint: disable=import-error # False positive.
+#pylint: disable=no-member # the VectorBattle arrays are made from ROW_FIELDS.
+import io
+import os
+import pickle
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+from classes import catalog
+from classes.catalog import CatalogError, default_catalog, load_catalog, load_tables
+from classes.game import Game
+from classes.registry import get_class
+from classes.vector_battle import VectorBattle
+from classes.unit_classes.knight import KnightClass
+
+LANCER = """
+[actions.Thrust]
+action_id = 201
+description = "Thrust"
+damage = 3
+damage_stat = "agility"
+crit_multiplier = 3
+crit_rate = 0.25
+can_crit = true
+
+[actions.Shove]
+action_id = 202
+crit_rate = 0.5
+can_crit = false
+
+[classes.Lancer]
+class_id = 201
+actions = ["Thrust", "Thrust", "Shove"]
+num_actions = [1, 2, 3]
+"""
+
+def write_catalog(folder, text):
+    """ Writes a catalog toml into a folder.
+
+        Returns:
+            The path of the toml.
+    """
+    path = os.path.join(folder, "catalog.toml")
+    with open(path, "w", encoding="utf-8") as catalog_file:
+        catalog_file.write(text)
+
+    return path
+
+class TestDefaultCatalog(unittest.TestCase):
+    """ Tests the catalog that comes with the game.
+    """
+
+    def test_knight(self):
+        """ Asserts the knight loaded from the catalog is the knight the game always had.
+        """
+        knight = default_catalog().classes["Knight"]
+
+        self.assertIs(knight, KnightClass())
+        self.assertEqual(knight.class_id, 1)
+        self.assertEqual(dict(knight.num_actions), {0: 2, 1: 1, 2: 1})
+        self.assertEqual({str(action) for action in knight.actions.values()}, {"Slash"})
+        self.assertEqual(knight.actions[0].crit_rate, .1)
+
+class TestLoadTables(unittest.TestCase):
+    """ Tests load_tables()
+    """
+
+    def test_cache_skips_parsing(self):
+        """ Loads a catalog twice and asserts the second load comes from the cache, until the
+            toml changes.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            path = write_catalog(folder, LANCER)
+            tables = load_tables(path)
+
+            self.assertTrue(os.path.exists(os.path.join(folder, "__pycache__",
+                    "catalog.toml.cache")))
+            with patch.object(catalog, "_parse", side_effect=AssertionError("parsed")):
+                self.assertEqual(load_tables(path), tables)
+
+            write_catalog(folder, LANCER.replace("damage = 3", "damage = 4"))
+            self.assertEqual(load_tables(path)["damage"], [4, 0])
+
+    def test_flat_tables(self):
+        """ Asserts the compiled tables have one entry per action and three per class.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            tables = load_tables(write_catalog(folder, LANCER), use_cache=False)
+
+        self.assertEqual(tables["action_names"], ["Thrust", "Shove"])
+        self.assertEqual(tables["description"], ["Thrust", "Shove"])
+        self.assertEqual(tables["can_crit"], [True, False])
+        self.assertEqual(tables["row_actions"], [0, 0, 1])
+        self.assertEqual(tables["row_num_actions"], [1, 2, 3])
+
+    def test_bad_catalogs(self):
+        """ Asserts broken catalogs raise CatalogError.
+        """
+        broken = [
+            "not toml [",
+            "[actions]\n",
+            LANCER.replace('"Shove"]', '"Smash"]'),
+            LANCER.replace("action_id = 202", "action_id = 201"),
+            LANCER.replace('"agility"', '"health"'),
+            LANCER.replace("num_actions = [1, 2, 3]", "num_actions = [1, 2]"),
+            LANCER.replace("crit_rate = 0.25", 'crit_rate = "high"'),
+        ]
+        with tempfile.TemporaryDirectory() as folder:
+            for text in broken:
+                with self.assertRaises(CatalogError):
+                    load_tables(write_catalog(folder, text), use_cache=False)
+
+class TestLoadCatalog(unittest.TestCase):
+    """ Tests load_catalog()
+    """
+
+    def test_new_class_without_code(self):
+        """ Loads a class only defined in toml and asserts the engines use its values.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            lancers = load_catalog(write_catalog(folder, LANCER), use_cache=False)
+        lancer = lancers.classes["Lancer"]
+
+        self.assertIs(get_class(201), lancer)
+        self.assertIs(pickle.loads(pickle.dumps(lancer)), lancer)
+
+        game = Game()
+        with redirect_stdout(io.StringIO()):
+            char = game.create_character("Lance", lancer, agility=5, strength=50, health=30)
+            foe = game.create_character("Foe", KnightClass(), agility=1, strength=1, health=90)
+            unit_close = game.create_unit(char)
+            unit_far = game.create_unit(foe)
+
+        thrust = char.get_action_by_row()
+        self.assertEqual(thrust.get_damage(char, is_crit=False), 8)
+        self.assertEqual(thrust.get_damage(char, is_crit=True), 24)
+        self.assertEqual(char.get_num_actions(), 1)
+
+        battles = VectorBattle.from_units(unit_close, unit_far, 2, seed=1)
+        self.assertEqual(battles.hit_damage[0, 0, 0].tolist(), [8, 8, 50])
+        self.assertEqual(battles.crit_damage[0, 0, 0].tolist(), [24, 24, 100])
+        self.assertEqual(battles.can_crit[0, 0, 0].tolist(), [True, True, False])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+""" test_exact_solver.py
+
+	This test suite contains all currently written unit tests for the exact_solver.py module.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_exact_solver
+"""
+#pylint: disable=import-error # False positive.
+import copy
+import io
+import unittest
+from contextlib import redirect_stdout
+from classes.game import Game
+from classes.battle import Battle
+from classes.battle_sinks import ListSink
+from classes.exact_solver import solve_matchup, CLOSE, FAR
+from classes.rng import RngStream
+from classes.simulator import simulate_matchup
+from classes.unit_classes.knight import KnightClass
+from classes.test.unit.test_vector_battle import make_close_matchup
+
+class ScriptedStream(RngStream):
+    """ A stream that crits exactly when the script says so, and never once the script runs out.
+    """
+    #pylint: disable=too-few-public-methods # This is fine.
+
+    def __init__(self, script):
+        super().__init__(0)
+        self.script = list(script)
+
+    def uniform(self) -> float:
+        """ Rolls a sure crit or a sure miss, whichever is next in the script.
+        """
+        if self.script:
+            return 0.0 if self.script.pop(0) else 0.999999
+
+        return 0.999999
+
+def make_duel(game):
+    """ Builds a small matchup where crits decide who wins.
+
+        Returns:
+            The close unit and the far unit.
+    """
+    with redirect_stdout(io.StringIO()):
+        first = game.create_character("First", KnightClass(), agility=5, strength=10, health=20)
+        second = game.create_character("Second", KnightClass(), agility=2, strength=6, health=14)
+        third = game.create_character("Third", KnightClass(), agility=9, strength=12, health=30)
+
+        unit_close = game.create_unit(first)
+        unit_close.add_char_to_unit(second, 3)
+        unit_far = game.create_unit(third)
+        unit_far.targeting_mode = "Weak"
+
+    return unit_close, unit_far
+
+def enumerate_battles(unit_close, unit_far, script=()):
+    """ Fights every possible battle on the object engine, one for each way the crits can go.
+
+        Returns:
+            A dict of (rounds, health of each char, alive) -> probability, keyed the same way as
+            ExactResult.outcomes.
+    """
+    close, far = copy.deepcopy((unit_close, unit_far))
+    sink = ListSink()
+    battle = Battle(None, close, far, headless=True, sink=sink, seed=ScriptedStream(script))
+    battle.fight_it_out()
+
+    chances = [fields["action"].crit_rate + fields["actor"].agility / 100
+            for kind, fields in sink.events if kind == "action"]
+    if len(script) < len(chances):
+        outcomes = {}
+        for is_crit in (True, False):
+            for outcome, probability in enumerate_battles(unit_close, unit_far,
+                    tuple(script) + (is_crit,)).items():
+                outcomes[outcome] = outcomes.get(outcome, 0.0) + probability
+        return outcomes
+
+    probability = 1.0
+    for chance, is_crit in zip(chances, script):
+        probability *= chance if is_crit else 1.0 - chance
+
+    chars = [char for unit in (close, far) for char in
+            sorted((c for c in unit.unit_chars.values() if c is not None),
+                    key=lambda c: c.base_position)]
+    alive = sum(1 << index for index, char in enumerate(chars) if char.is_alive)
+    return {(battle.round - 1, tuple(char.health for char in chars), alive): probability}
+
+class TestSolveMatchup(unittest.TestCase):
+    """ Tests solve_matchup()
+    """
+
+    def test_matches_every_object_engine_battle(self):
+        """ Fights every crit branch on the object engine and asserts the solver gives exactly the
+            same outcome distribution.
+        """
+        unit_close, unit_far = make_duel(Game())
+
+        expected = enumerate_battles(unit_close, unit_far)
+        result = solve_matchup(unit_close, unit_far)
+
+        self.assertEqual(set(result.outcomes), set(expected))
+        for outcome, probability in expected.items():
+            self.assertAlmostEqual(result.outcomes[outcome], probability, places=12)
+        self.assertGreater(result.win_rate, 0)
+        self.assertGreater(result.loss_rate, 0)
+
+    def test_probabilities_add_up(self):
+        """ Asserts the outcome and health distributions each sum to one.
+        """
+        unit_close, unit_far = make_duel(Game())
+
+        result = solve_matchup(unit_close, unit_far)
+
+        self.assertAlmostEqual(result.win_rate + result.loss_rate + result.draw_rate, 1.0)
+        self.assertAlmostEqual(sum(result.survivors(CLOSE).values()), 1.0)
+        self.assertAlmostEqual(sum(result.health_distribution(unit_far.unit_leader.char_id)
+                .values()), 1.0)
+        self.assertEqual([side for side, _, _ in result.chars], [CLOSE, CLOSE, FAR])
+
+    def test_agrees_with_monte_carlo(self):
+        """ Asserts a bigger matchup lands within sampling error of simulate_matchup.
+        """
+        unit_close, unit_far = make_close_matchup(Game())
+
+        exact = solve_matchup(unit_close, unit_far)
+        sampled = simulate_matchup(unit_close, unit_far, 4000, workers=1, seed=2)
+
+        self.assertAlmostEqual(exact.mean_rounds, sampled.mean_rounds, delta=0.02)
+        self.assertAlmostEqual(exact.mean_survivors_close, sampled.mean_survivors_close,
+                delta=0.03)
+        self.assertAlmostEqual(exact.mean_survivors_far, sampled.mean_survivors_far, delta=0.03)
+
+    def test_units_are_not_changed(self):
+        """ Solves a matchup and asserts both units are exactly as they were.
+        """
+        game = Game()
+        unit_close, unit_far = make_duel(game)
+        before = game.snapshot()
+
+        solve_matchup(unit_close, unit_far)
+
+        self.assertEqual(game.snapshot(), before)
+        self.assertEqual(unit_far.unit_chars.alive_mask, 1)
+
+if __name__ == "__main__":
+    unittest.main()
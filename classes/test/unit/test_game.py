@@ -0,0 +1,351 @@
+""" test_game.py
+
+	This test suite contains all currently written unit tests for the game.py class.
+
+	There is one class for every game feature, so new test cases should be added as functions
+	belonging to the classes in this file.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_game
+"""
+#pylint: disable=import-error # False positive.
+import copy
+import io
+import os
+import struct
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from classes.game import Game
+from classes.battle import Battle
+from classes.battle_sinks import ListSink
+from classes.snapshot import SnapshotError
+from classes.test.unit.test_battle import make_overkill_units, make_units
+from classes.unit_classes.knight import KnightClass
+
+class TestGameInstances(unittest.TestCase):
+    """ Tests that every Game keeps its own state.
+    """
+
+    def test_games_do_not_share_characters(self):
+        """ Creates characters in two games and asserts each game only sees its own.
+        """
+        first = Game()
+        second = Game()
+        make_units(first)
+
+        self.assertEqual(len(first.chars), 4)
+        self.assertEqual(len(first.units), 2)
+        self.assertEqual(second.chars, {})
+        self.assertEqual(second.units, {})
+        self.assertIsNot(first.roster, second.roster)
+
+    def test_ids_start_at_one_in_every_game(self):
+        """ Asserts the first character and unit of a new game always get id 1.
+        """
+        make_units(Game())
+        game = Game()
+        unit_close, _ = make_units(game)
+
+        self.assertEqual(min(game.chars), 1)
+        self.assertEqual(unit_close.unit_id, 1)
+
+class TestGameChars(unittest.TestCase):
+    """ Tests that Game.chars makes characters from the roster when they're asked for.
+    """
+
+    def test_same_character_every_time(self):
+        """ Asserts asking for a character twice gives the same one, in a unit or not, and a
+            character no one holds isn't kept.
+        """
+        game = Game()
+        unit_close, _ = make_units(game)
+        spare = game.create_character("Spare", KnightClass(), agility=1, strength=1, health=1)
+
+        self.assertIs(game.chars[1], unit_close.unit_leader)
+        self.assertIs(game.chars[5], spare)
+        self.assertEqual(list(game.chars), [1, 2, 3, 4, 5])
+        self.assertNotIn(6, game.chars)
+        with self.assertRaises(KeyError):
+            game.chars[0] #pylint: disable=pointless-statement # the lookup is the test.
+
+        del spare
+        game.chars[5].char_name = "Renamed"
+        self.assertEqual(game.chars[5].char_name, "Renamed")
+        self.assertNotIn(5, game.chars._loose) #pylint: disable=protected-access # nothing kept.
+
+    def test_restore_makes_only_unit_characters(self):
+        """ Restores a game with characters in no unit and asserts they're made from the roster
+            when asked for, with their stats and names.
+        """
+        game = Game()
+        make_units(game)
+        game.create_characters(["A", "B"], [KnightClass()] * 2, [1] * 2, [2] * 2, [10] * 2)
+
+        restored = Game()
+        restored.restore(game.snapshot())
+
+        self.assertEqual(len(restored.chars._loose), 0) #pylint: disable=protected-access # lazy.
+        loose = restored.chars[6]
+        self.assertEqual((loose.char_name, loose.strength, loose.health, loose.unit_id),
+                ("B", 2, 10, -1))
+        self.assertIs(restored.chars[6], loose)
+        self.assertIs(restored.chars[2], restored.units[1].unit_chars[2])
+
+class TestGameBulk(unittest.TestCase):
+    """ Tests creating many characters and units at once.
+    """
+
+    def test_bulk_matches_one_at_a_time(self):
+        """ Builds the same units with create_characters/create_units and one call at a time,
+            and asserts they end up the same.
+        """
+        single = Game()
+        make_units(single)
+
+        bulk = Game()
+        stats = [(char.char_name, char.char_class, char.agility, char.strength, char.max_health)
+                for char in single.chars.values()]
+        chars = bulk.create_characters(*map(list, zip(*stats)))
+        output = io.StringIO()
+        with redirect_stdout(output):
+            units = bulk.create_units([[(chars[0], 1), (chars[1], 2)], [(chars[2], 7),
+                    (chars[3], 2)]])
+
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual([unit.unit_id for unit in units], [1, 2])
+        for unit_id, unit in single.units.items():
+            other = bulk.units[unit_id]
+            self.assertEqual(other.unit_leader.char_id, unit.unit_leader.char_id)
+            self.assertEqual({position: char and char.char_id
+                    for position, char in other.unit_chars.items()},
+                    {position: char and char.char_id for position, char in unit.unit_chars.items()})
+            for mask in ("occupied_mask", "alive_mask", "acted_mask", "num_actions"):
+                self.assertEqual(getattr(other.unit_chars, mask), getattr(unit.unit_chars, mask))
+
+        self.assertEqual(bulk.roster.unit_id, single.roster.unit_id)
+        self.assertEqual(bulk.roster.base_position, single.roster.base_position)
+        self.assertEqual(bulk.roster.health, single.roster.health)
+
+    def test_bad_formation_makes_nothing(self):
+        """ Asserts create_units checks every formation before making any unit.
+        """
+        game = Game()
+        chars = game.create_characters(["A", "B", "C"], [KnightClass()] * 3, [1] * 3, [1] * 3,
+                [10] * 3)
+
+        bad = [
+            [[(chars[0], 0)], [(chars[1], 9)]],
+            [[(chars[0], 0)], [(chars[1], 4), (chars[2], 4)]],
+            [[(chars[0], 0)], [(chars[0], 1)]],
+            [[(chars[0], 0)], []],
+        ]
+        for formations in bad:
+            with self.assertRaises(ValueError):
+                game.create_units(formations)
+
+        self.assertEqual(game.units, {})
+        self.assertEqual([char.unit_id for char in chars], [-1, -1, -1])
+
+class TestGameIndexes(unittest.TestCase):
+    """ Tests looking characters up by name, unit, class and whether they're alive.
+    """
+
+    def test_lookups(self):
+        """ Builds the run.py units and asserts every lookup finds the right characters.
+        """
+        game = Game()
+        unit_close, unit_far = make_units(game)
+        spare = game.create_character("Pol", KnightClass(), agility=1, strength=1, health=1)
+
+        self.assertIs(game.get_char_by_id(3), game.chars[3])
+        self.assertIsNone(game.get_char_by_id(99))
+        self.assertIsNone(game._chars_by_name) #pylint: disable=protected-access # made when used.
+        self.assertEqual(game.get_chars_by_name("Pol"), [game.chars[1], spare])
+        self.assertEqual(game.get_chars_by_name("Nobody"), [])
+        self.assertEqual(len(game.get_chars_by_class(KnightClass().class_id)), 5)
+        self.assertEqual(game.get_chars_in_unit(unit_close.unit_id), [game.chars[1], game.chars[2]])
+        self.assertEqual(game.get_chars_in_unit(unit_far.unit_id), [game.chars[3], game.chars[4]])
+        self.assertEqual(game.get_dead_chars(), [])
+        self.assertEqual(game.count_alive(), 5)
+
+        with redirect_stdout(io.StringIO()):
+            unit_close.add_char_to_unit(spare, 5)
+        self.assertEqual(game.get_chars_in_unit(unit_close.unit_id)[-1], spare)
+
+    def test_battle_deaths(self):
+        """ Fights a battle where a character dies, and asserts the dead and alive lookups match
+            the characters.
+        """
+        game = Game()
+        unit_close, unit_far = make_overkill_units(game)
+        Battle(game, unit_close, unit_far, headless=True, seed=3).fight_it_out()
+
+        dead = [char for char in game.chars.values() if not char.is_alive]
+        self.assertTrue(dead)
+        self.assertEqual(game.get_dead_chars(), dead)
+        self.assertEqual(game.get_alive_chars(),
+                [char for char in game.chars.values() if char.is_alive])
+        self.assertEqual(game.count_alive(), len(game.chars) - len(dead))
+
+        game.roster.restore()
+        self.assertEqual(game.get_dead_chars(), [])
+
+    def test_restore_and_bulk(self):
+        """ Asserts the indexes are rebuilt by restore() and kept by create_characters and
+            create_units.
+        """
+        game = Game()
+        unit_close, _ = make_units(game)
+        game.chars[2].is_alive = False
+
+        restored = Game()
+        restored.restore(game.snapshot())
+        self.assertEqual([char.char_id for char in restored.get_dead_chars()], [2])
+        self.assertEqual([char.char_id for char in restored.get_chars_in_unit(unit_close.unit_id)],
+                [1, 2])
+        self.assertEqual([char.char_id for char in restored.get_chars_by_name("Clone")], [4])
+
+        chars = restored.create_characters(["A", "B"], [KnightClass()] * 2, [1] * 2, [1] * 2,
+                [10] * 2)
+        units = restored.create_units([[(chars[0], 0), (chars[1], 1)]])
+        self.assertEqual(restored.get_chars_in_unit(units[0].unit_id), chars)
+        self.assertEqual(restored.get_chars_by_name("B"), [chars[1]])
+        self.assertEqual(restored.count_alive(), 5)
+
+class TestGameSnapshot(unittest.TestCase):
+    """ Tests Game.snapshot() and Game.restore()
+    """
+
+    def test_restore_keeps_every_character(self):
+        """ Snapshots a game part way through a battle and asserts the restored game has the same
+            stats, positions and unit masks.
+        """
+        game = Game()
+        unit_close, unit_far = make_units(game)
+        unit_far.targeting_mode = "Weak"
+        fast_char = game.chars[2]
+        fast_char.health = 7
+        fast_char.status = "Sleep"
+        unit_close.update_char_state(fast_char)
+
+        restored = Game()
+        restored.restore(game.snapshot())
+
+        self.assertEqual(restored.char_index, game.char_index)
+        self.assertEqual(restored.unit_index, game.unit_index)
+        for char_id, char in game.chars.items():
+            copied = restored.chars[char_id]
+            self.assertEqual(copied.char_name, char.char_name)
+            self.assertEqual(copied.char_class.class_id, char.char_class.class_id)
+            self.assertEqual((copied.health, copied.max_health, copied.agility, copied.strength),
+                    (char.health, char.max_health, char.agility, char.strength))
+            self.assertEqual((copied.unit_id, copied.base_position, copied.current_position),
+                    (char.unit_id, char.base_position, char.current_position))
+            self.assertEqual(copied.status, char.status)
+
+        for unit_id, unit in game.units.items():
+            copied = restored.units[unit_id]
+            self.assertEqual(copied.unit_leader.char_id, unit.unit_leader.char_id)
+            self.assertEqual(copied.targeting_mode, unit.targeting_mode)
+            self.assertEqual(copied.print_unit_map(), unit.print_unit_map())
+            self.assertEqual(copied.unit_chars.alive_mask, unit.unit_chars.alive_mask)
+            self.assertEqual(copied.unit_chars.blocked_mask, unit.unit_chars.blocked_mask)
+
+    def test_restored_game_fights_the_same_battle(self):
+        """ Fights a battle in a game and in its restored snapshot with the same seed and asserts
+            the events are identical.
+        """
+        game = Game()
+        make_units(game)
+        restored = Game()
+        restored.restore(game.snapshot())
+
+        events = []
+        for each in (game, restored):
+            sink = ListSink()
+            with redirect_stdout(io.StringIO()):
+                Battle(each, each.units[1], each.units[2], headless=True, sink=sink,
+                        seed=9).fight_it_out()
+            events.append([(kind, fields.get("damage")) for kind, fields in sink.events])
+
+        self.assertEqual(events[0], events[1])
+
+    def test_restore_is_a_checkpoint(self):
+        """ Snapshots a game, changes it, restores it and asserts the change is gone.
+        """
+        game = Game()
+        make_units(game)
+        checkpoint = game.snapshot()
+        game.chars[1].health = 1
+        game.create_character("Extra", copy.copy(game.chars[1].char_class), agility=1,
+                strength=1, health=1)
+
+        game.restore(checkpoint)
+
+        self.assertEqual(game.chars[1].health, 100)
+        self.assertEqual(len(game.chars), 4)
+        self.assertEqual(game.char_index, 4)
+
+    def test_save_and_load_a_file(self):
+        """ Saves a game to a file and loads it back as a new game.
+        """
+        game = Game()
+        make_units(game)
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "game.snapshot")
+            game.save(path)
+            loaded = Game.load(path)
+
+        self.assertEqual(loaded.snapshot(), game.snapshot())
+
+    def test_long_names_come_back_whole(self):
+        """ Snapshots a character whose name is more than 255 bytes of two byte characters and
+            asserts it restores with the whole name.
+        """
+        game = Game()
+        game.create_character("\u00e9" * 200, KnightClass(), agility=1, strength=1, health=1)
+
+        restored = Game()
+        restored.restore(game.snapshot())
+
+        self.assertEqual(restored.chars[1].char_name, "\u00e9" * 200)
+
+    def test_name_too_long_to_snapshot(self):
+        """ Asserts a name too long to pack raises a SnapshotError rather than being cut short.
+        """
+        game = Game()
+        game.create_character("x" * 70000, KnightClass(), agility=1, strength=1, health=1)
+
+        with self.assertRaises(SnapshotError):
+            game.snapshot()
+
+    def test_restore_rejects_garbage(self):
+        """ Asserts restoring something that isn't a snapshot raises a SnapshotError.
+        """
+        with self.assertRaises(SnapshotError):
+            Game().restore(b"this is not a snapshot")
+
+    def test_restore_rejects_damaged_snapshots(self):
+        """ Cuts a snapshot short at every length, garbles a name and moves a character off the
+            roster, and asserts each one raises a SnapshotError and leaves the game alone.
+        """
+        game = Game()
+        make_units(game)
+        data = game.snapshot()
+        record = struct.pack("<IH", 1, KnightClass().class_id)
+
+        damaged = [data[:size] for size in range(len(data))]
+        damaged.append(data + b"extra")
+        damaged.append(data.replace(b"PolFast", b"\xff" * 7))
+        damaged.append(data.replace(record, struct.pack("<IH", 999, KnightClass().class_id)))
+        target = Game()
+        before = target.snapshot()
+        for each in damaged:
+            with self.assertRaises(SnapshotError):
+                target.restore(each)
+            self.assertEqual(target.snapshot(), before)
+
+if __name__ == "__main__":
+    unittest.main()
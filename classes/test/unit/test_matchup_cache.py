@@ -0,0 +1,164 @@
+""" test_matchup_cache.py
+
+	This test suite contains all currently written unit tests for the matchup_cache.py module.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_matchup_cache
+"""
+#pylint: disable=import-error # False positive.
+import copy
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from classes.catalog import build_catalog, load_tables
+from classes.game import Game
+from classes.matchup_cache import MatchupCache, unit_hash
+from classes.simulator import MatchupResult
+from classes.test.unit.test_vector_battle import make_close_matchup
+
+class TestUnitHash(unittest.TestCase):
+    """ Tests unit_hash()
+    """
+
+    def test_same_set_up_same_hash(self):
+        """ Builds the same units in two games and asserts they hash the same.
+        """
+        first_close, first_far = make_close_matchup(Game())
+        second_close, second_far = make_close_matchup(Game())
+
+        self.assertEqual(unit_hash(first_close), unit_hash(second_close))
+        self.assertEqual(unit_hash(first_far), unit_hash(second_far))
+        self.assertNotEqual(unit_hash(first_close), unit_hash(first_far))
+
+    def test_changes_that_matter_change_the_hash(self):
+        """ Changes a stat, a position and the targeting mode, and asserts each one changes the
+            hash.
+        """
+        unit_close, _ = make_close_matchup(Game())
+        hashes = {unit_hash(unit_close)}
+
+        unit_close.unit_chars[4].agility += 1
+        hashes.add(unit_hash(unit_close))
+        unit_close.move_character(unit_close.unit_chars[4], 4, 5)
+        hashes.add(unit_hash(unit_close))
+        unit_close.targeting_mode = "Leader"
+        hashes.add(unit_hash(unit_close))
+
+        self.assertEqual(len(hashes), 4)
+
+    def test_catalog_changes_change_the_hash(self):
+        """ Builds the same class with a different crit rate and number of actions, the way an
+            edited catalog.toml would, and asserts each one changes the hash even though the
+            class_id is the same.
+        """
+        unit_close, _ = make_close_matchup(Game())
+        char = unit_close.unit_leader
+        hashes = {unit_hash(unit_close)}
+
+        front_row = load_tables()["class_names"].index(char.char_class.name) * 3
+        for table, index, value in (("crit_rate", 0, 0.5), ("row_num_actions", front_row, 3)):
+            tables = copy.deepcopy(load_tables())
+            tables[table][index] = value
+            edited = build_catalog(tables, register=False).classes[char.char_class.name]
+            self.assertEqual(edited.class_id, char.char_class.class_id)
+
+            original, char.char_class = char.char_class, edited
+            hashes.add(unit_hash(unit_close))
+            char.char_class = original
+
+        self.assertEqual(len(hashes), 3)
+
+    def test_names_do_not_matter(self):
+        """ Renames a character and asserts the hash stays the same.
+        """
+        unit_close, _ = make_close_matchup(Game())
+        before = unit_hash(unit_close)
+
+        unit_close.unit_leader.char_name = "Someone else"
+
+        self.assertEqual(unit_hash(unit_close), before)
+
+class TestMatchupCache(unittest.TestCase):
+    """ Tests MatchupCache
+    """
+
+    def test_second_simulate_is_a_hit(self):
+        """ Simulates the same matchup twice and asserts the second time comes from the cache,
+            even with different worker options.
+        """
+        cache = MatchupCache()
+        unit_close, unit_far = make_close_matchup(Game())
+
+        first = cache.simulate(unit_close, unit_far, 20, seed=3, workers=1)
+        with patch("classes.matchup_cache.simulate_matchup") as simulate:
+            second = cache.simulate(unit_close, unit_far, 20, seed=3, workers=4)
+
+        simulate.assert_not_called()
+        self.assertIs(second, first)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_engines_and_seeds_are_kept_apart(self):
+        """ Asserts a different seed or engine is a different entry.
+        """
+        cache = MatchupCache()
+        unit_close, unit_far = make_close_matchup(Game())
+
+        cache.simulate(unit_close, unit_far, 20, seed=3, workers=1)
+        cache.simulate(unit_close, unit_far, 20, seed=4, workers=1)
+        cache.simulate(unit_close, unit_far, 20, seed=3, vectorized=True)
+
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+        self.assertEqual(len(cache), 3)
+
+    def test_options_an_engine_does_not_take(self):
+        """ Asserts an option the engine doesn't take raises a TypeError, before and after the
+            matchup is in the cache.
+        """
+        cache = MatchupCache()
+        unit_close, unit_far = make_close_matchup(Game())
+
+        for _ in range(2):
+            with self.assertRaises(TypeError):
+                cache.simulate(unit_close, unit_far, 20, seed=3, vectorized=True, workers=2)
+            with self.assertRaises(TypeError):
+                cache.simulate(unit_close, unit_far, 20, seed=3, wrokers=2)
+            cache.simulate(unit_close, unit_far, 20, seed=3, vectorized=True)
+            cache.simulate(unit_close, unit_far, 20, seed=3, workers=1, chunk_size=5)
+
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_least_recently_used_is_dropped(self):
+        """ Fills a cache past its size and asserts the least recently used entry went.
+        """
+        cache = MatchupCache(max_entries=2)
+        cache.put("a", MatchupResult())
+        cache.put("b", MatchupResult())
+        cache.get("a")
+        cache.put("c", MatchupResult())
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_results_last_in_the_sqlite_file(self):
+        """ Simulates with one cache, then asserts a new cache on the same file doesn't need to
+            simulate again.
+        """
+        unit_close, unit_far = make_close_matchup(Game())
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "matchups.sqlite")
+            cache = MatchupCache(path=path)
+            first = cache.simulate(unit_close, unit_far, 20, seed=5, workers=1)
+            cache.close()
+
+            cache = MatchupCache(path=path)
+            with patch("classes.matchup_cache.simulate_matchup") as simulate:
+                second = cache.simulate(unit_close, unit_far, 20, seed=5, workers=1)
+            cache.close()
+
+        simulate.assert_not_called()
+        self.assertEqual(second.as_dict(), first.as_dict())
+
+if __name__ == "__main__":
+    unittest.main()
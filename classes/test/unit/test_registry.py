@@ -0,0 +1,108 @@
+""" test_registry.py
+
+	This test suite contains all currently written unit tests for the registry.py module.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_registry
+"""
+#pylint: disable=import-error # False positive.
+import copy
+import io
+import pickle
+import unittest
+from contextlib import redirect_stdout
+from classes.game import Game
+from classes.registry import (Flyweight, RegistryError, class_rows, get_action, get_class,
+        get_class_by_name, register_class)
+from classes.actions.slash_action import SlashAction
+from classes.unit_classes.base_class import BaseClass
+from classes.unit_classes.knight import KnightClass
+
+class TestFlyweight(unittest.TestCase):
+    """ Tests the shared class and action instances.
+    """
+
+    def test_one_instance_per_class(self):
+        """ Asserts building a class or action again, copying it or pickling it all give back the
+            same instance.
+        """
+        knight = KnightClass()
+
+        self.assertIs(KnightClass(), knight)
+        self.assertIs(copy.deepcopy(knight), knight)
+        self.assertIs(pickle.loads(pickle.dumps(knight)), knight)
+        self.assertIs(SlashAction(), knight.actions[0])
+        self.assertIsNot(BaseClass(), knight)
+
+    def test_read_only(self):
+        """ Asserts nothing on a shared instance can be changed.
+        """
+        knight = KnightClass()
+
+        with self.assertRaises(AttributeError):
+            knight.class_id = 5
+        with self.assertRaises(AttributeError):
+            knight.actions[0].crit_rate = 1.0
+        with self.assertRaises(TypeError):
+            knight.num_actions[0] = 9
+
+    def test_characters_share_definitions(self):
+        """ Creates a roster of knights and asserts they all share one class and one action.
+        """
+        game = Game()
+        with redirect_stdout(io.StringIO()):
+            chars = [game.create_character(f"Knight {index}", KnightClass(), agility=1,
+                    strength=1, health=1) for index in range(100)]
+
+        self.assertEqual(len({id(char.char_class) for char in chars}), 1)
+        self.assertEqual(len({id(char.get_action_by_row()) for char in chars}), 1)
+
+class TestLookups(unittest.TestCase):
+    """ Tests get_class(), get_class_by_name(), get_action() and class_rows()
+    """
+
+    def test_lookups(self):
+        """ Looks up the built in classes and action by id and name.
+        """
+        self.assertIs(get_class(1), KnightClass())
+        self.assertIs(get_class(0), BaseClass())
+        self.assertIs(get_class_by_name("Knight"), KnightClass())
+        self.assertIs(get_action(SlashAction.action_id), SlashAction())
+
+    def test_unknown(self):
+        """ Asserts unknown ids and names raise RegistryError.
+        """
+        with self.assertRaises(RegistryError):
+            get_class(99)
+        with self.assertRaises(RegistryError):
+            get_class_by_name("Mage")
+        with self.assertRaises(RegistryError):
+            get_action(99)
+
+    def test_class_rows(self):
+        """ Asserts the row tables match the class.
+        """
+        rows = class_rows(1)
+
+        self.assertEqual(rows.num_actions, (2, 1, 1))
+        self.assertEqual(rows.crit_rates, (.1, .1, .1))
+        self.assertEqual(rows.action_ids, (1, 1, 1))
+        self.assertEqual(rows.crit_multipliers, (2, 2, 2))
+
+    def test_ids_are_unique(self):
+        """ Asserts a second class can't take an id that's already used.
+        """
+        class Impostor(Flyweight):
+            """ Claims the knights class_id.
+            """
+            #pylint: disable=too-few-public-methods # This is fine.
+            __slots__ = ()
+            class_id = 1
+            name = "Impostor"
+
+        with self.assertRaises(ValueError):
+            register_class(Impostor)
+        self.assertIs(get_class(1), KnightClass())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+""" test_replay.py
+
+	This test suite contains all currently written unit tests for the replay.py module.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_replay
+"""
+#pylint: disable=import-error # False positive.
+import copy
+import io
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+from classes.game import Game
+from classes.battle import Battle
+from classes.battle_sinks import ConsoleSink, ListSink, TeeSink
+from classes.replay import ReplayError, ReplayWriter, play_replay, read_replays
+from classes.test.unit.test_vector_battle import make_close_matchup
+
+def record_battles(unit_close, unit_far, seeds):
+    """ Fights a battle for each seed, printing them and writing them to a replay log.
+
+        Returns:
+            The replay log and everything that was printed.
+    """
+    log = io.BytesIO()
+    writer = ReplayWriter(log)
+    output = io.StringIO()
+    with redirect_stdout(output):
+        for seed in seeds:
+            close, far = copy.deepcopy((unit_close, unit_far))
+            battle = Battle(None, close, far, headless=True, sink=TeeSink(ConsoleSink(), writer),
+                    seed=seed)
+            battle.fight_it_out()
+
+    log.seek(0)
+    return log, output.getvalue()
+
+class TestReplayRoundTrip(unittest.TestCase):
+    """ Tests writing battles with ReplayWriter and reading them back.
+    """
+
+    def test_replay_prints_the_same_as_the_battle(self):
+        """ Records several battles, plays them back and asserts the console output is identical.
+        """
+        unit_close, unit_far = make_close_matchup(Game())
+        log, live = record_battles(unit_close, unit_far, range(5))
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            for replay in read_replays(log):
+                play_replay(replay)
+
+        self.assertIn("dies!", live)
+        self.assertEqual(output.getvalue(), live)
+
+    def test_replay_keeps_the_header(self):
+        """ Records a battle and asserts the seed, units and characters are read back.
+        """
+        unit_close, unit_far = make_close_matchup(Game())
+        log, _ = record_battles(unit_close, unit_far, [42])
+
+        (replay,) = list(read_replays(log))
+
+        self.assertEqual(replay.seed, 42)
+        self.assertEqual(replay.unit_ids, (unit_close.unit_id, unit_far.unit_id))
+        self.assertEqual(sorted(name for _, name, _, _, _ in replay.chars),
+                ["A", "B", "C", "D"])
+        self.assertEqual(replay.actions, {1: "Slash"})
+
+    def test_replay_keeps_long_names_whole(self):
+        """ Records a battle with a name of more than 255 bytes of two byte characters and
+            asserts it plays back with as much of the name as fits.
+        """
+        unit_close, unit_far = make_close_matchup(Game())
+        unit_close.unit_leader.char_name = "\u00e9" * 128
+        log, _ = record_battles(unit_close, unit_far, [1])
+
+        (replay,) = list(read_replays(log))
+        with redirect_stdout(io.StringIO()):
+            play_replay(replay)
+
+        self.assertIn("\u00e9" * 127, [name for _, name, _, _, _ in replay.chars])
+
+    def test_replay_events_match_the_battle(self):
+        """ Plays a recording into a ListSink and asserts it saw the same kinds of events as the
+            battle did.
+        """
+        unit_close, unit_far = make_close_matchup(Game())
+        close, far = copy.deepcopy((unit_close, unit_far))
+        live = ListSink()
+        log = io.BytesIO()
+        Battle(None, close, far, headless=True, sink=TeeSink(live, ReplayWriter(log)),
+                seed=7).fight_it_out()
+        log.seek(0)
+
+        played = ListSink()
+        play_replay(next(read_replays(log)), sink=played)
+
+        self.assertEqual(played.kinds(), live.kinds())
+
+    def test_replay_is_smaller_than_the_text(self):
+        """ Asserts the binary log is a fraction of the size of the printed text.
+        """
+        unit_close, unit_far = make_close_matchup(Game())
+        log, live = record_battles(unit_close, unit_far, range(20))
+
+        self.assertLess(len(log.getvalue()) * 3, len(live.encode()))
+
+    def test_replay_speed_sleeps_between_rows(self):
+        """ Plays a recording at double speed and asserts it pauses half the normal row delay.
+        """
+        unit_close, unit_far = make_close_matchup(Game())
+        log, _ = record_battles(unit_close, unit_far, [3])
+
+        with patch("classes.replay.time.sleep") as sleep, redirect_stdout(io.StringIO()):
+            play_replay(next(read_replays(log)), speed=2)
+
+        sleep.assert_called_with(Battle.row_delay_seconds / 2)
+
+    def test_read_rejects_garbage(self):
+        """ Asserts reading something that isn't a replay log raises a ReplayError.
+        """
+        with self.assertRaises(ReplayError):
+            list(read_replays(io.BytesIO(b"not a replay at all")))
+
+if __name__ == "__main__":
+    unittest.main()
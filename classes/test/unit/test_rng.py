@@ -0,0 +1,101 @@
+""" test_rng.py
+
+	This test suite contains all currently written unit tests for the rng.py module, and the
+	seeded battles and simulations built on it.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_rng
+"""
+#pylint: disable=import-error # False positive.
+import unittest
+import numpy as np
+from classes.battle import Battle
+from classes.battle_sinks import ListSink
+from classes.game import Game
+from classes.rng import RngStream, derive_seed
+from classes.simulator import simulate_matchup, replay_battle
+from classes.test.unit.test_vector_battle import make_close_matchup
+
+def damage_log(sink):
+    """ Gets the (target name, damage, is_crit) of every hit in a ListSink.
+    """
+    return [(fields["target"].char_name, fields["damage"], fields["is_crit"])
+            for kind, fields in sink.events if kind == "damage"]
+
+class TestRngStream(unittest.TestCase):
+    """ Tests rng.RngStream
+    """
+
+    def test_buffer_size_does_not_change_the_numbers(self):
+        """ Streams with different buffer sizes give the same numbers, across the hashed first
+            block and several refills from the generator after it.
+        """
+        small = RngStream(42, buffer_size=8)
+        large = RngStream(42)
+
+        numbers = [small.uniform() for _ in range(100)]
+        self.assertEqual(numbers, [large.uniform() for _ in range(100)])
+        self.assertTrue(all(0.0 <= number < 1.0 for number in numbers))
+
+        first = RngStream.first_buffer_size
+        expected = np.random.default_rng(derive_seed(42, "more")).random(100 - first)
+        self.assertEqual(numbers[first:], expected.tolist())
+
+    def test_seed_is_always_known(self):
+        """ A stream made without a seed still has one, and it makes the same numbers again.
+        """
+        stream = RngStream()
+        again = RngStream(stream.seed)
+
+        self.assertEqual([stream.uniform() for _ in range(5)], [again.uniform() for _ in range(5)])
+
+    def test_children_are_reproducible_and_independent(self):
+        """ Children with the same index match, children with different indexes don't.
+        """
+        root = RngStream(7)
+
+        self.assertEqual(root.child(3).seed, derive_seed(7, 3))
+        self.assertEqual(root.child(3).uniform(), RngStream(7).child(3).uniform())
+        self.assertNotEqual(root.child(3).uniform(), root.child(4).uniform())
+        self.assertEqual([child.seed for child in root.spawn(2, start=3)],
+                [root.child(3).seed, root.child(4).seed])
+
+class TestSeededBattles(unittest.TestCase):
+    """ Tests that seeded battles and simulations can be reproduced.
+    """
+
+    def test_same_seed_same_battle(self):
+        """ Two battles with the same seed hit the same way.
+        """
+        logs = []
+        for _ in range(2):
+            unit_close, unit_far = make_close_matchup(Game())
+            sink = ListSink()
+            Battle(None, unit_close, unit_far, headless=True, sink=sink, seed=99).fight_it_out()
+            logs.append(damage_log(sink))
+
+        self.assertEqual(logs[0], logs[1])
+
+    def test_simulation_does_not_depend_on_chunking(self):
+        """ The same seed gives the same result whether run in one go or in chunks of workers.
+        """
+        unit_close, unit_far = make_close_matchup(Game())
+
+        single = simulate_matchup(unit_close, unit_far, 40, workers=1, seed=5)
+        pooled = simulate_matchup(unit_close, unit_far, 40, workers=2, chunk_size=9, seed=5)
+
+        self.assertEqual(single.as_dict(), pooled.as_dict())
+
+    def test_replay_battle(self):
+        """ Replaying a battle of a run twice gives the same battle.
+        """
+        unit_close, unit_far = make_close_matchup(Game())
+
+        first, second = ListSink(), ListSink()
+        replay_battle(unit_close, unit_far, 5, 17, sink=first)
+        replay_battle(unit_close, unit_far, 5, 17, sink=second)
+
+        self.assertEqual(damage_log(first), damage_log(second))
+
+if __name__ == "__main__":
+    unittest.main()
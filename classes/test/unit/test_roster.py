@@ -0,0 +1,123 @@
+""" test_roster.py
+
+	This test suite contains all currently written unit tests for the roster.py class, and the
+	Character view over it.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_roster
+"""
+#pylint: disable=import-error # False positive.
+import copy
+import pickle
+import unittest
+from unittest.mock import Mock
+from classes.character import Character
+from classes.roster import Roster
+
+class TestRosterSetRow(unittest.TestCase):
+    """ Tests Roster.set_row()
+    """
+
+    def test_set_row_grows_roster(self):
+        """ Sets a row past the end of the roster and asserts the rows before it are unused.
+        """
+        roster = Roster()
+        roster.set_row(3, health=20, agility=4, strength=6, name="Pol")
+
+        self.assertEqual(len(roster), 4)
+        self.assertEqual(roster.names, [None, None, None, "Pol"])
+        self.assertEqual(roster.health[3], 20)
+        self.assertEqual(roster.max_health[3], 20)
+        self.assertEqual(roster.unit_id[3], -1)
+        self.assertEqual(roster.is_alive[3], 1)
+        self.assertEqual(roster.is_alive[0], 0)
+        self.assertEqual(roster.count_alive(), 1)
+
+class TestRosterRestore(unittest.TestCase):
+    """ Tests Roster.restore()
+    """
+
+    def test_restore_whole_roster(self):
+        """ Damages and kills characters, restores the roster and asserts they are back to full.
+        """
+        roster = Roster()
+        first = Character("first", Mock(), 1, health=10, roster=roster)
+        second = Character("second", Mock(), 2, health=30, roster=roster)
+
+        first.health = -4
+        first.is_alive = False
+        second.health = 12
+        second.status = "Sleep"
+
+        roster.restore()
+
+        self.assertEqual((first.health, second.health), (10, 30))
+        self.assertTrue(first.is_alive)
+        self.assertIsNone(second.status)
+        self.assertEqual(roster.count_alive(), 2)
+
+    def test_restore_some_rows(self):
+        """ Restores one row and asserts the other row is left alone.
+        """
+        roster = Roster()
+        first = Character("first", Mock(), 1, health=10, roster=roster)
+        second = Character("second", Mock(), 2, health=30, roster=roster)
+        first.health = 1
+        second.health = 2
+
+        roster.restore([2])
+
+        self.assertEqual((first.health, second.health), (1, 30))
+
+class TestCharacterView(unittest.TestCase):
+    """ Tests Character as a view over a roster row.
+    """
+
+    def test_character_stats_live_in_roster(self):
+        """ Changes a characters stats and asserts the roster row changes with them.
+        """
+        roster = Roster()
+        char = Character("Pol", Mock(), 5, health=100, agility=2, strength=10, roster=roster)
+
+        char.health -= 15
+        char.is_alive = False
+        char.has_performed_action_this_round = True
+        char.status = "Stone"
+
+        self.assertEqual(roster.health[5], 85)
+        self.assertEqual(roster.is_alive[5], 0)
+        self.assertEqual(roster.has_acted[5], 1)
+        self.assertEqual(roster.statuses[roster.status[5]], "Stone")
+        self.assertFalse(hasattr(char, "__dict__"))
+
+    def test_character_without_roster(self):
+        """ Makes a character on its own and asserts it gets a roster of its own.
+        """
+        char = Character("Dio", Mock(), 40, health=50, agility=4, strength=5)
+
+        self.assertEqual(len(char.roster), 1)
+        self.assertEqual(char.health, 50)
+        self.assertTrue(char.is_alive)
+        self.assertIsNone(char.status)
+
+    def test_copies_take_only_their_row(self):
+        """ Deep copies and pickles a character and asserts the copy has its own one row roster
+            with the same stats.
+        """
+        roster = Roster()
+        Character("other", None, 1, health=1, roster=roster)
+        char = Character("Pol", None, 2, health=100, agility=2, strength=10, roster=roster)
+        char.health = 40
+        char.current_position = 4
+
+        for char_copy in (copy.deepcopy(char), pickle.loads(pickle.dumps(char))):
+            self.assertEqual(len(char_copy.roster), 1)
+            self.assertEqual((char_copy.char_id, char_copy.health, char_copy.max_health),
+                    (2, 40, 100))
+            self.assertEqual(char_copy.current_position, 4)
+
+            char_copy.health = 1
+            self.assertEqual(char.health, 40)
+
+if __name__ == "__main__":
+    unittest.main()
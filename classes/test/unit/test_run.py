@@ -0,0 +1,120 @@
+""" test_run.py
+
+	This test suite contains all currently written unit tests for the subcommands in run.py.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_run
+"""
+#pylint: disable=import-error # False positive.
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+import run
+from classes.scenario import load_scenario
+from classes.test.unit.test_replay import record_battles
+from classes.test.unit.test_server import SCENARIO
+
+def run_command(*argv):
+    """ Runs run.py with some arguments.
+
+        Returns:
+            The exit code and every line of json written to stdout.
+    """
+    output = io.StringIO()
+    with redirect_stdout(output), redirect_stderr(io.StringIO()):
+        try:
+            code = run.main(list(argv))
+        except SystemExit as error:
+            code = error.code
+
+    return code, [json.loads(line) for line in output.getvalue().splitlines()]
+
+class TestCommands(unittest.TestCase):
+    """ Tests the simulate, tournament and replay subcommands.
+    """
+
+    def setUp(self):
+        #pylint: disable=consider-using-with # removed in tearDown.
+        self.folder = tempfile.TemporaryDirectory()
+        self.scenario = os.path.join(self.folder.name, "scenario.json")
+        with open(self.scenario, "w", encoding="utf-8") as scenario_file:
+            json.dump(SCENARIO, scenario_file)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_simulate_streams_a_line_per_battle(self):
+        """ Simulates a scenario and asserts there's a result line per battle and a summary that
+            adds them up.
+        """
+        code, lines = run_command("simulate", self.scenario, "--battles", "20", "--seed", "3",
+                "--summary")
+
+        self.assertEqual(code, 0)
+        self.assertEqual([line["battle"] for line in lines[:-1]], list(range(20)))
+        summary = lines[-1]
+        self.assertEqual(summary["event"], "summary")
+        self.assertEqual(summary["wins"], sum(line["outcome"] == "win" for line in lines[:-1]))
+        self.assertEqual(summary["total_rounds"], sum(line["rounds"] for line in lines[:-1]))
+
+    def test_replay_matches_simulate(self):
+        """ Replays a battle of a simulate run, by its own seed and by its index, and asserts it
+            ends the same way.
+        """
+        _, lines = run_command("simulate", self.scenario, "--battles", "5", "--seed", "9")
+
+        _, by_seed = run_command("replay", self.scenario, "--seed", str(lines[3]["seed"]))
+        _, by_index = run_command("replay", self.scenario, "--seed", "9", "--battle", "3")
+
+        expected = dict(lines[3])
+        del expected["battle"]
+        self.assertEqual(by_seed[-1], expected)
+        self.assertEqual(by_index, by_seed)
+        self.assertEqual(by_seed[0]["event"], "battle_start")
+
+    def test_replay_file(self):
+        """ Plays back a replay file and asserts every battle in it is written out.
+        """
+        _, unit_close, unit_far = load_scenario(SCENARIO)
+        log, _ = record_battles(unit_close, unit_far, [1, 2])
+        path = os.path.join(self.folder.name, "battles.replay")
+        with open(path, "wb") as replay_file:
+            replay_file.write(log.getvalue())
+
+        code, lines = run_command("replay", "--file", path)
+
+        self.assertEqual(code, 0)
+        self.assertEqual([line["battle"] for line in lines if line["event"] == "battle_start"],
+                [0, 1])
+        self.assertEqual([line["seed"] for line in lines if line["event"] == "battle_start"],
+                [1, 2])
+
+    def test_tournament(self):
+        """ Runs a tournament of a scenario and asserts every battle and unit gets a line.
+        """
+        code, lines = run_command("tournament", self.scenario, "--battles-per-match", "3",
+                "--seed", "4")
+
+        results = [line for line in lines if line["event"] == "result"]
+        standings = [line for line in lines if line["event"] == "standing"]
+        self.assertEqual(code, 0)
+        self.assertEqual(len(results), 6)
+        self.assertEqual({(line["close"], line["far"]) for line in results}, {(1, 2), (2, 1)})
+        self.assertEqual([line["place"] for line in standings], [1, 2])
+        self.assertEqual([line["battles"] for line in standings], [6, 6])
+
+    def test_bad_input(self):
+        """ Asserts a missing file or a broken scenario exits with an error and no output.
+        """
+        with open(self.scenario, "w", encoding="utf-8") as scenario_file:
+            json.dump({"close": SCENARIO["close"]}, scenario_file)
+
+        self.assertEqual(run_command("simulate", self.scenario), (1, []))
+        self.assertEqual(run_command("simulate", "missing.json"), (1, []))
+        self.assertEqual(run_command("replay", self.scenario), (1, []))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,244 @@
+""" test_server.py
+
+	This test suite contains all currently written unit tests for the server.py and scenario.py
+	modules.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_server
+"""
+#pylint: disable=import-error # False positive.
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from classes.battle import Battle
+from classes.battle_sinks import ListSink
+from classes.scenario import ScenarioError, load_scenario
+from classes.server import BattleServer, encode_event
+
+SCENARIO = {
+    "close": {
+        "chars": [
+            {"name": "A", "agility": 5, "strength": 12, "health": 40, "position": 0},
+            {"name": "B", "agility": 3, "strength": 9, "health": 35, "position": 4},
+        ],
+    },
+    "far": {
+        "targeting_mode": "Weak",
+        "chars": [
+            {"name": "C", "agility": 8, "strength": 10, "health": 45, "position": 1},
+            {"name": "D", "agility": 1, "strength": 14, "health": 30, "position": 3},
+        ],
+    },
+}
+
+async def send_requests(reader, writer, requests, extra=0):
+    """ Sends requests down a connection and reads lines until every request has finished.
+        extra is how many more requests were already sent some other way.
+
+        Returns:
+            A dict of request id -> the messages sent back for it.
+    """
+    for request in requests:
+        writer.write(json.dumps(request).encode() + b"\n")
+    await writer.drain()
+
+    messages = {}
+    pending = len(requests) + extra
+    while pending:
+        message = json.loads(await reader.readline())
+        messages.setdefault(message["id"], []).append(message)
+        if message.get("event") == "result" or "error" in message:
+            pending -= 1
+
+    return messages
+
+class TestScenario(unittest.TestCase):
+    """ Tests load_scenario()
+    """
+
+    def test_load_scenario_places_every_character(self):
+        """ Loads a scenario and asserts each character is where it asked to be, and nothing was
+            printed.
+        """
+        with patch("builtins.print") as printed:
+            game, unit_close, unit_far = load_scenario(SCENARIO)
+
+        printed.assert_not_called()
+        self.assertEqual(len(game.chars), 4)
+        self.assertEqual(unit_close.unit_leader.char_name, "A")
+        self.assertEqual(unit_close.unit_chars[4].char_name, "B")
+        self.assertEqual(unit_far.unit_chars[1].char_name, "C")
+        self.assertEqual(unit_far.unit_chars[0], None)
+        self.assertEqual(unit_far.targeting_mode, "Weak")
+
+    def test_load_scenario_rejects_bad_units(self):
+        """ Asserts scenarios with missing stats, clashing positions or no chars are rejected.
+        """
+        no_stats = {"close": {"chars": [{"name": "A"}]}, "far": SCENARIO["far"]}
+        clash = {"close": {"chars": [
+                    {"name": "A", "agility": 1, "strength": 1, "health": 1, "position": 2},
+                    {"name": "B", "agility": 1, "strength": 1, "health": 1, "position": 2}]},
+                "far": SCENARIO["far"]}
+        empty = {"close": {"chars": []}, "far": SCENARIO["far"]}
+
+        too_strong = {"close": {"chars": [
+                    {"name": "A", "agility": 1, "strength": 1, "health": 2 ** 40}]},
+                "far": SCENARIO["far"]}
+
+        for scenario in (no_stats, clash, empty, too_strong, {"close": SCENARIO["close"]}, []):
+            with self.assertRaises(ScenarioError):
+                load_scenario(scenario)
+
+class TestBattleServer(unittest.IsolatedAsyncioTestCase):
+    """ Tests BattleServer
+    """
+
+    async def asyncSetUp(self):
+        self.battle_server = BattleServer(max_battles=8, drain_every=4)
+        self.server = await self.battle_server.start(port=0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def test_streams_the_same_events_as_a_battle(self):
+        """ Asks for a battle and asserts the lines sent back are the events the same battle
+            fought directly emits.
+        """
+        messages = await send_requests(self.reader, self.writer,
+                [{"id": "one", "scenario": SCENARIO, "seed": 12}])
+
+        _, unit_close, unit_far = load_scenario(SCENARIO)
+        sink = ListSink()
+        Battle(None, unit_close, unit_far, headless=True, sink=sink, seed=12).fight_it_out()
+        expected = [json.loads(encode_event("one", kind, fields)) for kind, fields in sink.events]
+
+        self.assertEqual(messages["one"][:-1], expected)
+        self.assertEqual(messages["one"][-1]["seed"], 12)
+
+    async def test_serves_many_battles_at_once(self):
+        """ Sends a hundred requests down one connection and asserts each gets its own result.
+        """
+        requests = [{"id": index, "scenario": SCENARIO, "seed": index, "events": index % 2 == 0}
+                for index in range(100)]
+
+        messages = await send_requests(self.reader, self.writer, requests)
+
+        self.assertEqual(sorted(messages), list(range(100)))
+        for index, lines in messages.items():
+            self.assertEqual(lines[-1]["event"], "result")
+            self.assertEqual(len(lines) > 1, index % 2 == 0)
+        self.assertEqual(self.battle_server.battles_served, 100)
+
+    async def test_bad_request_gets_an_error(self):
+        """ Sends a broken request and a good one and asserts only the broken one fails.
+        """
+        self.writer.write(b"this is not json\n")
+        messages = await send_requests(self.reader, self.writer,
+                [{"id": 2, "scenario": {"close": {}}},
+                {"id": 3, "scenario": SCENARIO, "events": False}], extra=1)
+
+        self.assertIn("error", messages[None][0])
+        self.assertIn("error", messages[2][0])
+        self.assertEqual(messages[3][0]["event"], "result")
+
+    async def test_stats_out_of_range_get_an_error(self):
+        """ Asks for a battle with more health than a character can hold and asserts it gets an
+            error line rather than no reply.
+        """
+        huge = {"close": {"chars": [{"name": "A", "agility": 1, "strength": 1,
+                "health": 2 ** 40}]}, "far": SCENARIO["far"]}
+
+        messages = await send_requests(self.reader, self.writer, [{"id": 1, "scenario": huge}])
+
+        self.assertIn("health", messages[1][0]["error"])
+
+    async def test_events_must_be_a_bool(self):
+        """ Asks for battles with events that aren't true or false and asserts each gets an error
+            line.
+        """
+        requests = [{"id": index, "scenario": SCENARIO, "events": events}
+                for index, events in enumerate(("no", 0, "", None))]
+
+        messages = await send_requests(self.reader, self.writer, requests)
+
+        for index in range(len(requests)):
+            self.assertEqual(messages[index], [{"id": index,
+                    "error": "events must be true or false"}])
+
+    async def test_failed_battle_gets_an_error(self):
+        """ Breaks the battle part way through and asserts the request still ends with an error
+            line and the connection keeps serving.
+        """
+        with patch.object(Battle, "take_action", side_effect=RuntimeError("boom")):
+            messages = await send_requests(self.reader, self.writer,
+                    [{"id": 1, "scenario": SCENARIO}])
+        self.assertIn("boom", messages[1][-1]["error"])
+
+        messages = await send_requests(self.reader, self.writer,
+                [{"id": 2, "scenario": SCENARIO, "events": False}])
+        self.assertEqual(messages[2][0]["event"], "result")
+
+    async def test_battles_take_turns(self):
+        """ Sends two battles at once and asserts their events are interleaved on the wire.
+        """
+        for request_id in (1, 2):
+            self.writer.write(json.dumps({"id": request_id, "scenario": SCENARIO,
+                    "seed": 3}).encode() + b"\n")
+        await self.writer.drain()
+
+        order = []
+        while order.count("result") < 2:
+            message = json.loads(await self.reader.readline())
+            order.append(message["id"] if message["event"] != "result" else "result")
+
+        first_done = order.index("result")
+        self.assertIn(2, order[:first_done])
+
+    async def test_quiet_battles_take_turns(self):
+        """ Sends a battle without events and one with them, and asserts the second starts
+            streaming before the first is over.
+        """
+        for request_id, events in ((1, False), (2, True)):
+            self.writer.write(json.dumps({"id": request_id, "scenario": SCENARIO, "seed": 3,
+                    "events": events}).encode() + b"\n")
+        await self.writer.drain()
+
+        order = []
+        while order.count("result") < 2:
+            message = json.loads(await self.reader.readline())
+            order.append(message["id"] if message["event"] != "result" else "result")
+
+        self.assertIn(2, order[:order.index("result")])
+
+class TestBattleServerUnix(unittest.IsolatedAsyncioTestCase):
+    """ Tests BattleServer on a unix socket.
+    """
+
+    @unittest.skipUnless(hasattr(asyncio, "start_unix_server"), "no unix sockets here")
+    async def test_unix_socket(self):
+        """ Serves a battle over a unix socket.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "battles.sock")
+            server = await BattleServer().start(path=path)
+            reader, writer = await asyncio.open_unix_connection(path)
+
+            messages = await send_requests(reader, writer,
+                    [{"id": 1, "scenario": SCENARIO, "events": False}])
+
+            writer.close()
+            server.close()
+            await server.wait_closed()
+
+        self.assertEqual(messages[1][0]["event"], "result")
+
+if __name__ == "__main__":
+    unittest.main()
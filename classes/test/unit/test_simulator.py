@@ -0,0 +1,91 @@
+""" test_simulator.py
+
+	This test suite contains all currently written unit tests for the simulator.py module.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_simulator
+"""
+#pylint: disable=import-error # False positive.
+import json
+import unittest
+from classes.game import Game
+from classes.simulator import MatchupResult, battle_outcome, simulate_matchup, WIN, LOSS, DRAW
+from classes.test.unit.test_battle import make_units
+
+class TestSimulatorBattleOutcome(unittest.TestCase):
+    """ Tests simulator.battle_outcome()
+    """
+
+    def test_battle_outcome(self):
+        """ Asserts the outcome is decided by which unit still has characters alive.
+        """
+        self.assertEqual(battle_outcome(2, 0), WIN)
+        self.assertEqual(battle_outcome(0, 1), LOSS)
+        self.assertEqual(battle_outcome(1, 1), DRAW)
+
+class TestSimulatorMatchupResult(unittest.TestCase):
+    """ Tests simulator.MatchupResult
+    """
+
+    def test_merge_adds_counts_and_histograms(self):
+        """ Merges two results and asserts the counts, rates and means add up.
+        """
+        first = MatchupResult()
+        first.add_battle(WIN, 2, 2, 0)
+        first.add_battle(DRAW, 2, 1, 1)
+
+        second = MatchupResult()
+        second.add_battle(LOSS, 1, 0, 2)
+
+        first.merge(second)
+
+        self.assertEqual(first.battles, 3)
+        self.assertEqual((first.wins, first.losses, first.draws), (1, 1, 1))
+        self.assertAlmostEqual(first.mean_rounds, 5 / 3)
+        self.assertEqual(first.survivors_far, {0: 1, 1: 1, 2: 1})
+        self.assertAlmostEqual(first.mean_survivors_close, 1.0)
+
+    def test_from_dict_reads_back_as_dict(self):
+        """ Turns a result into json and back and asserts nothing was lost.
+        """
+        result = MatchupResult()
+        result.add_battle(WIN, 3, 2, 0)
+        result.add_battle(DRAW, 4, 1, 1)
+
+        copied = MatchupResult.from_dict(json.loads(json.dumps(result.as_dict())))
+
+        self.assertEqual(copied.as_dict(), result.as_dict())
+        self.assertEqual(copied.survivors_close, {2: 1, 1: 1})
+
+class TestSimulatorSimulateMatchup(unittest.TestCase):
+    """ Tests simulator.simulate_matchup()
+    """
+
+    def test_simulate_matchup_in_process(self):
+        """ Runs a matchup in this process and asserts every battle was counted and the units
+            passed in were not changed.
+        """
+        unit_close, unit_far = make_units(Game())
+        health_before = [char.health for char in unit_close.unit_chars.values() if char]
+
+        result = simulate_matchup(unit_close, unit_far, 25, workers=1)
+
+        self.assertEqual(result.battles, 25)
+        self.assertEqual(result.wins + result.losses + result.draws, 25)
+        self.assertAlmostEqual(result.win_rate + result.loss_rate + result.draw_rate, 1.0)
+        self.assertEqual(sum(result.survivors_close.values()), 25)
+        self.assertEqual(health_before,
+                [char.health for char in unit_close.unit_chars.values() if char])
+
+    def test_simulate_matchup_process_pool(self):
+        """ Runs a matchup over two worker processes and asserts every battle was counted.
+        """
+        unit_close, unit_far = make_units(Game())
+
+        result = simulate_matchup(unit_close, unit_far, 30, workers=2, chunk_size=7)
+
+        self.assertEqual(result.battles, 30)
+        self.assertGreater(result.mean_rounds, 0)
+
+if __name__ == "__main__":
+    unittest.main()
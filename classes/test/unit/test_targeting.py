@@ -0,0 +1,113 @@
+""" test_targeting.py
+
+	This test suite contains all currently written unit tests for the targeting.py module.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_targeting
+"""
+#pylint: disable=import-error # False positive.
+import unittest
+from unittest.mock import Mock
+from classes.targeting import TARGET_TABLE, FIRST_POSITION, select_target
+from classes.unit import Unit
+
+def make_char(health, is_alive=True):
+    """ Makes a mock character with just enough on it to be targeted.
+    """
+    char = Mock()
+    char.health = health
+    char.is_alive = is_alive
+    char.has_performed_action_this_round = False
+    char.status = None
+    return char
+
+class TestTargetingTable(unittest.TestCase):
+    """ Tests the precomputed TARGET_TABLE and FIRST_POSITION.
+    """
+
+    def test_left_attacker_targets_middle_and_right(self):
+        """ A character on the left side targets the middle column, then the right column.
+        """
+        full = 0b111111111
+        self.assertEqual(TARGET_TABLE[0][full], (1, 2))
+        self.assertEqual(TARGET_TABLE[6][full], (1, 2))
+
+    def test_left_attacker_falls_back_to_left(self):
+        """ A character on the left side only targets the left column if nobody else is left.
+        """
+        only_left_back = 1 << 6
+        self.assertEqual(TARGET_TABLE[3][only_left_back], (6,))
+
+    def test_right_attacker_targets_middle_and_left(self):
+        """ A character on the right side targets the middle column, then the left column, using
+            the frontmost living character of each column.
+        """
+        mask = (1 << 4) | (1 << 3) | (1 << 8)
+        self.assertEqual(TARGET_TABLE[2][mask], (4, 3))
+
+    def test_middle_attacker_falls_back_to_both_sides(self):
+        """ A character in the middle with an empty middle column can target either side.
+        """
+        mask = (1 << 0) | (1 << 5)
+        self.assertEqual(TARGET_TABLE[4][mask], (0, 5))
+        self.assertEqual(TARGET_TABLE[4][mask | (1 << 7)], (7,))
+
+    def test_empty_mask(self):
+        """ Nobody can be targeted in a unit with nobody alive.
+        """
+        for position in range(9):
+            self.assertEqual(TARGET_TABLE[position][0], ())
+        self.assertEqual(FIRST_POSITION[0], -1)
+        self.assertEqual(FIRST_POSITION[0b101000000], 6)
+
+class TestTargetingSelectTarget(unittest.TestCase):
+    """ Tests targeting.select_target()
+    """
+
+    def setUp(self):
+        self.leader = make_char(50)
+        self.middle = make_char(80)
+        self.right = make_char(20)
+        self.unit = Unit(self.leader, 7)
+        self.unit.unit_chars[1] = self.middle
+        self.unit.unit_chars[2] = self.right
+
+    def test_strong(self):
+        """ Strong picks the healthiest of the targets.
+        """
+        self.assertIs(select_target(0, self.unit, "Strong"), self.middle)
+
+    def test_weak(self):
+        """ Weak picks the least healthy of the targets.
+        """
+        self.assertIs(select_target(0, self.unit, "Weak"), self.right)
+
+    def test_strong_tie_keeps_first(self):
+        """ Ties go to whoever was found first, the middle column.
+        """
+        self.right.health = 80
+        self.unit.update_char_state(self.right)
+        self.assertIs(select_target(0, self.unit, "Strong"), self.middle)
+
+    def test_leader_out_of_reach_falls_back_to_auto(self):
+        """ A leader that can't be targeted means Auto, the first living character.
+        """
+        self.leader.is_alive = False
+        self.unit.update_char_state(self.leader)
+        self.assertIs(select_target(0, self.unit, "Leader"), self.middle)
+
+    def test_leader_in_reach(self):
+        """ A leader that can be targeted is picked.
+        """
+        self.assertIs(select_target(2, self.unit, "Leader"), self.leader)
+
+    def test_nobody_alive(self):
+        """ With nobody alive there is no target.
+        """
+        for char in (self.leader, self.middle, self.right):
+            char.is_alive = False
+        self.unit.refresh_state()
+        self.assertIsNone(select_target(0, self.unit, "Strong"))
+
+if __name__ == "__main__":
+    unittest.main()
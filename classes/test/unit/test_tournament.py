@@ -0,0 +1,120 @@
+""" test_tournament.py
+
+	This test suite contains all currently written unit tests for the tournament.py module.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_tournament
+"""
+#pylint: disable=import-error # False positive.
+import io
+import unittest
+from contextlib import redirect_stdout
+from classes.game import Game
+from classes.rng import derive_seed
+from classes.simulator import run_battles
+from classes.tournament import run_tournament, schedule_matchups
+from classes.unit_classes.knight import KnightClass
+from classes.test.unit.test_vector_battle import make_close_matchup
+
+def make_league(game):
+    """ Builds four units of different strengths in a game.
+
+        Returns:
+            The game.
+    """
+    make_close_matchup(game)
+    with redirect_stdout(io.StringIO()):
+        brute = game.create_character("Brute", KnightClass(), agility=2, strength=30, health=60)
+        minion = game.create_character("Minion", KnightClass(), agility=6, strength=4, health=20)
+        unit = game.create_unit(brute)
+        unit.add_char_to_unit(minion, 1)
+        game.create_unit(game.create_character("Lone", KnightClass(), agility=4, strength=8,
+                health=50))
+
+    return game
+
+class TestScheduleMatchups(unittest.TestCase):
+    """ Tests schedule_matchups()
+    """
+
+    def test_every_pair_both_ways(self):
+        """ Asserts every ordered pair of different units is scheduled exactly once.
+        """
+        matches = schedule_matchups([3, 1, 2])
+
+        self.assertEqual([(close, far) for _, close, far in matches],
+                [(1, 2), (1, 3), (2, 1), (2, 3), (3, 1), (3, 2)])
+        self.assertEqual([index for index, _, _ in matches], list(range(6)))
+
+class TestRunTournament(unittest.TestCase):
+    """ Tests run_tournament()
+    """
+
+    def test_standings_add_up(self):
+        """ Runs a tournament and asserts every unit fought every battle it was due, and the wins
+            and losses balance.
+        """
+        game = make_league(Game())
+
+        standings = run_tournament(game, battles_per_match=5, workers=1, seed=4)
+        table = standings.table()
+
+        self.assertEqual(len(standings.results), 12)
+        self.assertEqual(len(table), 4)
+        for row in table:
+            self.assertEqual(row["battles"], 30)
+            self.assertEqual(row["wins"] + row["losses"] + row["draws"], 30)
+        self.assertEqual(sum(row["wins"] for row in table), sum(row["losses"] for row in table))
+        points = [row["points"] for row in table]
+        self.assertEqual(points, sorted(points, reverse=True))
+
+    def test_unit_ids_can_be_a_generator(self):
+        """ Runs a tournament on a generator of unit_ids and asserts it's the same as running it
+            on a list.
+        """
+        game = make_league(Game())
+
+        listed = run_tournament(game, battles_per_match=2, workers=1, seed=3, unit_ids=[1, 2, 3])
+        generated = run_tournament(game, battles_per_match=2, workers=1, seed=3,
+                unit_ids=(unit_id for unit_id in (3, 1, 2)))
+
+        self.assertEqual(generated.table(), listed.table())
+        self.assertEqual(len(generated.table()), 3)
+
+    def test_units_are_restored_between_matches(self):
+        """ Asserts every matchup has the same result as fighting it on its own with fresh units,
+            so nothing carries over from one match to the next.
+        """
+        game = make_league(Game())
+
+        standings = run_tournament(game, battles_per_match=3, workers=1, seed=8)
+
+        for index, close_id, far_id in schedule_matchups(game.units):
+            alone = run_battles(game.units[close_id], game.units[far_id], 3,
+                    seed=derive_seed(8, index))
+            self.assertEqual(standings.results[(close_id, far_id)].as_dict(), alone.as_dict())
+
+    def test_game_is_not_changed(self):
+        """ Runs a tournament and asserts the game it was given is exactly as it was.
+        """
+        game = make_league(Game())
+        before = game.snapshot()
+
+        run_tournament(game, battles_per_match=2, workers=1, seed=1)
+
+        self.assertEqual(game.snapshot(), before)
+
+    def test_workers_do_not_change_the_result(self):
+        """ Runs the same tournament inline and across worker processes and asserts the
+            standings are identical.
+        """
+        game = make_league(Game())
+
+        inline = run_tournament(game, battles_per_match=4, workers=1, seed=6)
+        pooled = run_tournament(game, battles_per_match=4, workers=2, chunk_size=1, seed=6)
+
+        self.assertEqual(pooled.table(), inline.table())
+        self.assertIn("Brute", str(pooled))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,269 @@
+""" test_unit_slots.py
+
+	This test suite contains the unit tests for how a Unit keeps track of its characters: the
+	positions and masks kept by UnitSlots, and the turn order and agility cached for each row.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_unit_slots
+"""
+#pylint: disable=import-error # False positive.
+import unittest
+from unittest.mock import Mock
+from classes.unit import Unit
+
+def make_char(agility=0, num_actions=1):
+    """ Makes a mock character that's alive and ready to act.
+
+        Returns:
+            The Mock.
+    """
+    char = Mock()
+    char.is_alive = True
+    char.status = None
+    char.has_performed_action_this_round = False
+    char.get_num_actions.return_value = num_actions
+    char.agility = agility
+    return char
+
+class TestUnitGetCharacterPosition(unittest.TestCase):
+    """ Tests Unit.get_character_position()
+    """
+
+    def test_get_character_position_after_add(self):
+        """ Adds characters to a unit and asserts their positions are found, and their
+            current_position is set.
+        """
+        test_unit_id = 7
+        leader = Mock()
+        char = Mock()
+        char.unit_id = -1
+
+        unit = Unit(leader, test_unit_id)
+        unit.add_char_to_unit(char, 5)
+
+        self.assertEqual(unit.get_character_position(leader), 0)
+        self.assertEqual(unit.get_character_position(char), 5)
+        self.assertEqual(char.current_position, 5)
+
+    def test_get_character_position_set_directly(self):
+        """ Puts a character straight into unit_chars and asserts its position is still found.
+        """
+        test_unit_id = 7
+        leader = Mock()
+        char = Mock()
+
+        unit = Unit(leader, test_unit_id)
+        unit.unit_chars[8] = char
+
+        self.assertEqual(unit.get_character_position(char), 8)
+
+class TestUnitMoveCharacter(unittest.TestCase):
+    """ Tests Unit.move_character()
+    """
+
+    def test_move_character_to_empty_position(self):
+        """ Moves a character to an empty position and asserts the unit, the position index and
+            the characters positions are updated.
+        """
+        test_unit_id = 7
+        leader = Mock()
+        leader.base_position = 0
+
+        unit = Unit(leader, test_unit_id)
+        unit.move_character(leader, 0, 4, temp=False)
+
+        self.assertIsNone(unit.unit_chars[0])
+        self.assertEqual(unit.unit_chars[4], leader)
+        self.assertEqual(unit.get_character_position(leader), 4)
+        self.assertEqual(leader.current_position, 4)
+        self.assertEqual(leader.base_position, 4)
+
+    def test_move_character_temp_keeps_base_position(self):
+        """ Moves a character temporarily and asserts only their current position changes.
+        """
+        test_unit_id = 7
+        leader = Mock()
+        leader.base_position = 0
+
+        unit = Unit(leader, test_unit_id)
+        unit.move_character(leader, 0, 3, temp=True)
+
+        self.assertEqual(unit.get_character_position(leader), 3)
+        self.assertEqual(leader.current_position, 3)
+        self.assertEqual(leader.base_position, 0)
+
+    def test_move_character_to_occupied_position(self):
+        """ Attempts to move a character on top of another and asserts nothing moves.
+        """
+        test_unit_id = 7
+        leader = Mock()
+        char = Mock()
+
+        unit = Unit(leader, test_unit_id)
+        unit.unit_chars[3] = char
+        unit.move_character(leader, 0, 3, temp=True)
+
+        self.assertEqual(unit.get_character_position(leader), 0)
+        self.assertEqual(unit.get_character_position(char), 3)
+
+class TestUnitResetCharacterPositions(unittest.TestCase):
+    """ Tests Unit.reset_character_positions()
+    """
+
+    def test_reset_character_positions(self):
+        """ Pushes characters back temporarily, resets the unit and asserts everyone is back
+            in their base position.
+        """
+        test_unit_id = 7
+        leader = Mock()
+        char = Mock()
+        char.unit_id = -1
+
+        unit = Unit(leader, test_unit_id)
+        leader.base_position = 0
+        unit.add_char_to_unit(char, 2)
+        unit.move_character(leader, 0, 3, temp=True)
+        unit.move_character(char, 2, 5, temp=True)
+
+        unit.reset_character_positions()
+
+        self.assertEqual(unit.unit_chars[0], leader)
+        self.assertEqual(unit.unit_chars[2], char)
+        self.assertIsNone(unit.unit_chars[3])
+        self.assertIsNone(unit.unit_chars[5])
+        self.assertEqual((leader.current_position, char.current_position), (0, 2))
+
+class TestUnitUpdateCharState(unittest.TestCase):
+    """ Tests Unit.update_char_state() and the masks it keeps up to date.
+    """
+
+    def test_update_char_state_death(self):
+        """ Kills a character already in a unit and asserts the unit only notices once it's told.
+        """
+        test_unit_id = 7
+        leader = Mock()
+        leader.is_alive = True
+        leader.has_performed_action_this_round = False
+
+        unit = Unit(leader, test_unit_id)
+        self.assertTrue(unit.is_any_char_alive())
+
+        leader.is_alive = False
+        self.assertTrue(unit.is_any_char_alive())
+
+        unit.update_char_state(leader)
+        self.assertFalse(unit.is_any_char_alive())
+        self.assertEqual(unit.which_row_can_go(), -1)
+
+    def test_update_char_state_has_acted(self):
+        """ Marks a character as having acted and asserts the next row can go, then resets the
+            unit and asserts the first row can go again.
+        """
+        leader = make_char()
+        second_char = make_char()
+
+        unit = Unit(leader, 7)
+        unit.unit_chars[7] = second_char
+
+        leader.has_performed_action_this_round = True
+        unit.update_char_state(leader)
+        self.assertEqual(unit.which_row_can_go(), 2)
+        self.assertTrue(unit.can_any_character_take_action_in_round(1))
+
+        second_char.has_performed_action_this_round = True
+        unit.update_char_state(second_char)
+        self.assertFalse(unit.can_any_character_take_action_in_round(1))
+
+        unit.reset_has_performed_action_this_round()
+        self.assertEqual(unit.which_row_can_go(), 0)
+        self.assertTrue(unit.can_any_character_take_action_in_round(1))
+
+    def test_masks_follow_moves(self):
+        """ Moves a character and asserts the masks move with it.
+        """
+        leader = make_char(num_actions=2)
+
+        unit = Unit(leader, 7)
+        unit.move_character(leader, 0, 5, temp=True)
+
+        self.assertEqual(unit.unit_chars.occupied_mask, 1 << 5)
+        self.assertEqual(unit.unit_chars.alive_mask, 1 << 5)
+        self.assertEqual(unit.which_row_can_go(), 1)
+        self.assertTrue(unit.can_any_character_take_action_in_battle(2))
+        self.assertFalse(unit.can_any_character_take_action_in_battle(3))
+
+class TestUnitGetAgiByRow(unittest.TestCase):
+    """ Tests Unit.get_agi_by_row()
+    """
+
+    def test_get_agi_by_row(self):
+        """ Asserts the average counts every character in the row, dead or alive.
+        """
+        leader = make_char(2)
+        unit = Unit(leader, 7)
+        dead_char = make_char(6)
+        unit.unit_chars[2] = dead_char
+        self.assertEqual(unit.get_agi_by_row(0), 4)
+
+        dead_char.is_alive = False
+        unit.update_char_state(dead_char)
+        self.assertEqual(unit.get_agi_by_row(0), 4)
+
+    def test_get_agi_by_row_empty_row(self):
+        """ Pushes the only character in a row back, like a crit does, and asserts the emptied
+            row has an average of 0 rather than dividing by zero.
+        """
+        leader = make_char(3)
+        unit = Unit(leader, 7)
+        self.assertEqual(unit.get_agi_by_row(0), 3)
+
+        unit.move_character(leader, 0, 3, temp=True)
+        self.assertEqual(unit.get_agi_by_row(0), 0)
+        self.assertEqual(unit.get_agi_by_row(1), 3)
+
+class TestUnitDetermineTurnOrder(unittest.TestCase):
+    """ Tests Unit.determine_turn_order()
+    """
+
+    def test_determine_turn_order(self):
+        """ Asserts the living characters of a row go fastest first, keeping position order on
+            ties, and that deaths and agility changes are picked up once the unit is told.
+        """
+        leader = make_char(2)
+        unit = Unit(leader, 7)
+        fast_char = make_char(5)
+        tied_char = make_char(2)
+        unit.unit_chars[1] = tied_char
+        unit.unit_chars[2] = fast_char
+        self.assertEqual(unit.determine_turn_order(0), [fast_char, leader, tied_char])
+
+        fast_char.is_alive = False
+        unit.update_char_state(fast_char)
+        self.assertEqual(unit.determine_turn_order(0), [leader, tied_char])
+
+        tied_char.agility = 9
+        self.assertEqual(unit.determine_turn_order(0), [leader, tied_char])
+        unit.update_char_state(tied_char)
+        self.assertEqual(unit.determine_turn_order(0), [tied_char, leader])
+
+    def test_turn_order_is_cached(self):
+        """ Asserts the order is only worked out again after something in the row changes, and
+            changes to other rows leave it alone.
+        """
+        leader = make_char(2)
+        unit = Unit(leader, 7)
+        back_char = make_char(4)
+        unit.unit_chars[6] = back_char
+
+        stats = unit.unit_chars.row_stats(0)
+        leader.has_performed_action_this_round = True
+        unit.update_char_state(leader)
+        unit.move_character(back_char, 6, 7, temp=True)
+        self.assertIs(unit.unit_chars.row_stats(0), stats)
+
+        unit.move_character(leader, 0, 1, temp=True)
+        self.assertIsNot(unit.unit_chars.row_stats(0), stats)
+        self.assertEqual(unit.determine_turn_order(0), [leader])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+""" test_vector_battle.py
+
+	This test suite contains all currently written unit tests for the vector_battle.py module.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_vector_battle
+"""
+#pylint: disable=import-error # False positive.
+#pylint: disable=no-member # the stat arrays are made from SLOT_FIELDS and ROW_FIELDS in __init__.
+import io
+import unittest
+from contextlib import redirect_stdout
+import numpy as np
+from classes.game import Game
+from classes.simulator import simulate_matchup
+from classes.test.unit.test_battle import make_overkill_units
+from classes.test.unit.test_world import make_unit
+from classes.unit_classes.knight import KnightClass
+from classes.vector_battle import VectorBattle, simulate_matchup_vectorized, CLOSE, FAR
+
+def make_close_matchup(game):
+    """ Builds two units that beat each other often enough to compare win rates.
+
+        Returns:
+            The close unit and the far unit.
+    """
+    with redirect_stdout(io.StringIO()):
+        first = game.create_character("A", KnightClass(), agility=5, strength=12, health=40)
+        second = game.create_character("B", KnightClass(), agility=3, strength=9, health=35)
+        third = game.create_character("C", KnightClass(), agility=8, strength=10, health=45)
+        fourth = game.create_character("D", KnightClass(), agility=1, strength=14, health=30)
+
+        unit_close = game.create_unit(first)
+        unit_close.add_char_to_unit(second, 4)
+        unit_far = game.create_unit(third)
+        unit_far.move_character(third, 0, 1)
+        unit_far.add_char_to_unit(fourth, 3)
+        unit_far.targeting_mode = "Weak"
+
+    return unit_close, unit_far
+
+class TestVectorBattleLoad(unittest.TestCase):
+    """ Tests VectorBattle.from_units()
+    """
+
+    def test_from_units_copies_every_character(self):
+        """ Loads a matchup and asserts each characters stats landed in their slot.
+        """
+        unit_close, unit_far = make_close_matchup(Game())
+
+        battles = VectorBattle.from_units(unit_close, unit_far, 4)
+
+        self.assertEqual(battles.occupied[0, CLOSE].nonzero()[0].tolist(), [0, 4])
+        self.assertEqual(battles.occupied[0, FAR].nonzero()[0].tolist(), [1, 3])
+        self.assertEqual(battles.health[3, FAR, 3], 30)
+        self.assertEqual(battles.strength[2, CLOSE, 4], 9)
+        self.assertTrue(battles.leader[1, FAR, 1])
+        self.assertFalse(battles.leader[1, FAR, 3])
+
+class TestVectorBattleRun(unittest.TestCase):
+    """ Tests VectorBattle.run()
+    """
+
+    def test_run_one_sided_matchup(self):
+        """ A character that kills in one hit against one that can't should always win in a
+            single round.
+        """
+        game = Game()
+        with redirect_stdout(io.StringIO()):
+            strong = game.create_character("Strong", KnightClass(), agility=9, strength=50,
+                    health=100)
+            weak = game.create_character("Weak", KnightClass(), agility=1, strength=1, health=20)
+            unit_close = game.create_unit(strong)
+            unit_far = game.create_unit(weak)
+
+        result = simulate_matchup_vectorized(unit_close, unit_far, 100, seed=3)
+
+        self.assertEqual(result.wins, 100)
+        self.assertEqual(result.mean_rounds, 1)
+        self.assertEqual(result.survivors_far, {0: 100})
+
+    def test_row_stops_when_the_enemy_unit_is_wiped_out(self):
+        """ Two characters share a row against one enemy who dies to the first hit. The second
+            character must not hit an empty slot.
+        """
+        unit_close, unit_far = make_overkill_units(Game())
+
+        battles = VectorBattle.from_units(unit_close, unit_far, 50, seed=2).run()
+
+        self.assertEqual(battles.health[:, FAR, 8].tolist(), [0] * 50)
+        self.assertEqual(battles.survivors[:, FAR].tolist(), [0] * 50)
+        self.assertEqual(battles.rounds.tolist(), [1] * 50)
+
+    def test_run_is_reproducible_with_a_seed(self):
+        """ Runs the same matchup twice with the same seed and asserts the results are identical.
+        """
+        unit_close, unit_far = make_close_matchup(Game())
+
+        first = VectorBattle.from_units(unit_close, unit_far, 500, seed=11).run()
+        second = VectorBattle.from_units(unit_close, unit_far, 500, seed=11).run()
+
+        self.assertEqual(first.health.tolist(), second.health.tolist())
+        self.assertEqual(first.rounds.tolist(), second.rounds.tolist())
+
+    def test_run_matches_object_engine(self):
+        """ Runs a matchup on both engines and asserts the outcome rates agree within sampling
+            error.
+        """
+        unit_close, unit_far = make_close_matchup(Game())
+
+        objects = simulate_matchup(unit_close, unit_far, 2000, workers=1)
+        vectors = simulate_matchup_vectorized(unit_close, unit_far, 20000, seed=5)
+
+        self.assertAlmostEqual(objects.loss_rate, vectors.loss_rate, delta=0.01)
+        self.assertAlmostEqual(objects.mean_rounds, vectors.mean_rounds, delta=0.05)
+        self.assertAlmostEqual(objects.mean_survivors_close, vectors.mean_survivors_close,
+                delta=0.05)
+        self.assertAlmostEqual(objects.mean_survivors_far, vectors.mean_survivors_far, delta=0.05)
+
+class TestVectorBattleUnits(unittest.TestCase):
+    """ Tests loading many units into a VectorBattle and storing the results back.
+    """
+
+    def test_load_units_matches_load_unit(self):
+        """ Asserts loading units in bulk fills in the same arrays as loading them one at a time.
+        """
+        game = Game()
+        units = [make_unit(game, name, 4, 30, size=9) for name in "ABCD"]
+        one_at_a_time = VectorBattle(2, seed=1)
+        in_bulk = VectorBattle(2, seed=1)
+
+        for index, unit in enumerate(units):
+            one_at_a_time.load_unit(index // 2, index % 2, unit)
+        in_bulk.load_units([0, 0, 1, 1], [0, 1, 0, 1], units)
+
+        for name in ("occupied", "alive", "leader", "health", "agility", "num_actions",
+                "crit_rate", "hit_damage", "crit_damage", "actions_now", "home"):
+            np.testing.assert_array_equal(getattr(in_bulk, name), getattr(one_at_a_time, name))
+
+    def test_store_units_finds_pushed_characters(self):
+        """ Fights until someone is pushed back by a crit and asserts the damage still goes to
+            the right character.
+        """
+        game = Game()
+        close = make_unit(game, "Close", 10, 200, size=3)
+        far = make_unit(game, "Far", 10, 200, size=3)
+        battles = VectorBattle(50, seed=3)
+        battles.load_units(list(range(50)) * 2, [0] * 50 + [1] * 50, [close] * 50 + [far] * 50)
+        battles.run()
+
+        pushed = np.argwhere(battles.occupied & (battles.home != np.arange(9)))
+        self.assertTrue(len(pushed))
+        index, side, slot = pushed[0]
+        unit = (close, far)[side]
+        battles.store_units([index], [side], [unit])
+
+        char = unit.unit_chars[int(battles.home[index, side, slot])]
+        self.assertEqual(char.health, battles.health[index, side, slot])
+
+if __name__ == "__main__":
+    unittest.main()
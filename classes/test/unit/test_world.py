@@ -0,0 +1,127 @@
+""" test_world.py
+
+	This test suite contains all currently written unit tests for the world.py module.
+
+	Don't forget -- Run this from the root folder and use the command
+	python -m unittest classes.test.unit.test_world
+"""
+#pylint: disable=import-error # False positive.
+import copy
+import io
+import unittest
+from contextlib import redirect_stdout
+import numpy as np
+from classes.game import Game
+from classes.world import SpatialHash, World
+from classes.unit_classes.knight import KnightClass
+
+def make_unit(game, name, strength, health, size=1):
+    """ Makes a unit of knights.
+
+        Returns:
+            The unit.
+    """
+    with redirect_stdout(io.StringIO()):
+        chars = [game.create_character(f"{name} {index}", KnightClass(), agility=5,
+                strength=strength, health=health) for index in range(size)]
+        unit = game.create_unit(chars[0])
+        for position, char in enumerate(chars[1:], start=1):
+            unit.add_char_to_unit(char, position)
+
+    return unit
+
+class TestSpatialHash(unittest.TestCase):
+    """ Tests SpatialHash.
+    """
+
+    def test_pairs_match_a_full_scan(self):
+        """ Asserts the grid finds exactly the pairs comparing every point with every other does,
+            with points on cell edges and outside of the first cell.
+        """
+        rng = np.random.default_rng(4)
+        points = np.concatenate([rng.uniform(-20, 40, (800, 2)),
+                np.array([[0.0, 0.0], [2.0, 0.0], [2.0, 2.0], [-2.0, 0.0]])])
+
+        first, second = SpatialHash(2.0).build(points).pairs(2.0)
+
+        distances = ((points[:, None] - points[None]) ** 2).sum(axis=2)
+        expected = np.argwhere(np.triu(distances <= 4.0, 1))
+        self.assertEqual(sorted(zip(first.tolist(), second.tolist())),
+                sorted(map(tuple, expected.tolist())))
+
+    def test_radius_bigger_than_the_cells(self):
+        """ Asserts a radius the neighbouring cells can't cover is refused.
+        """
+        with self.assertRaises(ValueError):
+            SpatialHash(1.0).build(np.zeros((2, 2))).pairs(1.5)
+
+class TestWorld(unittest.TestCase):
+    """ Tests moving units about a World and the battles they fight.
+    """
+
+    def test_units_bounce_off_the_edges(self):
+        """ Moves a unit into a corner and asserts it stays on the map, heading back.
+        """
+        world = World(10, 10)
+        world.add_unit(make_unit(Game(), "Wall", 1, 10), (9.5, 0.5), (1.0, -1.0))
+
+        world.move()
+
+        self.assertEqual(world.positions.tolist(), [[9.5, 0.5]])
+        self.assertEqual(world.velocities.tolist(), [[-1.0, 1.0]])
+
+    def test_contact_starts_a_battle(self):
+        """ Puts a strong unit next to a weak one and asserts they fight, the weak unit is taken
+            off the map and the damage stays.
+        """
+        game = Game()
+        strong = make_unit(game, "Strong", 50, 100)
+        weak = make_unit(game, "Weak", 1, 10)
+        bystander = make_unit(game, "Far", 1, 10)
+        world = World(100, 100, contact_radius=2.0, seed=1)
+        world.add_units([strong, weak, bystander], [(10, 10), (11, 10), (80, 80)])
+
+        (encounter,) = world.tick()
+
+        self.assertEqual((encounter.close_id, encounter.far_id, encounter.outcome),
+                (strong.unit_id, weak.unit_id, 1))
+        self.assertEqual(world.units, [strong, bystander])
+        self.assertFalse(weak.unit_leader.is_alive)
+        self.assertLessEqual(weak.unit_leader.health, 0)
+        self.assertEqual(world.resting.tolist(), [world.rest_ticks, 0])
+
+    def test_one_battle_per_unit_per_tick(self):
+        """ Puts three units in contact and asserts only the closest two fight, and that resting
+            units don't fight again straight away.
+        """
+        game = Game()
+        units = [make_unit(game, name, 1, 500) for name in "ABC"]
+        world = World(100, 100, contact_radius=3.0, rest_ticks=2, seed=2)
+        world.add_units(units, [(10, 10), (12, 10), (11, 10)])
+
+        (encounter,) = world.tick()
+        self.assertIn(units[2].unit_id, (encounter.close_id, encounter.far_id))
+
+        self.assertEqual(world.tick(), [])
+        self.assertEqual(len(world.tick()), 1)
+
+    def test_same_seed_same_world(self):
+        """ Runs the same crowded world twice and asserts it plays out the same way.
+        """
+        game = Game()
+        units = [make_unit(game, str(index), 3 + index % 7, 40, size=3) for index in range(60)]
+        rng = np.random.default_rng(0)
+        positions = rng.uniform(0, 20, (60, 2))
+        velocities = rng.uniform(-1, 1, (60, 2))
+
+        runs = []
+        for _ in range(2):
+            world = World(20, 20, contact_radius=1.5, seed=9)
+            world.add_units(copy.deepcopy(units), positions, velocities)
+            runs.append([encounter for tick in world.run(10) for encounter in tick])
+
+        self.assertTrue(runs[0])
+        self.assertEqual(runs[0], runs[1])
+
+if __name__ == "__main__":
+    unittest.main()
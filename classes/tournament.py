@@ -0,0 +1,236 @@
+""" tournament.py
+
+contains the round-robin tournament. Every unit in a game fights every other unit, once as the
+close unit and once as the far unit, because battles favor the close unit on agility ties. The
+matchups are split into small chunks on a shared queue, and each worker process takes the next
+chunk as soon as it's done with the last one, so a worker that gets quick matchups doesn't sit
+idle while another is stuck with slow ones.
+
+Workers load the game once from a snapshot (see snapshot.py) and fight on their own copy. Both
+units of a matchup are restored from the roster once, and every battle is fought on a fork of a
+BattleState of them, so the units are never changed by a battle. The game passed in is never
+touched.
+
+"""
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .battle import Battle
+from .battle_state import BattleState
+from .game import Game
+from .rng import RngStream
+from .simulator import MatchupResult, battle_outcome, count_survivors
+
+# points for each outcome in the standings.
+WIN_POINTS = 3
+DRAW_POINTS = 1
+
+# the game each worker process fights on, loaded once by _init_worker.
+_WORKER_GAME = None
+
+class Standings():
+    """ The results of a tournament.
+
+        Attributes:
+            results (dict): The MatchupResult of every matchup. The key is a tuple of the close
+                unit_id and the far unit_id.
+            names (dict): The name of each unit, which is the name of its leader. The key is the
+                unit_id.
+
+    """
+
+    def __init__(self, names):
+        self.names = names
+        self.results = {}
+
+    def add_result(self, close_id, far_id, result):
+        """ Adds battles between two units to the standings.
+
+            Args:
+                close_id (int): The unit_id of the close unit.
+                far_id (int): The unit_id of the far unit.
+                result (MatchupResult): The battles between them.
+        """
+        if (close_id, far_id) in self.results:
+            self.results[(close_id, far_id)].merge(result)
+        else:
+            self.results[(close_id, far_id)] = result
+
+    def table(self) -> list:
+        """ Gets the standings table, best unit first.
+
+            Returns:
+                A list of dicts, one per unit, with the units battles, wins, losses, draws,
+                points and win rate. Units are ordered by points, then win rate, then unit_id.
+        """
+        rows = {unit_id: {"unit_id": unit_id, "name": name, "battles": 0, "wins": 0,
+                "losses": 0, "draws": 0} for unit_id, name in self.names.items()}
+
+        for (close_id, far_id), result in self.results.items():
+            close, far = rows[close_id], rows[far_id]
+            for row in (close, far):
+                row["battles"] += result.battles
+                row["draws"] += result.draws
+            close["wins"] += result.wins
+            close["losses"] += result.losses
+            far["wins"] += result.losses
+            far["losses"] += result.wins
+
+        for row in rows.values():
+            row["points"] = row["wins"] * WIN_POINTS + row["draws"] * DRAW_POINTS
+            row["win_rate"] = row["wins"] / row["battles"] if row["battles"] else 0.0
+
+        return sorted(rows.values(), key=lambda row: (-row["points"], -row["win_rate"],
+                row["unit_id"]))
+
+    def __str__(self):
+        lines = [f"{'#':>3} {'Unit':<16} {'Battles':>8} {'W':>6} {'L':>6} {'D':>6} {'Pts':>7}"]
+        for place, row in enumerate(self.table(), start=1):
+            lines.append(f"{place:>3} {row['name'][:16]:<16} {row['battles']:>8} "
+                    f"{row['wins']:>6} {row['losses']:>6} {row['draws']:>6} {row['points']:>7}")
+
+        return "\n".join(lines) + "\n"
+
+def schedule_matchups(unit_ids) -> list:
+    """ Pairs every unit with every other unit, in both orientations.
+
+        Args:
+            unit_ids (iterable): The units in the tournament.
+
+        Returns:
+            A list of (match_index, close unit_id, far unit_id). The match index picks the
+            matchups random stream, so it never depends on how the matchups are split up.
+    """
+    unit_ids = sorted(unit_ids)
+    pairs = [(close_id, far_id) for close_id in unit_ids for far_id in unit_ids
+            if close_id != far_id]
+    return [(index, close_id, far_id) for index, (close_id, far_id) in enumerate(pairs)]
+
+def restore_units(*units):
+    """ Brings every character in some units back to full health, alive, with no status, in
+        their base positions, ready for the next battle.
+
+        Args:
+            units (Unit): The units to restore. Their characters must share one roster.
+    """
+    for unit in units:
+        chars = [char for char in unit.unit_chars.values() if char is not None]
+        if chars:
+            chars[0].roster.restore(char.char_id for char in chars)
+
+        unit.reset_character_positions()
+        unit.reset_has_performed_action_this_round()
+        unit.refresh_state()
+
+def fight_matches(game, matches, seed, battles_per_match):
+    """ Fights the battles of some matchups of a tournament on a game, one at a time.
+
+        Args:
+            game (Game): The game to fight in. Its units are restored before every matchup.
+            matches (list): (match_index, close unit_id, far unit_id) for each matchup.
+            seed (int): The root seed of the tournament.
+            battles_per_match (int): How many battles each matchup gets.
+
+        Yields:
+            (match_index, close unit_id, far unit_id, battle_index, battle) for each battle, once
+            it's over. Each battle is fought on units of its own, see BattleState.
+    """
+    root = RngStream(seed)
+    for match_index, close_id, far_id in matches:
+        unit_close = game.units[close_id]
+        unit_far = game.units[far_id]
+        match_stream = root.child(match_index)
+        restore_units(unit_close, unit_far)
+        state = BattleState(unit_close, unit_far)
+
+        for battle_index in range(battles_per_match):
+            battle = Battle(game, *state.fork().units, headless=True,
+                    seed=match_stream.child(battle_index))
+            battle.fight_it_out()
+            yield match_index, close_id, far_id, battle_index, battle
+
+def run_matches(game, matches, seed, battles_per_match) -> list:
+    """ Fights some matchups of a tournament on a game. See fight_matches.
+
+        Args:
+            game (Game): The game to fight in. Its units are restored before every matchup.
+            matches (list): (match_index, close unit_id, far unit_id) for each matchup.
+            seed (int): The root seed of the tournament.
+            battles_per_match (int): How many battles each matchup gets.
+
+        Returns:
+            A list of (close unit_id, far unit_id, MatchupResult).
+    """
+    results = {match_index: (close_id, far_id, MatchupResult())
+            for match_index, close_id, far_id in matches}
+    for match_index, _, _, _, battle in fight_matches(game, matches, seed, battles_per_match):
+        survivors_close = count_survivors(battle.unit_close)
+        survivors_far = count_survivors(battle.unit_far)
+        results[match_index][2].add_battle(battle_outcome(survivors_close, survivors_far),
+                battle.round - 1, survivors_close, survivors_far)
+
+    return list(results.values())
+
+def _init_worker(snapshot):
+    """ Loads the tournaments game into a worker process.
+    """
+    global _WORKER_GAME #pylint: disable=global-statement # one game per worker process.
+    _WORKER_GAME = Game()
+    _WORKER_GAME.restore(snapshot)
+
+def _run_matches_in_worker(matches, seed, battles_per_match):
+    return run_matches(_WORKER_GAME, matches, seed, battles_per_match)
+
+#pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals # this is fine.
+def run_tournament(game, battles_per_match=1, workers=None, chunk_size=None, seed=None,
+        unit_ids=None) -> Standings:
+    """ Runs a round-robin tournament between the units of a game.
+
+        Args:
+            game (Game): The game whose units fight. It isn't changed.
+            battles_per_match (int): How many battles each matchup gets.
+            workers (int): How many worker processes to use. Defaults to one per cpu. With a
+                single worker everything is fought in this process.
+            chunk_size (int): How many matchups a worker takes at a time. Defaults to enough for
+                a good number of chunks per worker.
+            seed (int): The root seed. Picked at random if not given.
+            unit_ids (iterable): The units that take part. Defaults to every unit in the game.
+
+        Returns:
+            The Standings.
+    """
+    if seed is None:
+        seed = RngStream().seed
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # sorted once, so a generator of unit_ids isn't used up before the names are read.
+    unit_ids = sorted(game.units if unit_ids is None else unit_ids)
+    matches = schedule_matchups(unit_ids)
+    standings = Standings({unit_id: game.units[unit_id].unit_leader.char_name
+            for unit_id in unit_ids})
+    if not matches:
+        return standings
+
+    snapshot = game.snapshot()
+    if workers <= 1:
+        copied = Game()
+        copied.restore(snapshot)
+        for close_id, far_id, result in run_matches(copied, matches, seed, battles_per_match):
+            standings.add_result(close_id, far_id, result)
+        return standings
+
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(len(matches) / (workers * 16)))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+            initargs=(snapshot,)) as executor:
+        futures = [executor.submit(_run_matches_in_worker, matches[start:start + chunk_size],
+                seed, battles_per_match) for start in range(0, len(matches), chunk_size)]
+        for future in as_completed(futures):
+            for close_id, far_id, result in future.result():
+                standings.add_result(close_id, far_id, result)
+
+    return standings
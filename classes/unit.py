@@ -9,6 +9,192 @@ Front
 back
 
 """
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+from .targeting import FIRST_POSITION
+
+# statuses that stop a character from taking an action.
+BLOCKING_STATUSES = frozenset(('Paralyze', 'Sleep', 'Stone'))
+
+# the row of the lowest set bit of a 9 bit position mask, or -1 for an empty mask.
+FIRST_ROW = tuple(-1 if mask == 0 else ((mask & -mask).bit_length() - 1) // 3
+        for mask in range(512))
+
+#pylint: disable=too-many-instance-attributes # one mask per kind of state, this is fine.
+class UnitSlots(dict):
+    """ The nine positions of a unit, mapped to the character in each one (or None).
+
+        Works like a plain dict, but every time a position is set it also keeps a reverse index
+        from character to position, the characters current_position, and a set of 9 bit masks
+        (bit n is position n) up to date. Changes to a character that's already in a position
+        have to be passed on with refresh(), or Unit.update_char_state/refresh_state.
+
+        Each row also keeps its turn order and agility totals, see row_stats(). They're worked
+        out the first time they're asked for and kept until a character in the row dies, moves
+        or changes agility.
+
+        Attributes:
+            positions (dict): The position of each character in the unit. The key is the
+                Character and the value is the position.
+            occupied_mask (int): Positions with a character in them.
+            alive_mask (int): Positions with a living character in them.
+            acted_mask (int): Positions whose character has acted this round.
+            blocked_mask (int): Positions whose character has a status that stops them acting.
+            num_actions (list): The number of actions the character in each position gets.
+            agility (list): The agility of the character in each position, 0 if it's empty.
+
+    """
+
+    def __init__(self):
+        super().__init__((position, None) for position in range(9))
+        self.positions = {}
+        self.occupied_mask = 0
+        self.alive_mask = 0
+        self.acted_mask = 0
+        self.blocked_mask = 0
+        self.num_actions = [0] * 9
+        self.agility = [0] * 9
+        self._has_actions_masks = {}
+        self._row_stats = [None, None, None]
+
+    def __reduce__(self):
+        # copies and pickles rebuild the index by setting every position again.
+        return (UnitSlots, (), None, None, iter(self.items()))
+
+    def __setitem__(self, position, char):
+        old_char = self.get(position)
+        if old_char is not None and self.positions.get(old_char) == position:
+            del self.positions[old_char]
+
+        super().__setitem__(position, char)
+
+        if char is not None:
+            self.positions[char] = position
+            char.current_position = position
+
+        self._row_stats[position // 3] = None
+        self.refresh(position)
+
+    @classmethod
+    def filled(cls, placed):
+        """ Makes the slots of a unit with every character already in place, working out the
+            masks in one pass rather than one position at a time.
+
+            Args:
+                placed (dict): position -> Character.
+
+            Returns:
+                The UnitSlots, the same as setting each position of empty slots.
+        """
+        slots = cls()
+        positions = slots.positions
+        num_actions = slots.num_actions
+        agility = slots.agility
+        for position, char in placed.items():
+            dict.__setitem__(slots, position, char)
+            positions[char] = position
+            char.current_position = position
+
+            bit = 1 << position
+            slots.occupied_mask |= bit
+            if char.is_alive is True:
+                slots.alive_mask |= bit
+            if char.has_performed_action_this_round is not False:
+                slots.acted_mask |= bit
+            if char.status in BLOCKING_STATUSES:
+                slots.blocked_mask |= bit
+            num_actions[position] = char.char_class.num_actions[min(position // 3, 2)]
+            agility[position] = char.agility
+
+        return slots
+
+    def refresh(self, position):
+        """ Re-reads the character in a position into the masks.
+
+            Args:
+                position (int): The position to re-read.
+        """
+        bit = 1 << position
+        keep = ~bit
+        was_alive = self.alive_mask & bit
+        self.alive_mask &= keep
+        self.acted_mask &= keep
+        self.blocked_mask &= keep
+
+        char = self.get(position)
+        if char is None:
+            num_actions = 0
+            agility = 0
+            self.occupied_mask &= keep
+        else:
+            self.occupied_mask |= bit
+            if char.is_alive is True:
+                self.alive_mask |= bit
+            if char.has_performed_action_this_round is not False:
+                self.acted_mask |= bit
+            if char.status in BLOCKING_STATUSES:
+                self.blocked_mask |= bit
+            num_actions = char.get_num_actions()
+            agility = char.agility
+
+        # the row only needs working out again if someone in it died, came back or got faster.
+        if was_alive != self.alive_mask & bit or agility != self.agility[position]:
+            self.agility[position] = agility
+            self._row_stats[position // 3] = None
+
+        # only moving characters around changes who has actions left.
+        if num_actions != self.num_actions[position] or not self.occupied_mask & bit:
+            self.num_actions[position] = num_actions
+            self._has_actions_masks.clear()
+
+    def has_actions_mask(self, round_number) -> int:
+        """ Gets the positions whose character still has actions in a round. The opposite of
+            this is every character who is out of actions for round_number.
+
+            Args:
+                round_number (int): The current round number for a battle.
+
+            Returns:
+                A mask of positions whose character gets at least round_number actions.
+        """
+        mask = self._has_actions_masks.get(round_number)
+        if mask is None:
+            mask = 0
+            occupied = self.occupied_mask
+            for position, num_actions in enumerate(self.num_actions):
+                if occupied >> position & 1 and num_actions >= round_number:
+                    mask |= 1 << position
+            self._has_actions_masks[round_number] = mask
+
+        return mask
+
+    def row_stats(self, row) -> tuple:
+        """ Gets the turn order and agility totals of a row, working them out if the row has
+            changed since they were last asked for.
+
+            Args:
+                row (int): The row, 0 to 2.
+
+            Returns:
+                A tuple of (order, agility_sum, alive_count, char_count). order is a tuple of the
+                living characters in the row, highest agility first and in position order on
+                ties. agility_sum and char_count cover every character in the row, even dead ones.
+        """
+        stats = self._row_stats[row]
+        if stats is None:
+            positions = range(row * 3, row * 3 + 3)
+            occupied = self.occupied_mask
+            alive = self.alive_mask
+            agility = self.agility
+            order = sorted((position for position in positions if alive >> position & 1),
+                    key=lambda position: agility[position], reverse=True)
+            stats = (tuple(self[position] for position in order),
+                    sum(agility[position] for position in positions),
+                    len(order),
+                    sum(occupied >> position & 1 for position in positions))
+            self._row_stats[row] = stats
+
+        return stats
+
 class Unit():
     """ Contains all the properties and methods used in a Unit object.
         A Unit is a collection of characters, with one character set as the leader of the group.
@@ -16,23 +202,43 @@ class Unit():
         Attributes:
             unit_leader (Character): the leader of the unit. If the leader dies, the unit cannot be
                 given orders.
-            unit_chars (dict): A dictionary of characters in a unit. The key is the
-                position in the unit and the value is a Charcter object.
+            unit_chars (UnitSlots): A dictionary of characters in a unit. The key is the
+                position in the unit and the value is a Charcter object. It also knows the
+                position of each character, see UnitSlots.
             unit_id (int): The unique ID of the unit.
             targeting_mode (str): The targeting mode of the unit.
 
     """
     def __init__(self, leader, unit_id=0):
         self.unit_leader = leader
-        self.unit_chars = {0: leader}
+        self.unit_chars = UnitSlots()
+        self.unit_chars[0] = leader
         self.targeting_mode = "Strong" #other valus include Strong Weak Auto Leader
 
-        for index in range(1,9):
-            self.unit_chars[index] = None
-
         self.unit_id = unit_id
         leader.unit_id = self.unit_id
 
+    @classmethod
+    def from_slots(cls, unit_chars, leader, unit_id, targeting_mode="Strong"):
+        """ Makes a unit around slots that are already filled in, without touching the
+            characters. Used when loading a game snapshot and when making units in bulk.
+
+            Args:
+                unit_chars (UnitSlots): The characters in each position.
+                leader (Character): The leader of the unit, who must be in unit_chars.
+                unit_id (int): The unique ID of the unit.
+                targeting_mode (str): The targeting mode of the unit.
+
+            Returns:
+                The Unit.
+        """
+        unit = cls.__new__(cls)
+        unit.unit_leader = leader
+        unit.unit_chars = unit_chars
+        unit.targeting_mode = targeting_mode
+        unit.unit_id = unit_id
+        return unit
+
     def add_char_to_unit(self, char, position):
         """ Adds a character to a unit in a position.
 
@@ -83,13 +289,7 @@ class Unit():
                 True if there is at least one character alive
                 False if no characters are alive.
         """
-        for _, char in self.unit_chars.items():
-            if char is not None:
-                if char.is_alive is True:
-                    return True
-
-        print(f"{self.unit_leader.char_name}'s unit is crushed!")
-        return False
+        return self.unit_chars.alive_mask != 0
 
     def can_any_character_take_action_in_battle(self, round_number) -> bool:
         """ Determines if any character can take an action during this battle.
@@ -103,14 +303,8 @@ class Unit():
                 True: if there is at least one character that can still act during this battle.
                 False: if no characters can act based on total number of actions and round num.
         """
-        statuses = ['Paralyze', 'Sleep', 'Stone']
-        for _, char in self.unit_chars.items():
-            if char is not None:
-                if char.get_num_actions() >= round_number and char.is_alive is True:
-                    if char.status not in statuses:
-                        return True
-
-        return False
+        slots = self.unit_chars
+        return slots.alive_mask & ~slots.blocked_mask & slots.has_actions_mask(round_number) != 0
 
     def can_any_character_take_action_in_round(self, round_number) -> bool:
         """ Determines if any character can take an action during this round.
@@ -122,16 +316,9 @@ class Unit():
                 False: if no characters can act based on total number of actions, or if all chars
                     have acted.
         """
-        statuses = ['Paralyze', 'Sleep', 'Stone']
-        for _, char in self.unit_chars.items():
-            if char is not None:
-                if char.get_num_actions() >= round_number and \
-                        char.has_performed_action_this_round is False and \
-                        char.is_alive is True:
-                    if char.status not in statuses:
-                        return True
-
-        return False
+        slots = self.unit_chars
+        return slots.alive_mask & ~slots.acted_mask & ~slots.blocked_mask & \
+                slots.has_actions_mask(round_number) != 0
 
     def which_row_can_go(self) -> int:
         """ Determines which row in this unit can act. The battle system uses rows to determine
@@ -141,23 +328,8 @@ class Unit():
             Returns:
                 An integer denoting the row index for the first row that can act
         """
-        char_index = -1
-        for pos, char in self.unit_chars.items():
-            if char is not None:
-                if char.has_performed_action_this_round is False and char.is_alive is True:
-                    char_index = pos
-                    break
-
-        if 0 <= char_index <= 2:
-            return 0
-
-        if 2 < char_index <= 5:
-            return 1
-
-        if 5 < char_index <= 8:
-            return 2
-
-        return -1
+        slots = self.unit_chars
+        return FIRST_ROW[slots.alive_mask & ~slots.acted_mask]
 
     def get_agi_by_row(self, row_index) -> float:
         """ Gets the average agility of characters in a particiular row in a unit.
@@ -167,15 +339,11 @@ class Unit():
                 row_index (int): the row in this unit we're getting the average agi for.
 
             Returns:
-                A number denoting a rows average agility.
+                A number denoting a rows average agility, or 0 for an empty row.
         """
-        row_agi = 0
-        row_chars = 0
-        for col in range(0,3):
-            char = self.unit_chars[row_index*3+col]
-            if char is not None:
-                row_chars += 1
-                row_agi += char.agility
+        _, row_agi, _, row_chars = self.unit_chars.row_stats(row_index)
+        if row_chars == 0:
+            return 0.0
 
         return row_agi / row_chars
 
@@ -187,12 +355,11 @@ class Unit():
             Returns:
                 The first alive character in a unit based on unit position.
         """
-        for _, char in self.unit_chars.items():
-            if char is not None:
-                if char.is_alive is True:
-                    return char
+        first = FIRST_POSITION[self.unit_chars.alive_mask]
+        if first < 0:
+            return None
 
-        return None
+        return self.unit_chars[first]
 
     def move_character(self, char: object, old_pos: int, new_pos: int, temp: bool=False):
         """ Moves a character within a unit. A character cannot move to an occupied space.
@@ -230,7 +397,7 @@ class Unit():
                 An integer with the position of the character in the unit.
 
         """
-        return list(self.unit_chars.keys())[list(self.unit_chars.values()).index(char)]
+        return self.unit_chars.positions[char]
 
     def reset_character_positions(self):
         """ Resets all characters of this unit back to their base positions.
@@ -247,6 +414,24 @@ class Unit():
             if char is not None:
                 char.has_performed_action_this_round = False
 
+        self.unit_chars.acted_mask = 0
+
+    def update_char_state(self, char):
+        """ Passes a change to a character in this unit (health, is_alive, status, agility or
+            has_performed_action_this_round) on to the units masks. Anything that changes a
+            character outside of the unit has to call this.
+
+            Args:
+                char (Character): The character that changed.
+        """
+        self.unit_chars.refresh(self.unit_chars.positions[char])
+
+    def refresh_state(self):
+        """ Re-reads every character in this unit into the units masks.
+        """
+        for position in range(9):
+            self.unit_chars.refresh(position)
+
     def determine_turn_order(self, row_index):
         """ This function accepts a unit and a units_row and determines the order the characters
             will act in.
@@ -259,15 +444,4 @@ class Unit():
                 a list of Character() objects in the order they should do their actions.
 
         """
-        char_order = []
-
-        for col in range(0,3):
-            char = self.unit_chars[row_index*3+col]
-            if char is not None and char.is_alive is True:
-                char_order.append(char)
-            else:
-                continue
-
-        char_order.sort(key=lambda x: x.agility, reverse=True)
-
-        return char_order
+        return list(self.unit_chars.row_stats(row_index)[0])
@@ -0,0 +1,40 @@
+""" char_class.py
+
+contains the basic character class every class is made from. The classes themselves (Knight and
+friends) are defined in catalog.toml and built from this by catalog.py, so a new class only needs
+a new entry in the catalog.
+
+"""
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+#pylint: disable=too-few-public-methods # This is fine.
+from ..registry import Flyweight, frozen, get_class
+
+class CharClass(Flyweight):
+    """ Contains all the properties of a basic character class. Every class in the catalog is a
+        subclass of this with its own values.
+
+        There is only one instance of each class, shared by every character of the class. See
+        registry.py.
+
+        Attributes:
+            class_id (int): The id associated with this class.
+            name (str): The name of this class, as used in scenarios.
+            actions (dict): A dict containing the type of actions this char
+                will take. The key represents the row, so key=0 means in the front, the character
+                will take this action.
+
+            num_actions (dict): A dict containing the number of actions this character
+                will get. The key represents the row, so key=0 means in the front, the character
+                will take this many actions.
+
+    """
+
+    __slots__ = ()
+    class_id = 0
+    name = "Class"
+    actions = frozen({})
+    num_actions = frozen({})
+
+    def __reduce__(self):
+        # catalog classes aren't importable by name, so they're pickled by id.
+        return (get_class, (self.class_id,))
@@ -1,34 +1,10 @@
 """ knight.py
 
-contains all the info for the knight class.
+contains the knight class. The knight is a fairly basic melee class with average and balanced
+stats. Its values live in catalog.toml, this module just gives it a name to import.
 
 """
 #pylint: disable=relative-beyond-top-level # it's fine for now.
-#pylint: disable=too-few-public-methods # This is fine.
-from ..actions.slash_action import SlashAction
-class KnightClass():
-    """ Contains all the properties and methods of the Knight class
-        The knight is a fairly basic melee class with average and balanced stats.
+from ..catalog import default_catalog
 
-        Attributes:
-            class_id (int): The id associated with this class.
-            actions (dict): A dict containing the type of actions this char
-                will take. The key represents the row, so key=0 means in the front, the character
-                will take this action.
-
-            num_actions (dict): A dict containing the number of actions this character
-                will get. The key represents the row, so key=0 means in the front, the character
-                will take this many actions.
-
-    """
-
-    #
-    def __init__(self):
-        self.class_id = 1
-        # includes how many stats per level
-        # incldes promition requirements
-        # set the actions here, the actions themselves are calculated on the fly?
-        self.actions = {0: SlashAction(), 1: SlashAction(), 2: SlashAction()}
-
-        # front, middle, back.
-        self.num_actions = {0: 2, 1: 1, 2: 1}
+KnightClass = type(default_catalog().classes["Knight"])
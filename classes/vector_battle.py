@@ -0,0 +1,460 @@
+""" vector_battle.py
+
+contains the vectorized battle engine. Instead of one Battle object per battle, many independent
+battles are kept as struct-of-arrays tensors shaped (battles, 2 units, 9 slots), and every battle
+is advanced one row-turn at a time with numpy array math.
+
+The rules are the same ones the object engine in battle.py uses:
+    Unit.which_row_can_go           -> _which_row_can_go
+    Unit.get_agi_by_row             -> _agi_by_row
+    Unit.determine_turn_order       -> _turn_order
+    Character.determine_target      -> _determine_target
+    AttackAction.determine_crit     -> crit rolls in _take_actions
+    AttackAction.get_damage         -> damage in _take_actions
+
+so results match the object engine statistically, not battle for battle.
+
+Side 0 is always the close unit and side 1 is always the far unit.
+
+"""
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+#pylint: disable=no-member # the stat arrays are made from SLOT_FIELDS and ROW_FIELDS in __init__.
+import numpy as np
+from .registry import class_rows
+from .rng import RngStream
+from .simulator import MatchupResult
+from .targeting import TARGET_TABLE, FIRST_POSITION
+
+CLOSE = 0
+FAR = 1
+
+# targeting modes, as ints so they can live in an array.
+TARGETING_MODES = {"Strong": 0, "Weak": 1, "Leader": 2, "Auto": 3}
+STRONG, WEAK, LEADER, AUTO = 0, 1, 2, 3
+
+# per slot fields, with their dtype and the value an empty slot has. Characters carry all of these
+# with them when they are pushed back by a crit.
+SLOT_FIELDS = {
+    "occupied": (np.bool_, False),
+    "alive": (np.bool_, False),
+    "acted": (np.bool_, False),
+    "leader": (np.bool_, False),
+    "health": (np.int32, 0),
+    "agility": (np.int32, 0),
+    "strength": (np.int32, 0),
+    "actions_now": (np.int8, 0),
+    "home": (np.int8, -1),
+}
+
+# per slot, per row fields. The last axis is the row the character is standing in.
+ROW_FIELDS = {
+    "num_actions": (np.int8, 0),
+    "crit_rate": (np.float64, 0.0),
+    "can_crit": (np.bool_, False),
+    "hit_damage": (np.int32, 0),
+    "crit_damage": (np.int32, 0),
+}
+
+# the targeting tables from targeting.py as arrays. Candidate lists are padded with -1.
+_TARGET_TABLE = np.full((9, 512, 3), -1, dtype=np.int64)
+for _position, _by_mask in enumerate(TARGET_TABLE):
+    for _alive_mask, _candidates in enumerate(_by_mask):
+        _TARGET_TABLE[_position, _alive_mask, :len(_candidates)] = _candidates
+_FIRST_POSITION = np.array(FIRST_POSITION, dtype=np.int64)
+_POSITION_BITS = 1 << np.arange(9, dtype=np.int32)
+
+def _row_from_position(position):
+    """ The array version of Character.get_row_from_position.
+    """
+    return np.minimum(position // 3, 2)
+
+#pylint: disable=too-many-instance-attributes # one array per stat, this is fine.
+class VectorBattle():
+    """ Many independent battles stepped in lockstep.
+
+        Attributes:
+            num_battles (int): How many battles are being run.
+            occupied, alive, acted, leader (np.ndarray): bool arrays shaped (battles, 2, 9).
+            health, agility, strength (np.ndarray): int arrays shaped (battles, 2, 9).
+            actions_now (np.ndarray): How many actions each character gets in the row they're
+                standing in. Kept so the termination checks don't look it up every pass.
+            home (np.ndarray): The slot each character was loaded into, so they can be found in
+                their unit again after a crit pushes them back.
+            num_actions (np.ndarray): Actions per round for each character, shaped
+                (battles, 2, 9, 3). The last axis is the row.
+            crit_rate (np.ndarray): Crit rate of each characters action, shaped like num_actions.
+            can_crit (np.ndarray): Can each characters action crit, shaped like num_actions.
+            hit_damage, crit_damage (np.ndarray): How hard each characters action hits, without
+                and with a crit, shaped like num_actions.
+            targeting_mode (np.ndarray): The targeting mode of each unit, shaped (battles, 2).
+            round (np.ndarray): The current round of each battle.
+            finished (np.ndarray): Which battles are over.
+            seed (int): The seed of the crit rolls. Picked at random if not given, so a run can
+                always be made again.
+            rng (np.random.Generator): Where crit rolls come from. Crits for every battle are
+                drawn in one call per action step.
+
+    """
+
+    def __init__(self, num_battles, seed=None):
+        self.num_battles = num_battles
+        shape = (num_battles, 2, 9)
+        for name, (dtype, empty) in SLOT_FIELDS.items():
+            setattr(self, name, np.full(shape, empty, dtype=dtype))
+        for name, (dtype, empty) in ROW_FIELDS.items():
+            setattr(self, name, np.full(shape + (3,), empty, dtype=dtype))
+
+        self.targeting_mode = np.full((num_battles, 2), AUTO, dtype=np.int8)
+        self.round = np.ones(num_battles, dtype=np.int32)
+        self.finished = np.zeros(num_battles, dtype=bool)
+        self.seed = seed if seed is not None else RngStream().seed
+        self.rng = np.random.default_rng(self.seed)
+
+    @classmethod
+    def from_units(cls, unit_close, unit_far, num_battles, seed=None):
+        """ Creates num_battles copies of the same matchup.
+
+            Args:
+                unit_close (Unit): The close unit.
+                unit_far (Unit): The far unit.
+                num_battles (int): How many battles to run.
+                seed (int): Seed for the crit rolls.
+
+            Returns:
+                A VectorBattle ready to run.
+        """
+        battles = cls(num_battles, seed=seed)
+        battles.load_unit(slice(None), CLOSE, unit_close)
+        battles.load_unit(slice(None), FAR, unit_far)
+        return battles
+
+    def load_unit(self, battle_index, side, unit):
+        """ Copies a units characters into the arrays.
+
+            Args:
+                battle_index (int/slice): Which battles to load the unit into.
+                side (int): CLOSE or FAR.
+                unit (Unit): The unit to load.
+        """
+        self.targeting_mode[battle_index, side] = TARGETING_MODES.get(unit.targeting_mode, AUTO)
+
+        for pos, char in unit.unit_chars.items():
+            if char is None:
+                continue
+
+            self.occupied[battle_index, side, pos] = True
+            self.alive[battle_index, side, pos] = char.is_alive
+            self.acted[battle_index, side, pos] = char.has_performed_action_this_round
+            self.leader[battle_index, side, pos] = char is unit.unit_leader
+            self.health[battle_index, side, pos] = char.health
+            self.agility[battle_index, side, pos] = char.agility
+            self.strength[battle_index, side, pos] = char.strength
+            rows = class_rows(char.char_class.class_id)
+            self.num_actions[battle_index, side, pos] = rows.num_actions
+            self.crit_rate[battle_index, side, pos] = rows.crit_rates
+            self.can_crit[battle_index, side, pos] = rows.can_crit
+            self.hit_damage[battle_index, side, pos], self.crit_damage[battle_index, side, pos] = \
+                    rows.damage_for(char)
+            self.actions_now[battle_index, side, pos] = rows.num_actions[pos // 3]
+            self.home[battle_index, side, pos] = pos
+
+    #pylint: disable=too-many-locals # one list per field, this is fine.
+    def load_units(self, battle_indexes, sides, units):
+        """ Copies many units into the arrays at once, each into its own battle and side. Does
+            the same as calling load_unit for each, with one array write per field.
+
+            Args:
+                battle_indexes (iterable): The battle to load each unit into.
+                sides (iterable): CLOSE or FAR for each unit.
+                units (iterable): The units to load.
+        """
+        index, side, slot, chars, leaders = [], [], [], [], []
+        for battle_index, unit_side, unit in zip(battle_indexes, sides, units):
+            self.targeting_mode[battle_index, unit_side] = \
+                    TARGETING_MODES.get(unit.targeting_mode, AUTO)
+            for pos, char in unit.unit_chars.items():
+                if char is not None:
+                    index.append(battle_index)
+                    side.append(unit_side)
+                    slot.append(pos)
+                    chars.append(char)
+                    leaders.append(char is unit.unit_leader)
+
+        if not chars:
+            return
+
+        where = (np.array(index), np.array(side), np.array(slot))
+        rows = [class_rows(char.char_class.class_id) for char in chars]
+        damage = np.array([row.damage_for(char) for row, char in zip(rows, chars)])
+        num_actions = np.array([row.num_actions for row in rows])
+
+        self.occupied[where] = True
+        self.alive[where] = [char.is_alive for char in chars]
+        self.acted[where] = [char.has_performed_action_this_round for char in chars]
+        self.leader[where] = leaders
+        self.health[where] = [char.health for char in chars]
+        self.agility[where] = [char.agility for char in chars]
+        self.strength[where] = [char.strength for char in chars]
+        self.num_actions[where] = num_actions
+        self.crit_rate[where] = [row.crit_rates for row in rows]
+        self.can_crit[where] = [row.can_crit for row in rows]
+        self.hit_damage[where] = damage[:, 0]
+        self.crit_damage[where] = damage[:, 1]
+        self.actions_now[where] = num_actions[np.arange(len(chars)), where[2] // 3]
+        self.home[where] = where[2]
+
+    def store_units(self, battle_indexes, sides, units):
+        """ Copies the health and deaths of finished battles back onto the characters of their
+            units. The opposite of load_units.
+
+            Args:
+                battle_indexes (iterable): The battle each unit was loaded into.
+                sides (iterable): CLOSE or FAR for each unit.
+                units (iterable): The units to update.
+        """
+        for battle_index, unit_side, unit in zip(battle_indexes, sides, units):
+            for pos in np.flatnonzero(self.occupied[battle_index, unit_side]):
+                char = unit.unit_chars[int(self.home[battle_index, unit_side, pos])]
+                char.health = int(self.health[battle_index, unit_side, pos])
+                char.is_alive = bool(self.alive[battle_index, unit_side, pos])
+
+            unit.refresh_state()
+
+    def _can_act(self, in_round):
+        """ The array version of Unit.can_any_character_take_action_in_battle/_in_round.
+
+            Args:
+                in_round (bool): Only count characters that haven't acted this round.
+
+            Returns:
+                A bool array shaped (battles, 2).
+        """
+        can_act = self.occupied & self.alive & (self.actions_now >= self.round[:, None, None])
+        if in_round:
+            can_act &= ~self.acted
+
+        return can_act.any(axis=2)
+
+    def _is_a_unit_defeated(self):
+        """ The array version of Battle.is_a_unit_defeated.
+        """
+        return ~(self.occupied & self.alive).any(axis=2).all(axis=1)
+
+    def _which_row_can_go(self, index):
+        """ The array version of Unit.which_row_can_go, for both units of some battles.
+
+            Returns:
+                An int array shaped (len(index), 2) of row indicies, or -1 if no row can go.
+        """
+        ready = self.occupied[index] & self.alive[index] & ~self.acted[index]
+        first = np.argmax(ready, axis=2)
+        return np.where(ready.any(axis=2), first // 3, -1)
+
+    def _agi_by_row(self, index, side, row):
+        """ The array version of Unit.get_agi_by_row.
+        """
+        slots = row[:, None] * 3 + np.arange(3)
+        occupied = self.occupied[index[:, None], side[:, None], slots]
+        agility = self.agility[index[:, None], side[:, None], slots]
+        count = np.maximum(occupied.sum(axis=1), 1)
+        return np.where(occupied, agility, 0).sum(axis=1) / count
+
+    def _turn_order(self, index, side, row):
+        """ The array version of Unit.determine_turn_order.
+
+            Returns:
+                An int array of slots shaped (len(index), 3) in the order they act, and a bool
+                array of the same shape that says which of those are real characters.
+        """
+        slots = row[:, None] * 3 + np.arange(3)
+        can_go = self.occupied[index[:, None], side[:, None], slots] & \
+                self.alive[index[:, None], side[:, None], slots]
+        agility = self.agility[index[:, None], side[:, None], slots]
+
+        # the object engine sorts by agility, highest first, and keeps unit order on ties.
+        key = np.where(can_go, -agility.astype(np.float64), np.inf)
+        order = np.argsort(key, axis=1, kind="stable")
+        return np.take_along_axis(slots, order, axis=1), np.take_along_axis(can_go, order, axis=1)
+
+    #pylint: disable=too-many-locals # it's one array per step of the object version.
+    def _determine_target(self, index, enemy, attacker_pos):
+        """ The array version of Character.determine_target. Uses the same precomputed table.
+
+            Returns:
+                An int array with the targeted slot for each battle.
+        """
+        alive = self.occupied[index, enemy] & self.alive[index, enemy]
+        alive_mask = alive.astype(np.int32) @ _POSITION_BITS
+        candidates = _TARGET_TABLE[attacker_pos, alive_mask]
+        is_candidate = candidates >= 0
+
+        health = self.health[index[:, None], enemy[:, None], np.maximum(candidates, 0)]
+        strongest = np.take_along_axis(candidates,
+                np.argmax(np.where(is_candidate, health, np.iinfo(health.dtype).min), axis=1)
+                [:, None], axis=1)[:, 0]
+        weakest = np.take_along_axis(candidates,
+                np.argmin(np.where(is_candidate, health, np.iinfo(health.dtype).max), axis=1)
+                [:, None], axis=1)[:, 0]
+
+        leader = self.leader[index, enemy] & alive
+        leader_slot = np.where(leader.any(axis=1), np.argmax(leader, axis=1), -1)
+        leader_targetable = (candidates == leader_slot[:, None]).any(axis=1) & (leader_slot >= 0)
+
+        mode = self.targeting_mode[index, 1 - enemy]
+        target = _FIRST_POSITION[alive_mask]
+        any_candidate = is_candidate.any(axis=1)
+        target = np.where((mode == STRONG) & any_candidate, strongest, target)
+        target = np.where((mode == WEAK) & any_candidate, weakest, target)
+        target = np.where((mode == LEADER) & leader_targetable, leader_slot, target)
+        return target
+
+    def _move(self, index, side, old_pos, new_pos):
+        """ Moves characters between slots, taking every field with them.
+        """
+        for name, (_, empty) in SLOT_FIELDS.items():
+            array = getattr(self, name)
+            array[index, side, new_pos] = array[index, side, old_pos]
+            array[index, side, old_pos] = empty
+        for name, (_, empty) in ROW_FIELDS.items():
+            array = getattr(self, name)
+            array[index, side, new_pos] = array[index, side, old_pos]
+            array[index, side, old_pos] = empty
+
+        # the row a character is in decides how many actions they get.
+        self.actions_now[index, side, new_pos] = \
+                self.num_actions[index, side, new_pos, _row_from_position(new_pos)]
+
+    def _take_actions(self, index, side, actors):
+        """ The array version of Battle.take_action, for one character in each of some battles.
+        """
+        enemy = 1 - side
+        target = self._determine_target(index, enemy, actors)
+
+        # someone earlier in the row may have finished off the enemy unit.
+        has_target = target >= 0
+        if not has_target.all():
+            index, side, actors = index[has_target], side[has_target], actors[has_target]
+            enemy, target = enemy[has_target], target[has_target]
+
+        row = _row_from_position(actors)
+        crit_chance = self.crit_rate[index, side, actors, row] + \
+                self.agility[index, side, actors] / 100
+        is_crit = self.rng.random(len(index)) <= crit_chance
+        is_crit &= self.can_crit[index, side, actors, row]
+        damage = np.where(is_crit, self.crit_damage[index, side, actors, row],
+                self.hit_damage[index, side, actors, row])
+
+        # crits push the target back a row, if there's room behind them.
+        pushed_pos = target + 3
+        pushed = is_crit & (pushed_pos <= 8)
+        pushed &= ~self.occupied[index, enemy, np.minimum(pushed_pos, 8)]
+        if pushed.any():
+            self._move(index[pushed], enemy[pushed], target[pushed], pushed_pos[pushed])
+            target = np.where(pushed, pushed_pos, target)
+
+        self.health[index, enemy, target] -= damage.astype(self.health.dtype)
+        self.alive[index, enemy, target] &= self.health[index, enemy, target] > 0
+        self.acted[index, side, actors] = True
+
+    def _row_turn(self, index):
+        """ The array version of one pass of the inner loop of Battle.fight_it_out.
+        """
+        rows = self._which_row_can_go(index)
+        row_close = rows[:, CLOSE]
+        row_far = rows[:, FAR]
+
+        agi_close = self._agi_by_row(index, np.full(len(index), CLOSE), np.maximum(row_close, 0))
+        agi_far = self._agi_by_row(index, np.full(len(index), FAR), np.maximum(row_far, 0))
+
+        # ties go to the close unit.
+        close_goes = (row_close >= 0) & ((row_far < 0) | (agi_close >= agi_far))
+        side = np.where(close_goes, CLOSE, FAR)
+        row = np.where(close_goes, row_close, row_far)
+
+        order, can_go = self._turn_order(index, side, row)
+        for turn in range(3):
+            going = can_go[:, turn]
+            if going.any():
+                self._take_actions(index[going], side[going], order[going, turn])
+
+    def run(self):
+        """ Runs every battle to the end.
+
+            Returns:
+                This VectorBattle, so results can be read straight off of it.
+        """
+        self.round[:] = 1
+        self.finished[:] = self._is_a_unit_defeated() | ~self._can_act(in_round=False).any(axis=1)
+
+        while not self.finished.all():
+            active = ~self.finished
+            round_over = active & (self._is_a_unit_defeated() |
+                    ~self._can_act(in_round=True).any(axis=1))
+
+            if round_over.any():
+                self.round[round_over] += 1
+                self.acted[round_over] = False
+                self.finished |= round_over & (self._is_a_unit_defeated() |
+                        ~self._can_act(in_round=False).any(axis=1))
+
+            stepping = np.flatnonzero(active & ~round_over)
+            if len(stepping):
+                self._row_turn(stepping)
+
+        return self
+
+    @property
+    def rounds(self):
+        """ How many rounds each battle lasted. """
+        return self.round - 1
+
+    @property
+    def survivors(self):
+        """ How many characters are alive in each unit, shaped (battles, 2). """
+        return (self.occupied & self.alive).sum(axis=2)
+
+    @property
+    def outcomes(self):
+        """ The outcome of each battle from the close units point of view. 1 for a win, -1 for a
+            loss and 0 for a draw.
+        """
+        survivors = self.survivors
+        won = (survivors[:, FAR] == 0) & (survivors[:, CLOSE] > 0)
+        lost = (survivors[:, CLOSE] == 0) & (survivors[:, FAR] > 0)
+        return np.where(won, 1, np.where(lost, -1, 0))
+
+    def to_matchup_result(self) -> MatchupResult:
+        """ Tallies up every battle into a MatchupResult, the same as the simulator returns.
+
+            Returns:
+                A MatchupResult with every battle in it.
+        """
+        result = MatchupResult()
+        outcomes = self.outcomes
+        survivors = self.survivors
+
+        result.battles = self.num_battles
+        result.wins = int((outcomes == 1).sum())
+        result.losses = int((outcomes == -1).sum())
+        result.draws = int((outcomes == 0).sum())
+        result.total_rounds = int(self.rounds.sum())
+        for side, histogram in ((CLOSE, result.survivors_close), (FAR, result.survivors_far)):
+            values, counts = np.unique(survivors[:, side], return_counts=True)
+            histogram.update({int(value): int(count) for value, count in zip(values, counts)})
+
+        return result
+
+def simulate_matchup_vectorized(unit_close, unit_far, num_battles, seed=None) -> MatchupResult:
+    """ Runs many battles between two units with the vectorized engine.
+
+        Args:
+            unit_close (Unit): The close unit.
+            unit_far (Unit): The far unit.
+            num_battles (int): How many battles to run.
+            seed (int): Seed for the crit rolls.
+
+        Returns:
+            A MatchupResult with every battle in it.
+    """
+    return VectorBattle.from_units(unit_close, unit_far, num_battles, seed=seed).run()\
+            .to_matchup_result()
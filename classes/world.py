@@ -0,0 +1,320 @@
+""" world.py
+
+contains the world layer. Units move about a 2D map, and when two of them come into contact they
+fight. Every tick moves every unit, finds who is touching whom with a spatial hash grid, then
+fights every battle started that tick together, as one VectorBattle (see vector_battle.py).
+
+Contact detection never compares every pair of units. Each unit is hashed to the grid cell it is
+standing in, and cells are at least as big as the contact radius, so anyone a unit can touch is
+in its own cell or one of the eight around it. Only those pairs are measured.
+
+A unit fights at most one battle per tick, closest contact first. The unit that has been on the
+map longer is the close unit. Damage and deaths stay with the characters after a battle. A unit
+with nobody left alive is taken off the map, and the survivors rest for rest_ticks ticks before
+they can start another battle, so two units that keep drawing don't fight every tick.
+
+"""
+#pylint: disable=relative-beyond-top-level # it's fine for now.
+from collections import namedtuple
+import numpy as np
+from .rng import RngStream, derive_seed
+from .vector_battle import CLOSE, FAR, VectorBattle
+
+# one battle fought in a tick. outcome is from the close units point of view: 1 for a win, -1 for
+# a loss and 0 for a draw.
+Encounter = namedtuple("Encounter", ("close_id", "far_id", "outcome", "rounds"))
+
+# the cells a cell is checked against: itself, and half of its neighbours. The other half check
+# this cell, so every pair of neighbouring cells is only looked at once.
+_HALF_NEIGHBOURS = ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1))
+
+class SpatialHash():
+    """ A uniform grid of points, for finding which of them are close to each other.
+
+        Points are bucketed by the cell they're in. Rather than a dict of cell -> list, every
+        point gets an int key for its cell and the points are sorted by key, so each cell is a run
+        of the sorted points and finding one is a binary search. Building the grid is one sort.
+
+        Attributes:
+            cell_size (float): The width and height of a cell.
+            positions (np.ndarray): The points, shaped (points, 2).
+            order (np.ndarray): The index of every point, sorted by cell.
+            keys (np.ndarray): The cell key of each point in order.
+            stride (int): How much the key changes from one column of cells to the next.
+
+    """
+
+    def __init__(self, cell_size):
+        if cell_size <= 0:
+            raise ValueError(f"cell_size must be more than 0, not {cell_size}")
+
+        self.cell_size = cell_size
+        self.positions = np.zeros((0, 2))
+        self.order = np.zeros(0, dtype=np.int64)
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.stride = 3
+
+    def build(self, positions):
+        """ Hashes every point into the grid, replacing what was there.
+
+            Args:
+                positions (np.ndarray): The points, shaped (points, 2).
+
+            Returns:
+                This SpatialHash.
+        """
+        self.positions = np.asarray(positions, dtype=np.float64)
+        if len(self.positions) == 0:
+            self.order = np.zeros(0, dtype=np.int64)
+            self.keys = np.zeros(0, dtype=np.int64)
+            return self
+
+        cells = np.floor(self.positions / self.cell_size).astype(np.int64)
+        cells -= cells.min(axis=0)
+
+        # leave a free row of cells above and below, so a neighbour one row out of the grid never
+        # lands in the next column.
+        self.stride = int(cells[:, 1].max()) + 3
+        keys = cells[:, 0] * self.stride + cells[:, 1] + 1
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+        return self
+
+    #pylint: disable=too-many-locals # one array per step, this is fine.
+    def pairs(self, radius):
+        """ Finds every pair of points no further apart than radius.
+
+            Args:
+                radius (float): How close two points have to be. No more than cell_size.
+
+            Returns:
+                Two int arrays, the first and second point of each pair. The first is always the
+                lower index.
+        """
+        if radius > self.cell_size:
+            raise ValueError(f"radius {radius} is bigger than the cell size {self.cell_size}")
+
+        ranks = np.arange(len(self.keys))
+        firsts, seconds = [], []
+        for d_column, d_row in _HALF_NEIGHBOURS:
+            wanted = self.keys + d_column * self.stride + d_row
+            end = np.searchsorted(self.keys, wanted, side="right")
+            if (d_column, d_row) == (0, 0):
+                # points in the same cell pair with the ones sorted after them.
+                start = ranks + 1
+            else:
+                start = np.searchsorted(self.keys, wanted, side="left")
+
+            counts = np.maximum(end - start, 0)
+            total = int(counts.sum())
+            if not total:
+                continue
+
+            # every point pairs with each point in the run start:end of the sorted points.
+            run_offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            firsts.append(self.order[np.repeat(ranks, counts)])
+            seconds.append(self.order[np.repeat(start, counts) + run_offsets])
+
+        if not firsts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        first, second = np.concatenate(firsts), np.concatenate(seconds)
+        delta = self.positions[first] - self.positions[second]
+        close = np.einsum("ij,ij->i", delta, delta) <= radius * radius
+        first, second = first[close], second[close]
+        return np.minimum(first, second), np.maximum(first, second)
+
+#pylint: disable=too-many-instance-attributes # one array per unit value, this is fine.
+class World():
+    """ A 2D map of moving units that fight when they meet.
+
+        Attributes:
+            width, height (float): The size of the map. Units bounce off the edges.
+            contact_radius (float): How close two units have to be to start a battle.
+            rest_ticks (int): How many ticks a unit rests after a battle before it can fight
+                again.
+            units (list): Every unit on the map. The arrays below have a row for each, in the
+                same order.
+            positions (np.ndarray): Where each unit is, shaped (units, 2).
+            velocities (np.ndarray): How far each unit moves per tick, shaped (units, 2).
+            resting (np.ndarray): How many more ticks each unit is resting for.
+            grid (SpatialHash): The grid contacts are found with.
+            tick_count (int): How many ticks have run.
+            seed (int): The root seed. The battles of each tick are seeded from it and the tick,
+                so a world run again from the same start plays out the same.
+
+    """
+
+    #pylint: disable=too-many-arguments,too-many-positional-arguments # this is fine.
+    def __init__(self, width, height, contact_radius=1.0, cell_size=None, rest_ticks=5,
+            seed=None):
+        self.width = width
+        self.height = height
+        self.contact_radius = contact_radius
+        self.rest_ticks = rest_ticks
+        self.units = []
+        self.positions = np.zeros((0, 2))
+        self.velocities = np.zeros((0, 2))
+        self.resting = np.zeros(0, dtype=np.int32)
+        self.grid = SpatialHash(cell_size if cell_size is not None else contact_radius)
+        if self.grid.cell_size < contact_radius:
+            raise ValueError(f"cell_size {cell_size} is smaller than the contact radius "
+                    f"{contact_radius}")
+        self.tick_count = 0
+        self.seed = seed if seed is not None else RngStream().seed
+
+    def add_units(self, units, positions, velocities=None):
+        """ Puts some units on the map.
+
+            Args:
+                units (list): The units to add.
+                positions (array): Where each unit starts, shaped (units, 2).
+                velocities (array): How far each unit moves per tick, shaped (units, 2).
+                    Defaults to standing still.
+        """
+        units = list(units)
+        positions = np.asarray(positions, dtype=np.float64).reshape(len(units), 2)
+        if velocities is None:
+            velocities = np.zeros_like(positions)
+        velocities = np.asarray(velocities, dtype=np.float64).reshape(len(units), 2)
+
+        self.units += units
+        self.positions = np.concatenate([self.positions, positions])
+        self.velocities = np.concatenate([self.velocities, velocities])
+        self.resting = np.concatenate([self.resting, np.zeros(len(units), dtype=np.int32)])
+
+    def add_unit(self, unit, position, velocity=(0.0, 0.0)):
+        """ Puts a unit on the map.
+
+            Args:
+                unit (Unit): The unit to add.
+                position (tuple): Where it starts, (x, y).
+                velocity (tuple): How far it moves per tick, (x, y).
+        """
+        self.add_units([unit], [position], [velocity])
+
+    def move(self):
+        """ Moves every unit one tick along, bouncing off the edges of the map.
+        """
+        size = np.array([self.width, self.height], dtype=np.float64)
+        self.positions += self.velocities
+
+        under = self.positions < 0
+        self.positions[under] = -self.positions[under]
+        over = self.positions > size
+        self.positions[over] = (2 * size - self.positions)[over]
+        self.velocities[under | over] *= -1
+
+        # a unit moving more than the whole map in a tick could still be out, keep it in.
+        np.clip(self.positions, 0, size, out=self.positions)
+
+    def find_contacts(self):
+        """ Finds which units start a battle this tick. Resting units don't, and a unit touching
+            several others fights the closest.
+
+            Returns:
+                Two int arrays, the close and far unit of each battle, as indexes into units.
+        """
+        first, second = self.grid.build(self.positions).pairs(self.contact_radius)
+        ready = (self.resting[first] == 0) & (self.resting[second] == 0)
+        first, second = first[ready], second[ready]
+        if len(first) == 0:
+            return first, second
+
+        delta = self.positions[first] - self.positions[second]
+        closest = np.argsort(np.einsum("ij,ij->i", delta, delta), kind="stable")
+
+        busy = set()
+        close, far = [], []
+        for pair in closest.tolist():
+            one, other = int(first[pair]), int(second[pair])
+            if one not in busy and other not in busy:
+                busy.update((one, other))
+                close.append(one)
+                far.append(other)
+
+        return np.array(close, dtype=np.int64), np.array(far, dtype=np.int64)
+
+    def fight(self, close, far) -> list:
+        """ Fights a battle between each pair of units, all at once, and keeps the damage.
+
+            Args:
+                close (np.ndarray): The index of the close unit of each battle.
+                far (np.ndarray): The index of the far unit of each battle.
+
+            Returns:
+                An Encounter for each battle.
+        """
+        if len(close) == 0:
+            return []
+
+        num_battles = len(close)
+        battles = VectorBattle(num_battles, seed=derive_seed(self.seed, self.tick_count))
+        battle_indexes = np.concatenate([np.arange(num_battles)] * 2)
+        sides = [CLOSE] * num_battles + [FAR] * num_battles
+        units = [self.units[index] for index in np.concatenate([close, far]).tolist()]
+
+        battles.load_units(battle_indexes, sides, units)
+        battles.run()
+        battles.store_units(battle_indexes, sides, units)
+
+        return [Encounter(units[index].unit_id, units[num_battles + index].unit_id,
+                int(outcome), int(rounds)) for index, (outcome, rounds)
+                in enumerate(zip(battles.outcomes, battles.rounds))]
+
+    def remove_defeated(self, indexes=None):
+        """ Takes every unit with nobody left alive off the map.
+
+            Args:
+                indexes (iterable): Only check these units, as indexes into units. Defaults to
+                    checking every unit.
+
+            Returns:
+                The units taken off.
+        """
+        indexes = range(len(self.units)) if indexes is None else indexes
+        defeated = [index for index in indexes if not self.units[index].is_any_char_alive()]
+        if not defeated:
+            return []
+
+        alive = np.ones(len(self.units), dtype=bool)
+        alive[defeated] = False
+
+        removed = [unit for unit, keep in zip(self.units, alive) if not keep]
+        self.units = [unit for unit, keep in zip(self.units, alive) if keep]
+        self.positions = self.positions[alive]
+        self.velocities = self.velocities[alive]
+        self.resting = self.resting[alive]
+        return removed
+
+    def tick(self) -> list:
+        """ Runs one tick: moves every unit, then fights every battle that starts.
+
+            Returns:
+                An Encounter for each battle fought this tick.
+        """
+        np.maximum(self.resting - 1, 0, out=self.resting)
+        self.move()
+
+        close, far = self.find_contacts()
+        encounters = self.fight(close, far)
+        self.resting[close] = self.rest_ticks
+        self.resting[far] = self.rest_ticks
+        if encounters:
+            # only units that just fought can have been wiped out.
+            self.remove_defeated(np.concatenate([close, far]).tolist())
+
+        self.tick_count += 1
+        return encounters
+
+    def run(self, ticks):
+        """ Runs a number of ticks, one at a time.
+
+            Args:
+                ticks (int): How many ticks to run.
+
+            Yields:
+                The list of Encounters of each tick.
+        """
+        for _ in range(ticks):
+            yield self.tick()
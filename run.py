@@ -2,16 +2,59 @@
 
 This is the main script for running the game.
 
+With no arguments it creates a couple of units and displays a menu. It also has subcommands for
+scripts and batch jobs. They read a scenario (see classes/scenario.py) from a json file, or from
+stdin with -, fight with no pacing and stream one line of json per battle to stdout:
+
+    python run.py simulate scenario.json --battles 1000 --seed 7
+    python run.py tournament league.json --battles-per-match 10 --seed 7
+    python run.py replay scenario.json --seed 7 --battle 12
+    python run.py replay --file battles.replay
+
+Every battle line has the battles own seed, and "replay scenario.json --seed <that seed>" fights
+the same battle again with every event written out.
+
 """
+import argparse
+import json
+import os
 import sys
 from classes.game import Game
 from classes.unit import Unit
 from classes.battle import Battle
+from classes.battle_state import BattleState
+from classes.battle_sinks import JsonLinesSink
 from classes.unit_classes.knight import KnightClass
 
-def main():
-    """ The main function of our program. Creates a couple characters, adds them to a couple units,
-        then displays a menu that allows options to be selected.
+def main(argv=None):
+    """ The main function of our program. Runs a subcommand if one is given, otherwise shows the
+        menu.
+
+        Args:
+            argv (list): The command line arguments. Defaults to sys.argv.
+
+        Returns:
+            The exit code.
+    """
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        return menu()
+
+    try:
+        args.run(args, sys.stdout)
+    except BrokenPipeError:
+        # whoever was reading stopped early, like head does. Point stdout somewhere harmless so
+        # python doesn't complain about it again on the way out.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    except (OSError, ValueError) as error:
+        parser.exit(1, f"{parser.prog} {args.command}: error: {error}\n")
+
+    return 0
+
+def menu():
+    """ Creates a couple characters, adds them to a couple units, then displays a menu that
+        allows options to be selected.
 
     """
     game = Game()
@@ -42,8 +85,13 @@ def main():
         choice = input()
 
         if choice == "1":
-            # print char by id. We don't have a dict of Characters to index for this right now.
-            pass
+            print("Which char id?")
+            char = game.get_char_by_id(int(input()))
+
+            if char is None:
+                print("Char id does not exist")
+            else:
+                print(char)
         elif choice == "2":
             print("Which unit id?")
             unit_id = int(input())
@@ -65,15 +113,13 @@ def start_battle(game, unit_one: Unit, unit_two: Unit):
             unit_one: The close unit
             unit_two: The far unit.
 
-        TODO:
-             can we also cache chars stats by making a copy of the characters or something?
-             we need a global dict of chars that have all the base stats that we can adjust
-             something like that. it goes back to being a database I guess.
+        The battle is fought on a BattleState, so the characters keep their stats and the same
+        battle can be started again.
     """
     print(f"Commencing battle between units controlled by {unit_one.unit_leader.char_name} and " + \
             f"{unit_two.unit_leader.char_name}\n")
 
-    battle = Battle(game, unit_one, unit_two)
+    battle = Battle(game, *BattleState(unit_one, unit_two).units)
     battle.fight_it_out()
 
 def display_menu():
@@ -85,6 +131,134 @@ def display_menu():
     print("3. Run a battle")
     print("4. Exit")
 
+def make_parser():
+    """ Makes the command line parser, with a subparser for every subcommand.
+
+        Returns:
+            The argparse.ArgumentParser.
+    """
+    parser = argparse.ArgumentParser(description="Runs the game, or battles from a scenario.")
+    commands = parser.add_subparsers(dest="command")
+
+    simulate = commands.add_parser("simulate", help="fight a scenario many times")
+    simulate.add_argument("scenario", help="scenario json file, or - for stdin")
+    simulate.add_argument("--battles", type=int, default=1, help="how many battles to fight")
+    simulate.add_argument("--seed", type=int, default=None, help="root seed")
+    simulate.add_argument("--summary", action="store_true",
+            help="finish with a line summing up every battle")
+    simulate.set_defaults(run=run_simulate)
+
+    tournament = commands.add_parser("tournament", help="fight every unit of a league")
+    tournament.add_argument("league", help="league or scenario json file, or - for stdin")
+    tournament.add_argument("--battles-per-match", type=int, default=1,
+            help="how many battles each matchup gets")
+    tournament.add_argument("--seed", type=int, default=None, help="root seed")
+    tournament.set_defaults(run=run_tournament)
+
+    replay = commands.add_parser("replay", help="fight one battle again, with every event")
+    replay.add_argument("scenario", nargs="?", help="scenario json file, or - for stdin")
+    replay.add_argument("--seed", type=int, default=None,
+            help="the battles seed, or the root seed with --battle")
+    replay.add_argument("--battle", type=int, default=None,
+            help="the index of the battle in a simulate run")
+    replay.add_argument("--file", default=None, help="play a recorded replay file instead")
+    replay.set_defaults(run=run_replay)
+
+    return parser
+
+def read_json(path):
+    """ Reads a json file, or stdin if the path is -.
+    """
+    if path == "-":
+        return json.load(sys.stdin)
+
+    with open(path, encoding="utf-8") as json_file:
+        return json.load(json_file)
+
+def write_line(out, record):
+    """ Writes a line of json and sends it on straight away, so readers see every battle as soon
+        as it's over.
+    """
+    out.write(json.dumps(record) + "\n")
+    out.flush()
+
+def run_simulate(args, out):
+    """ Fights a scenario args.battles times and writes a result line per battle.
+    """
+    #pylint: disable=import-outside-toplevel # only load what the subcommand needs.
+    from classes.rng import RngStream
+    from classes.scenario import load_scenario
+    from classes.simulator import MatchupResult, battle_summary, fight_battles
+
+    _, unit_close, unit_far = load_scenario(read_json(args.scenario))
+    seed = args.seed if args.seed is not None else RngStream().seed
+    result = MatchupResult()
+    for index, battle in fight_battles(unit_close, unit_far, args.battles, seed):
+        summary = battle_summary(battle)
+        write_line(out, {"battle": index, "event": "result", **summary})
+        result.add_battle(summary["outcome"], summary["rounds"], summary["survivors_close"],
+                summary["survivors_far"])
+
+    if args.summary:
+        write_line(out, {"event": "summary", "root_seed": seed, **result.as_dict()})
+
+#pylint: disable=too-many-locals # the imports are local to the subcommand.
+def run_tournament(args, out):
+    """ Fights every unit of a league against every other and writes a result line per battle,
+        then a line per unit with the standings.
+    """
+    #pylint: disable=import-outside-toplevel # only load what the subcommand needs.
+    from classes.rng import RngStream
+    from classes.scenario import load_league
+    from classes.simulator import MatchupResult, battle_summary
+    from classes.tournament import Standings, fight_matches, schedule_matchups
+
+    game, units = load_league(read_json(args.league))
+    seed = args.seed if args.seed is not None else RngStream().seed
+    standings = Standings({unit.unit_id: unit.unit_leader.char_name for unit in units})
+    matches = schedule_matchups(unit.unit_id for unit in units)
+    for match_index, close_id, far_id, battle_index, battle in fight_matches(game, matches, seed,
+            args.battles_per_match):
+        summary = battle_summary(battle)
+        write_line(out, {"match": match_index, "close": close_id, "far": far_id,
+                "battle": battle_index, "event": "result", **summary})
+
+        result = MatchupResult()
+        result.add_battle(summary["outcome"], summary["rounds"], summary["survivors_close"],
+                summary["survivors_far"])
+        standings.add_result(close_id, far_id, result)
+
+    for place, row in enumerate(standings.table(), start=1):
+        write_line(out, {"event": "standing", "place": place, **row})
+
+#pylint: disable=too-many-locals # the imports are local to the subcommand.
+def run_replay(args, out):
+    """ Fights one battle of a scenario again, or plays back a replay file, writing every event.
+    """
+    #pylint: disable=import-outside-toplevel # only load what the subcommand needs.
+    from classes.replay import ReplayError, play_replay, read_replays
+    from classes.rng import RngStream
+    from classes.scenario import load_scenario
+    from classes.simulator import battle_summary
+
+    if args.file is not None:
+        with open(args.file, "rb") as replay_file:
+            try:
+                for index, replay in enumerate(read_replays(replay_file)):
+                    play_replay(replay, JsonLinesSink(out, battle=index))
+            except ReplayError as error:
+                raise ValueError(f"{args.file} is not a replay file: {error}") from error
+        out.flush()
+        return
+
+    if args.scenario is None or args.seed is None:
+        raise ValueError("replay needs a scenario and a --seed, or a --file")
+
+    _, unit_close, unit_far = load_scenario(read_json(args.scenario))
+    seed = args.seed if args.battle is None else RngStream(args.seed).child(args.battle)
+    battle = Battle(None, unit_close, unit_far, headless=True, sink=JsonLinesSink(out), seed=seed)
+    battle.fight_it_out()
+    write_line(out, {"event": "result", **battle_summary(battle)})
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())